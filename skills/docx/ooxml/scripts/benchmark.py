@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Office document validators on generated documents.
+
+Usage:
+    python benchmark.py [--format docx|pptx|all] [--paragraphs N] [--tracked-changes N]
+                        [--slides N] [--media N] [--rels N] [--repeat N]
+                        [--output results.json] [--compare baseline.json]
+
+Synthesizes a .docx and/or .pptx package of the requested size (plus an
+original to compare against) and times every validate_* method of
+DOCXSchemaValidator, PPTXSchemaValidator and RedliningValidator separately,
+along with the full validate() run. Each measurement runs in a fresh process
+with a cold cache, so peak RSS is per method. Results can be written as JSON
+and compared with an earlier run to spot regressions.
+"""
+
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import lxml.etree
+
+from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+VALIDATORS = {
+    "docx": [DOCXSchemaValidator, RedliningValidator],
+    "pptx": [PPTXSchemaValidator],
+}
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+A_NAMESPACE = "http://schemas.openxmlformats.org/drawingml/2006/main"
+P_NAMESPACE = "http://schemas.openxmlformats.org/presentationml/2006/main"
+MC_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
+RELATIONSHIPS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+RELATIONSHIP_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+)
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+TRACKED_CHANGE_DATE = "2024-01-01T00:00:00Z"
+
+# 1x1 transparent PNG used for every media part
+PNG_IMAGE = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Office document validators on generated documents"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["docx", "pptx", "all"],
+        default="all",
+        help="Document type(s) to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=2000,
+        help="Paragraphs in the Word document (default: 2000)",
+    )
+    parser.add_argument(
+        "--tracked-changes",
+        type=int,
+        default=200,
+        help="Paragraphs with a tracked deletion and insertion (default: 200)",
+    )
+    parser.add_argument(
+        "--slides",
+        type=int,
+        default=100,
+        help="Slides in the presentation (default: 100)",
+    )
+    parser.add_argument(
+        "--media",
+        type=int,
+        default=20,
+        help="Image parts in each document (default: 20)",
+    )
+    parser.add_argument(
+        "--rels",
+        type=int,
+        default=200,
+        help="Hyperlink relationships in each document (default: 200)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per measurement; the median wall time is reported (default: 3)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processes for XSD validation, passed to the validators (default: 1)",
+    )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="Validate the packed file instead of an unpacked directory",
+    )
+    parser.add_argument(
+        "--keep",
+        metavar="DIR",
+        help="Write the generated documents to DIR and keep them",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write the results as JSON",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="JSON results of an earlier run to compare wall times against",
+    )
+    args = parser.parse_args()
+
+    for name in ("paragraphs", "tracked_changes", "slides", "media", "rels"):
+        assert getattr(args, name) >= 0, f"Error: --{name} must not be negative"
+    assert args.paragraphs > 0, "Error: --paragraphs must be positive"
+    assert args.slides > 0, "Error: --slides must be positive"
+    assert args.repeat > 0, "Error: --repeat must be positive"
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+
+    formats = ["docx", "pptx"] if args.format == "all" else [args.format]
+    config = {
+        "paragraphs": args.paragraphs,
+        "tracked_changes": min(args.tracked_changes, args.paragraphs),
+        "slides": args.slides,
+        "media": args.media,
+        "rels": args.rels,
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "packed": args.packed,
+    }
+
+    with contextlib.ExitStack() as stack:
+        if args.keep:
+            work_dir = Path(args.keep)
+            work_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+
+        results = []
+        for file_format in formats:
+            path, original_file = generate_document(file_format, work_dir, config)
+            if args.packed:
+                path = path.with_suffix(f".{file_format}")
+            print(f"Benchmarking {file_format}: {path}")
+            results.extend(
+                benchmark_document(
+                    file_format,
+                    path,
+                    original_file,
+                    repeat=args.repeat,
+                    jobs=args.jobs,
+                )
+            )
+
+    report = {
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "lxml": ".".join(str(v) for v in lxml.etree.LXML_VERSION),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    print_results(results, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+
+def generate_document(file_format, work_dir, config):
+    """Write a generated document and its original to work_dir.
+
+    The modified document is written both unpacked (<name>/) and packed
+    (<name>.docx/.pptx).
+
+    Returns:
+        tuple: (unpacked_dir, original_file)
+    """
+    if file_format == "docx":
+        original_parts = docx_parts(config, tracked=False)
+        modified_parts = docx_parts(config, tracked=True)
+    else:
+        original_parts = modified_parts = pptx_parts(config)
+
+    unpacked_dir = work_dir / file_format
+    original_file = work_dir / f"original.{file_format}"
+    write_package(original_parts, packed_file=original_file)
+    write_package(
+        modified_parts,
+        unpacked_dir=unpacked_dir,
+        packed_file=unpacked_dir.with_suffix(f".{file_format}"),
+    )
+    return unpacked_dir, original_file
+
+
+def write_package(parts, unpacked_dir=None, packed_file=None):
+    """Write {part name: bytes} as an unpacked directory and/or a packed file."""
+    if unpacked_dir is not None:
+        for name, data in parts.items():
+            part_path = Path(unpacked_dir) / name
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path.write_bytes(data)
+    if packed_file is not None:
+        with zipfile.ZipFile(packed_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in parts.items():
+                zf.writestr(name, data)
+
+
+def docx_parts(config, tracked):
+    """Parts of a Word document with the configured size.
+
+    Every paragraph carries w14 attributes (ignorable namespace). In the
+    tracked version, the selected paragraphs replace their last run with a
+    deletion and an insertion by Claude; rejecting them gives the original.
+    """
+    paragraphs = config["paragraphs"]
+    changes = config["tracked_changes"]
+    changed = {i * paragraphs // changes for i in range(changes)} if changes else set()
+    hyperlinks = {}
+    for i in range(config["rels"]):
+        hyperlinks.setdefault(i * paragraphs // config["rels"], []).append(i)
+
+    body = []
+    for p in range(paragraphs):
+        runs = [
+            f'<w:r><w:t xml:space="preserve">Paragraph {p} with some text </w:t></w:r>'
+        ]
+        for h in hyperlinks.get(p, []):
+            runs.append(
+                f'<w:hyperlink r:id="rIdLink{h}"><w:r><w:t>link {h}</w:t></w:r></w:hyperlink>'
+            )
+        if tracked and p in changed:
+            runs.append(
+                f'<w:del w:id="{2 * p + 1}" w:author="Claude" w:date="{TRACKED_CHANGE_DATE}">'
+                f"<w:r><w:delText>old words</w:delText></w:r></w:del>"
+                f'<w:ins w:id="{2 * p + 2}" w:author="Claude" w:date="{TRACKED_CHANGE_DATE}">'
+                f"<w:r><w:t>new words</w:t></w:r></w:ins>"
+            )
+        else:
+            runs.append("<w:r><w:t>old words</w:t></w:r>")
+        body.append(
+            f'<w:p w14:paraId="{p + 1:08X}" w14:textId="77777777">{"".join(runs)}</w:p>'
+        )
+
+    document = (
+        f'{XML_DECLARATION}<w:document xmlns:w="{W_NAMESPACE}" xmlns:r="{R_NAMESPACE}" '
+        f'xmlns:mc="{MC_NAMESPACE}" xmlns:w14="{W14_NAMESPACE}" mc:Ignorable="w14">'
+        f"<w:body>{''.join(body)}<w:sectPr/></w:body></w:document>"
+    )
+    styles = (
+        f'{XML_DECLARATION}<w:styles xmlns:w="{W_NAMESPACE}">'
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal">'
+        '<w:name w:val="Normal"/></w:style></w:styles>'
+    )
+
+    relationships = [("rIdStyles", "styles", "styles.xml", None)]
+    relationships += [
+        (f"rIdImage{i}", "image", f"media/image{i}.png", None)
+        for i in range(config["media"])
+    ]
+    relationships += [
+        (f"rIdLink{i}", "hyperlink", f"https://example.com/{i}", "External")
+        for i in range(config["rels"])
+    ]
+
+    parts = {
+        "[Content_Types].xml": content_types_xml(
+            {
+                "/word/document.xml": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+                "/word/styles.xml": "application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml",
+            }
+        ),
+        "_rels/.rels": relationships_xml(
+            [("rId1", "officeDocument", "word/document.xml", None)]
+        ),
+        "word/document.xml": document.encode("utf-8"),
+        "word/styles.xml": styles.encode("utf-8"),
+        "word/_rels/document.xml.rels": relationships_xml(relationships),
+    }
+    for i in range(config["media"]):
+        parts[f"word/media/image{i}.png"] = PNG_IMAGE
+    return parts
+
+
+def pptx_parts(config):
+    """Parts of a PowerPoint presentation with the configured size.
+
+    Slides share a single layout and master. Media and hyperlink
+    relationships are spread over the slides.
+    """
+    slides = config["slides"]
+    namespaces = (
+        f'xmlns:a="{A_NAMESPACE}" xmlns:r="{R_NAMESPACE}" xmlns:p="{P_NAMESPACE}"'
+    )
+    overrides = {
+        "/ppt/presentation.xml": "application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml",
+        "/ppt/slideMasters/slideMaster1.xml": "application/vnd.openxmlformats-officedocument.presentationml.slideMaster+xml",
+        "/ppt/slideLayouts/slideLayout1.xml": "application/vnd.openxmlformats-officedocument.presentationml.slideLayout+xml",
+        "/ppt/theme/theme1.xml": "application/vnd.openxmlformats-officedocument.theme+xml",
+    }
+
+    sp_tree = (
+        '<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/>'
+        "</p:nvGrpSpPr><p:grpSpPr/>{}</p:spTree></p:cSld>"
+    )
+
+    def text_shape(shape_id, name, text, placeholder):
+        return (
+            f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/>'
+            f'<p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr>{placeholder}</p:nvPr>'
+            f"</p:nvSpPr><p:spPr/><p:txBody><a:bodyPr/><a:lstStyle/>{text}</p:txBody></p:sp>"
+        )
+
+    parts = {
+        "_rels/.rels": relationships_xml(
+            [("rId1", "officeDocument", "ppt/presentation.xml", None)]
+        ),
+        "ppt/slideMasters/slideMaster1.xml": (
+            f"{XML_DECLARATION}<p:sldMaster {namespaces}>{sp_tree.format('')}"
+            '<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" '
+            'accent2="accent2" accent3="accent3" accent4="accent4" accent5="accent5" '
+            'accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+            '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst>'
+            "</p:sldMaster>"
+        ).encode("utf-8"),
+        "ppt/slideMasters/_rels/slideMaster1.xml.rels": relationships_xml(
+            [
+                ("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml", None),
+                ("rId2", "theme", "../theme/theme1.xml", None),
+            ]
+        ),
+        "ppt/slideLayouts/slideLayout1.xml": (
+            f'{XML_DECLARATION}<p:sldLayout {namespaces} type="obj">'
+            f"{sp_tree.format('')}</p:sldLayout>"
+        ).encode("utf-8"),
+        "ppt/slideLayouts/_rels/slideLayout1.xml.rels": relationships_xml(
+            [("rId1", "slideMaster", "../slideMasters/slideMaster1.xml", None)]
+        ),
+        "ppt/theme/theme1.xml": (
+            f'{XML_DECLARATION}<a:theme xmlns:a="{A_NAMESPACE}" name="Benchmark">'
+            "<a:themeElements/></a:theme>"
+        ).encode("utf-8"),
+    }
+
+    media = {}
+    for i in range(config["media"]):
+        media.setdefault(i * slides // config["media"], []).append(i)
+        parts[f"ppt/media/image{i}.png"] = PNG_IMAGE
+    hyperlinks = {}
+    for i in range(config["rels"]):
+        hyperlinks.setdefault(i * slides // config["rels"], []).append(i)
+
+    slide_ids, presentation_rels = [], []
+    for s in range(slides):
+        number = s + 1
+        runs = "".join(
+            f'<a:r><a:rPr><a:hlinkClick r:id="rIdLink{h}"/></a:rPr><a:t>link {h}</a:t></a:r>'
+            for h in hyperlinks.get(s, [])
+        )
+        shapes = text_shape(
+            2,
+            "Title 1",
+            f"<a:p><a:r><a:t>Slide {number}</a:t></a:r></a:p>",
+            '<p:ph type="title"/>',
+        )
+        shapes += text_shape(
+            3,
+            "Content Placeholder 2",
+            f"<a:p><a:r><a:t>Body text of slide {number}</a:t></a:r>{runs}</a:p>",
+            '<p:ph idx="1"/>',
+        )
+        parts[f"ppt/slides/slide{number}.xml"] = (
+            f"{XML_DECLARATION}<p:sld {namespaces}>{sp_tree.format(shapes)}"
+            "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+        ).encode("utf-8")
+
+        relationships = [
+            ("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml", None)
+        ]
+        relationships += [
+            (f"rIdImage{i}", "image", f"../media/image{i}.png", None)
+            for i in media.get(s, [])
+        ]
+        relationships += [
+            (f"rIdLink{h}", "hyperlink", f"https://example.com/{h}", "External")
+            for h in hyperlinks.get(s, [])
+        ]
+        parts[f"ppt/slides/_rels/slide{number}.xml.rels"] = relationships_xml(
+            relationships
+        )
+
+        overrides[f"/ppt/slides/slide{number}.xml"] = (
+            "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+        )
+        slide_ids.append(f'<p:sldId id="{255 + number}" r:id="rIdSlide{number}"/>')
+        presentation_rels.append(
+            (f"rIdSlide{number}", "slide", f"slides/slide{number}.xml", None)
+        )
+
+    parts["ppt/presentation.xml"] = (
+        f"{XML_DECLARATION}<p:presentation {namespaces}>"
+        '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rIdMaster"/></p:sldMasterIdLst>'
+        f"<p:sldIdLst>{''.join(slide_ids)}</p:sldIdLst>"
+        '<p:sldSz cx="12192000" cy="6858000"/><p:notesSz cx="6858000" cy="9144000"/>'
+        "</p:presentation>"
+    ).encode("utf-8")
+    parts["ppt/_rels/presentation.xml.rels"] = relationships_xml(
+        [
+            ("rIdMaster", "slideMaster", "slideMasters/slideMaster1.xml", None),
+            ("rIdTheme", "theme", "theme/theme1.xml", None),
+        ]
+        + presentation_rels
+    )
+    parts["[Content_Types].xml"] = content_types_xml(overrides)
+    return parts
+
+
+def content_types_xml(overrides):
+    """[Content_Types].xml with the usual defaults and the given overrides."""
+    defaults = {
+        "rels": "application/vnd.openxmlformats-package.relationships+xml",
+        "xml": "application/xml",
+        "png": "image/png",
+    }
+    entries = [
+        f'<Default Extension="{extension}" ContentType="{content_type}"/>'
+        for extension, content_type in defaults.items()
+    ]
+    entries += [
+        f'<Override PartName="{part_name}" ContentType="{content_type}"/>'
+        for part_name, content_type in overrides.items()
+    ]
+    return (
+        f'{XML_DECLARATION}<Types xmlns="{CONTENT_TYPES_NAMESPACE}">{"".join(entries)}</Types>'
+    ).encode("utf-8")
+
+
+def relationships_xml(relationships):
+    """A .rels part from (id, type, target, target_mode) tuples."""
+    entries = []
+    for rel_id, rel_type, target, target_mode in relationships:
+        mode = f' TargetMode="{target_mode}"' if target_mode else ""
+        entries.append(
+            f'<Relationship Id="{rel_id}" Type="{RELATIONSHIP_TYPE}/{rel_type}" '
+            f'Target="{target}"{mode}/>'
+        )
+    return (
+        f'{XML_DECLARATION}<Relationships xmlns="{RELATIONSHIPS_NAMESPACE}">'
+        f"{''.join(entries)}</Relationships>"
+    ).encode("utf-8")
+
+
+def benchmarked_methods(validator_class):
+    """The validate_* methods that take no arguments, followed by validate."""
+    methods = []
+    for name, function in inspect.getmembers(validator_class, inspect.isfunction):
+        if not name.startswith("validate_"):
+            continue
+        parameters = list(inspect.signature(function).parameters.values())[1:]
+        if all(p.default is not inspect.Parameter.empty for p in parameters):
+            methods.append(name)
+    return methods + ["validate"]
+
+
+def benchmark_document(file_format, path, original_file, repeat=3, jobs=1):
+    """Time every benchmarked method of the format's validators.
+
+    Returns:
+        list: One result dict per validator method
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+
+    for validator_class in VALIDATORS[file_format]:
+        for method in benchmarked_methods(validator_class):
+            runs = []
+            for _ in range(repeat):
+                # A fresh process per run: cold caches and a per-method peak RSS
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    runs.append(
+                        executor.submit(
+                            measure,
+                            file_format,
+                            validator_class.__name__,
+                            method,
+                            str(path),
+                            str(original_file),
+                            jobs,
+                        ).result()
+                    )
+
+            result = {
+                "format": file_format,
+                "validator": validator_class.__name__,
+                "method": method,
+                "wall_s": statistics.median(run["wall_s"] for run in runs),
+                "wall_s_runs": [run["wall_s"] for run in runs],
+                "setup_s": statistics.median(run["setup_s"] for run in runs),
+                "parse_count": runs[-1]["parse_count"],
+                "bytes_read": runs[-1]["bytes_read"],
+                "peak_rss_kb": max(
+                    (run["peak_rss_kb"] for run in runs if run["peak_rss_kb"]),
+                    default=None,
+                ),
+                "passed": runs[-1]["passed"],
+            }
+            results.append(result)
+            print(
+                f"  {result['validator']}.{method}: {result['wall_s']:.3f}s",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def measure(file_format, validator_name, method, path, original_file, jobs):
+    """Run one validator method once. Called in a fresh worker process."""
+    validator_class = next(
+        v for v in VALIDATORS[file_format] if v.__name__ == validator_name
+    )
+
+    start = time.perf_counter()
+    if validator_class is RedliningValidator:
+        validator = validator_class(path, original_file)
+    else:
+        validator = validator_class(path, original_file, cache=False, max_workers=jobs)
+    setup = time.perf_counter() - start
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            passed = getattr(validator, method)()
+            wall = time.perf_counter() - start
+    finally:
+        if hasattr(validator, "close"):
+            validator.close()
+
+    return {
+        "wall_s": wall,
+        "setup_s": setup,
+        "parse_count": getattr(validator, "parse_count", None),
+        "bytes_read": getattr(validator, "bytes_read", None),
+        "peak_rss_kb": peak_rss_kb(),
+        "passed": bool(passed),
+    }
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def print_results(results, baseline=None):
+    """Print a table of the results, with ratios to a baseline run if given."""
+    previous = {}
+    if baseline:
+        previous = {
+            (r["validator"], r["method"]): r["wall_s"] for r in baseline["results"]
+        }
+
+    header = f"{'method':<40} {'wall (s)':>9} {'parses':>7} {'MB read':>8} {'peak RSS (MB)':>14}"
+    if baseline:
+        header += f" {'vs baseline':>12}"
+
+    validator = None
+    for result in results:
+        if result["validator"] != validator:
+            validator = result["validator"]
+            print(f"\n{validator}")
+            print(header)
+
+        line = (
+            f"{result['method']:<40} {result['wall_s']:>9.3f} "
+            f"{_format_optional(result['parse_count'], digits=0):>7} "
+            f"{_format_optional(result['bytes_read'], 1024 * 1024):>8} "
+            f"{_format_optional(result['peak_rss_kb'], 1024):>14}"
+        )
+        if baseline:
+            before = previous.get((result["validator"], result["method"]))
+            ratio = f"{result['wall_s'] / before:.2f}x" if before else "-"
+            line += f" {ratio:>12}"
+        if not result["passed"]:
+            line += "  (failed)"
+        print(line)
+
+
+def _format_optional(value, scale=1, digits=1):
+    return "-" if value is None else f"{value / scale:.{digits}f}"
+
+
+if __name__ == "__main__":
+    main()
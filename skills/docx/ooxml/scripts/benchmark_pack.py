@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark the XML condensing of pack.py and check that its engines agree.
+
+Usage:
+    python benchmark_pack.py [path]... [--paragraphs N] [--slides N] [--repeat N] [--keep DIR]
+
+Condenses every XML part of the given unpacked directories, packed Office
+files or XML files (or of a generated .docx and .pptx, see benchmark.py) with
+the streaming engine of condense_xml_bytes and with the minidom reference
+engine. The outputs must be byte-identical; a set of synthetic parts with
+comments, CDATA, processing instructions, entities and whitespace inside
+text elements is always included. Wall time and peak RSS are measured per
+engine, each in a fresh process. Exits with 1 if any part differs.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmark import generate_document, peak_rss_kb
+from pack import condense_xml_bytes, condense_xml_bytes_minidom
+
+ENGINES = {
+    "streaming": condense_xml_bytes,
+    "minidom": condense_xml_bytes_minidom,
+}
+
+# Parts exercising what the engines must treat alike
+W_DECLARATION = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+EDGE_CASES = {
+    "comments.xml": (
+        '<?xml version="1.0" encoding="ascii" standalone="yes"?>\n'
+        "<!-- before --><a>\n  <!-- inside -->\n  <b/> text <!-- c --> \n</a>"
+        "<!-- after -->"
+    ),
+    "text-elements.xml": (
+        f"<w:document {W_DECLARATION}><w:t> <!-- kept --> </w:t><w:t/>"
+        '<w:t>\n  </w:t><w:r>\n  <w:t xml:space="preserve"> a </w:t>\n</w:r>'
+        "<t> </t><w:t><w:b> </w:b></w:t></w:document>"
+    ),
+    "cdata.xml": (
+        "<a><b> <![CDATA[ ]]> </b><c> <![CDATA[]]> </c>"
+        "<d>x<![CDATA[<y>]]>z</d><e><![CDATA[1]]><![CDATA[2]]></e></a>"
+    ),
+    "instructions.xml": (
+        '<?mso-application progid="Word.Document"?>\n<a><?b?> <?c  d ?></a><?e f?>'
+    ),
+    "escapes.xml": (
+        '<a x="&quot;&lt;&gt;&amp;&apos;&#10;&#13;&#9;" y="\tline\nbreak">'
+        "&lt;&gt;&amp;&quot;&apos;&#13;<b>&#32;</b><c> </c>"
+        "<d>é \U0001f600</d></a>"
+    ),
+    "namespaces.xml": (
+        '<x:a c="1" xmlns:x="urn:x" x:b="2" xmlns="urn:d">'
+        '<b xmlns=""/><x:c xmlns:y="urn:y" y:d="3"/></x:a>'
+    ),
+    "doctype.xml": "<!DOCTYPE a><a> <b/> </a>",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark pack.py's XML condensing and compare its engines"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="path",
+        help="Unpacked document directories, packed Office files or XML files "
+        "(default: a generated .docx and .pptx)",
+    )
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=20000,
+        help="Paragraphs in the generated Word document (default: 20000)",
+    )
+    parser.add_argument(
+        "--slides",
+        type=int,
+        default=200,
+        help="Slides in the generated presentation (default: 200)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per engine; the median wall time is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--keep",
+        metavar="DIR",
+        help="Write the generated documents and extracted parts to DIR and keep them",
+    )
+    args = parser.parse_args()
+
+    assert args.paragraphs > 0, "Error: --paragraphs must be positive"
+    assert args.slides > 0, "Error: --slides must be positive"
+    assert args.repeat > 0, "Error: --repeat must be positive"
+    for path in args.paths:
+        assert Path(path).exists(), f"Error: {path} does not exist"
+
+    with contextlib.ExitStack() as stack:
+        if args.keep:
+            work_dir = Path(args.keep)
+            work_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+
+        paths = [Path(p) for p in args.paths]
+        if not paths:
+            config = {
+                "paragraphs": args.paragraphs,
+                "tracked_changes": args.paragraphs // 10,
+                "slides": args.slides,
+                "media": 0,
+                "rels": 0,
+            }
+            for file_format in ("docx", "pptx"):
+                paths.append(generate_document(file_format, work_dir, config)[0])
+
+        edge_dir = work_dir / "edge-cases"
+        edge_dir.mkdir(exist_ok=True)
+        for name, text in EDGE_CASES.items():
+            (edge_dir / name).write_text(text, encoding="utf-8")
+        paths.append(edge_dir)
+
+        xml_files = []
+        for path in paths:
+            xml_files.extend(collect_parts(path, work_dir))
+
+        total_mb = sum(f.stat().st_size for f in xml_files) / (1024 * 1024)
+        print(f"Condensing {len(xml_files)} XML parts ({total_mb:.1f} MB)")
+        results = {
+            engine: benchmark_engine(engine, xml_files, args.repeat)
+            for engine in ENGINES
+        }
+
+    print_results(results)
+
+    reference = results["minidom"]["digests"]
+    mismatches = [
+        name
+        for name, digest in results["streaming"]["digests"].items()
+        if digest != reference[name]
+    ]
+    if mismatches:
+        print(f"\nFAILED - {len(mismatches)} parts differ from the minidom engine:")
+        for name in mismatches:
+            print(f"  {name}")
+        sys.exit(1)
+    print(f"\nPASSED - All {len(xml_files)} parts are byte-identical")
+
+
+def collect_parts(path, work_dir):
+    """Return the XML parts of a directory, packed file or XML file.
+
+    Parts of packed files are extracted under work_dir.
+    """
+    if path.is_dir():
+        return sorted(
+            f
+            for f in path.rglob("*")
+            if f.is_file() and f.name.endswith((".xml", ".rels"))
+        )
+    if not zipfile.is_zipfile(path):
+        return [path]
+
+    extract_dir = work_dir / "extracted" / path.name
+    parts = []
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if name.endswith((".xml", ".rels")):
+                parts.append(Path(zf.extract(name, extract_dir)))
+    return parts
+
+
+def benchmark_engine(engine, xml_files, repeat=3):
+    """Condense every part with an engine, once per run in a fresh process.
+
+    Returns:
+        dict: Median wall time, peak RSS and the output digest of each part
+    """
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(
+                executor.submit(measure, engine, [str(f) for f in xml_files]).result()
+            )
+    print(
+        f"  {engine}: {statistics.median(r['wall_s'] for r in runs):.3f}s",
+        file=sys.stderr,
+    )
+
+    return {
+        "wall_s": statistics.median(run["wall_s"] for run in runs),
+        "slowest_part_s": runs[-1]["slowest_part_s"],
+        "peak_rss_kb": max(
+            (run["peak_rss_kb"] for run in runs if run["peak_rss_kb"]), default=None
+        ),
+        "digests": runs[-1]["digests"],
+    }
+
+
+def measure(engine, xml_files):
+    """Condense the parts once. Called in a fresh worker process."""
+    condense = ENGINES[engine]
+    wall = slowest = 0.0
+    digests = {}
+
+    for xml_file in xml_files:
+        data = Path(xml_file).read_bytes()
+        start = time.perf_counter()
+        try:
+            digests[xml_file] = hashlib.sha256(condense(data)).hexdigest()
+        except Exception as e:
+            # Both engines must reject the same parts with the same error
+            digests[xml_file] = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        wall += elapsed
+        slowest = max(slowest, elapsed)
+
+    return {
+        "wall_s": wall,
+        "slowest_part_s": slowest,
+        "peak_rss_kb": peak_rss_kb(),
+        "digests": digests,
+    }
+
+
+def print_results(results):
+    """Print a table of the engines' times, with their speedup over minidom."""
+    reference = results["minidom"]["wall_s"]
+    print(
+        f"\n{'engine':<12} {'wall (s)':>9} {'slowest part (s)':>17} "
+        f"{'peak RSS (MB)':>14} {'speedup':>8}"
+    )
+    for engine, result in results.items():
+        peak = result["peak_rss_kb"]
+        print(
+            f"{engine:<12} {result['wall_s']:>9.3f} {result['slowest_part_s']:>17.3f} "
+            f"{'-' if peak is None else f'{peak / 1024:.1f}':>14} "
+            f"{reference / result['wall_s']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
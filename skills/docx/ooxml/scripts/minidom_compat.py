@@ -0,0 +1,65 @@
+"""
+What minidom writes, for the streaming engines of pack.py and unpack.py.
+
+Both rewrite XML from expat events and must produce minidom's toxml and
+toprettyxml output byte for byte; the rules they share are defined here.
+"""
+
+import xml.dom.minidom
+
+
+class UnsupportedXML(Exception):
+    """XML that a streaming engine leaves to its minidom engine."""
+
+
+def minidom_escapes():
+    """Return the (character, reference) pairs minidom escapes in text and attributes.
+
+    Python 3.13 changed them (quotes in text are no longer escaped, and tabs
+    and line breaks in attribute values are), so they are read off minidom
+    instead of being hard-coded.
+    """
+    text_escapes, attribute_escapes = [], []
+    document = xml.dom.minidom.Document()
+    for char in '&<>"\r\n\t':
+        element = document.createElement("a")
+        element.setAttribute("b", char)
+        element.appendChild(document.createTextNode(char))
+        # <a b="...">...</a>
+        attribute_value, text = element.toxml()[len('<a b="') : -len("</a>")].split(
+            '">', 1
+        )
+        if attribute_value != char:
+            attribute_escapes.append((char, attribute_value))
+        if text != char:
+            text_escapes.append((char, text))
+    return text_escapes, attribute_escapes
+
+
+TEXT_ESCAPES, ATTRIBUTE_ESCAPES = minidom_escapes()
+
+
+def escape(value, escapes):
+    for char, reference in escapes:
+        if char in value:
+            value = value.replace(char, reference)
+    return value
+
+
+class QualifiedNames:
+    """Mixin for expat handlers, naming elements and attributes as minidom does.
+
+    Subclasses set self._names to a dict, which caches the names.
+    """
+
+    def _qualified_name(self, name):
+        # expat reports "uri local prefix", "uri local" or "local"
+        qualified_name = self._names.get(name)
+        if qualified_name is None:
+            parts = name.split(" ")
+            if len(parts) == 3:
+                qualified_name = f"{parts[2]}:{parts[1]}"
+            else:
+                qualified_name = parts[-1]
+            self._names[name] = qualified_name
+        return qualified_name
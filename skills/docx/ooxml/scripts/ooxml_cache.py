@@ -0,0 +1,19 @@
+"""
+Location of the caches of the OOXML scripts.
+
+pack.py (condensed/), unpack.py (unpacked/) and the validation baseline
+(baselines/) keep their caches in subdirectories of one directory:
+$OOXML_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/ooxml (defaulting to
+~/.cache/ooxml).
+"""
+
+import os
+from pathlib import Path
+
+
+def default_cache_dir():
+    """Directory holding the caches of pack.py, unpack.py and validation."""
+    if os.environ.get("OOXML_CACHE_DIR"):
+        return Path(os.environ["OOXML_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ooxml"
@@ -3,29 +3,116 @@
 Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting undone.
 
 Example usage:
-    python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> [--force] [--jobs N] [--no-cache] [--deterministic]
+
+Condensed parts are cached by the content hash of the pretty-printed part
+(see CondensedCache), so parts left unchanged since unpacking a file that
+was packed before aren't condensed again.
+Set $OOXML_CACHE_DIR to move the caches (see ooxml_cache.py).
 """
 
 import argparse
+import contextlib
+import hashlib
+import io
+import os
+import queue
 import shutil
+import stat
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import xml.parsers.expat
 import defusedxml.minidom
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+try:
+    from .minidom_compat import (
+        ATTRIBUTE_ESCAPES,
+        TEXT_ESCAPES,
+        QualifiedNames,
+        UnsupportedXML,
+        escape,
+    )
+    from .ooxml_cache import default_cache_dir
+except ImportError:  # Run as a script, not imported from the ooxml package
+    from minidom_compat import (
+        ATTRIBUTE_ESCAPES,
+        TEXT_ESCAPES,
+        QualifiedNames,
+        UnsupportedXML,
+        escape,
+    )
+    from ooxml_cache import default_cache_dir
+
+try:
+    import uno  # Python-UNO bridge, shipped with LibreOffice
+except ImportError:
+    uno = None
+
+# Media that is already compressed; deflating it again only costs time
+STORED_EXTENSIONS = {
+    ".gif",
+    ".jpeg",
+    ".jpg",
+    ".m4a",
+    ".m4v",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".png",
+    ".wdp",
+    ".webp",
+    ".wma",
+    ".wmv",
+}
+
+# Files in the unpacked directory that aren't part of the document: the state
+# file written by validate.py (validation/state.py)
+EXCLUDED_FILENAMES = {".validation_state.json"}
+
+# Timestamp of every member in deterministic mode: the earliest a zip can hold
+DETERMINISTIC_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processes for condensing the XML parts (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the cache of condensed parts",
+    )
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="Write identical bytes for identical contents "
+        "(canonical member order, fixed timestamps and permissions)",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            jobs=args.jobs,
+            cache=not args.no_cache,
+            deterministic=args.deterministic,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +129,31 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(
+    input_dir,
+    output_file,
+    validate=False,
+    jobs=1,
+    soffice_pool=None,
+    cache=True,
+    cache_dir=None,
+    deterministic=False,
+):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        jobs: Processes for condensing the XML parts (0 = one per CPU)
+        soffice_pool: SofficePool to validate with, instead of starting
+            soffice for this file only
+        cache: Reuse and store condensed parts in the cache
+        cache_dir: Cache directory (default: default_cache_dir())
+        deterministic: Make the output depend on the contents only:
+            [Content_Types].xml first and the other parts sorted by name,
+            with fixed timestamps and permissions, all deflated at zlib's
+            default level
 
     Returns:
         bool: True if successful, False if validation failed
@@ -61,34 +166,96 @@ def pack_document(input_dir, output_file, validate=False):
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    # Stream every file straight into the archive: XML is condensed in
+    # memory, other files are copied as they are
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    files = [
+        f
+        for f in input_dir.rglob("*")
+        if f.is_file() and f.name not in EXCLUDED_FILENAMES
+    ]
+    if deterministic:
+        files.sort(key=lambda f: _member_sort_key(f.relative_to(input_dir)))
+    xml_files = [f for f in files if f.name.endswith((".xml", ".rels"))]
+
+    condensed_cache = CondensedCache(cache_dir) if cache else None
+    workers = min(jobs or os.cpu_count() or 1, len(xml_files))
+    # Written to a temporary file that replaces output_file once complete, so
+    # a part that fails to condense leaves a previous output_file untouched
+    tmp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    try:
+        with contextlib.ExitStack() as stack:
+            zf = stack.enter_context(
+                zipfile.ZipFile(tmp_file, "w", zipfile.ZIP_DEFLATED)
+            )
+            if workers > 1:
+                # Parts are condensed in the pool while they are written in order
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                condensed = executor.map(
+                    _condense_file, xml_files, repeat(condensed_cache)
+                )
+            else:
+                condensed = map(_condense_file, xml_files, repeat(condensed_cache))
+
+            for f in files:
+                arcname = f.relative_to(input_dir).as_posix()
+                if f.suffix.lower() in STORED_EXTENSIONS:
+                    compress_type = zipfile.ZIP_STORED
+                else:
+                    compress_type = zipfile.ZIP_DEFLATED
+
+                if f.name.endswith((".xml", ".rels")):
+                    info = _zip_info(f, arcname, compress_type, deterministic)
+                    zf.writestr(info, next(condensed))
+                elif deterministic:
+                    info = _zip_info(f, arcname, compress_type, deterministic)
+                    info.file_size = f.stat().st_size  # Lets zipfile choose ZIP64
+                    with open(f, "rb") as src, zf.open(info, "w") as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                else:
+                    zf.write(f, arcname, compress_type=compress_type)
+        os.replace(tmp_file, output_file)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            tmp_file.unlink()
+
+    if condensed_cache is not None:
+        condensed_cache.evict()
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file, soffice_pool=soffice_pool):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
-def validate_document(doc_path):
-    """Validate document by converting to HTML with soffice."""
+def _zip_info(f, arcname, compress_type, deterministic):
+    """ZipInfo for a member, with fixed metadata in deterministic mode."""
+    if deterministic:
+        info = zipfile.ZipInfo(arcname, date_time=DETERMINISTIC_DATE_TIME)
+        info.create_system = 3  # Unix, whatever the platform
+        info.external_attr = (stat.S_IFREG | 0o644) << 16
+    else:
+        info = zipfile.ZipInfo.from_file(f, arcname)
+    info.compress_type = compress_type
+    return info
+
+
+def _member_sort_key(relative_path):
+    """Canonical member order: [Content_Types].xml, then by part name."""
+    name = relative_path.as_posix()
+    return (name != "[Content_Types].xml", name)
+
+
+def validate_document(doc_path, soffice_pool=None):
+    """Validate document by converting to HTML with soffice.
+
+    Args:
+        doc_path: Path to the packed Office file
+        soffice_pool: SofficePool to convert with (default: run soffice once)
+    """
     # Determine the correct filter based on file extension
     match doc_path.suffix.lower():
         case ".docx":
@@ -100,29 +267,21 @@ def validate_document(doc_path):
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
+            if soffice_pool is not None:
+                error_msg = soffice_pool.convert(doc_path, filter_name, temp_dir)
+            else:
+                error_msg = _convert_with_soffice(
+                    "soffice", doc_path, filter_name, temp_dir, timeout=10
+                )
             if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
+                error_msg = error_msg or "Document validation failed"
                 print(f"Validation error: {error_msg}", file=sys.stderr)
                 return False
             return True
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             print("Validation error: Timeout during conversion", file=sys.stderr)
             return False
         except Exception as e:
@@ -130,10 +289,275 @@ def validate_document(doc_path):
             return False
 
 
+def _convert_with_soffice(
+    soffice, doc_path, filter_name, out_dir, timeout, profile_dir=None
+):
+    """Convert a document with a soffice process of its own.
+
+    Returns:
+        str: soffice's error output
+    """
+    command = [soffice, "--headless"]
+    if profile_dir is not None:
+        command.append(f"-env:UserInstallation={Path(profile_dir).as_uri()}")
+    command += ["--convert-to", filter_name, "--outdir", str(out_dir), str(doc_path)]
+    result = subprocess.run(command, capture_output=True, timeout=timeout, text=True)
+    return result.stderr.strip()
+
+
+class SofficePool:
+    """Long-lived headless LibreOffice instances for validating packed files.
+
+    Starting soffice dominates the cost of a conversion, and a cold start
+    often exceeds validate_document's timeout. A pool keeps up to `size`
+    instances listening on UNO pipes and converts through them, so reuse it
+    across pack_document calls:
+
+        with SofficePool() as pool:
+            for unpacked_dir, output_file in documents:
+                pack_document(unpacked_dir, output_file, validate=True, soffice_pool=pool)
+
+    Instances are started on first use, each with a profile directory of its
+    own, and are checked before every conversion: one that crashed or stopped
+    responding is restarted. A conversion that takes longer than `timeout`
+    seconds kills its instance, which is restarted for the next one.
+
+    Without the Python-UNO bridge (the uno module that ships with
+    LibreOffice), each conversion runs a soffice process of its own, still
+    with the pool's timeout and profiles, which are only initialized once.
+    """
+
+    def __init__(self, size=1, timeout=30, startup_timeout=60, soffice="soffice"):
+        """
+        Args:
+            size: Maximum number of conversions running at once
+            timeout: Seconds a conversion may take
+            startup_timeout: Seconds an instance may take to start listening
+            soffice: soffice executable
+        """
+        self.timeout = timeout
+        self._profile_root = Path(tempfile.mkdtemp(prefix="soffice-pool-"))
+        self._instances = [
+            _SofficeInstance(soffice, self._profile_root / str(i), startup_timeout)
+            for i in range(size)
+        ]
+        self._idle = queue.Queue()
+        for instance in self._instances:
+            self._idle.put(instance)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def convert(self, doc_path, filter_name, out_dir):
+        """Convert a document into out_dir, waiting for a free instance.
+
+        Args:
+            doc_path: Path to the document
+            filter_name: soffice --convert-to argument, e.g. "html:HTML"
+            out_dir: Directory to write <stem>.<extension> to
+
+        Returns:
+            str: Error message from the conversion, or "" if none
+
+        Raises:
+            FileNotFoundError: If soffice is not installed
+            TimeoutError: If the conversion took longer than the timeout
+        """
+        instance = self._idle.get()
+        try:
+            return instance.convert(doc_path, filter_name, out_dir, self.timeout)
+        finally:
+            self._idle.put(instance)
+
+    def close(self):
+        """Stop the instances and remove their profiles."""
+        for instance in self._instances:
+            instance.stop()
+        shutil.rmtree(self._profile_root, ignore_errors=True)
+
+
+class _SofficeInstance:
+    """One soffice process of a SofficePool, reached over a UNO pipe."""
+
+    def __init__(self, soffice, profile_dir, startup_timeout):
+        self.soffice = soffice
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.pipe_name = f"soffice-pool-{os.getpid()}-{id(self)}"
+        self.process = None
+        self.desktop = None
+
+    def convert(self, doc_path, filter_name, out_dir, timeout):
+        if uno is None:
+            return _convert_with_soffice(
+                self.soffice,
+                doc_path,
+                filter_name,
+                out_dir,
+                timeout,
+                profile_dir=self.profile_dir,
+            )
+
+        if not self.is_healthy():
+            self.stop()
+            self.start()
+
+        # UNO calls can't be interrupted, so the conversion runs in a thread
+        # and the instance is killed if it doesn't finish in time
+        outcome = {}
+        thread = threading.Thread(
+            target=self._convert,
+            args=(doc_path, filter_name, out_dir, outcome),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            self.stop(kill=True)
+            raise TimeoutError(f"Conversion took longer than {timeout}s")
+
+        if "error" in outcome:
+            # The instance may have crashed on this document
+            if not self.is_healthy():
+                self.stop()
+            return outcome["error"]
+        return ""
+
+    def _convert(self, doc_path, filter_name, out_dir, outcome):
+        extension, _, uno_filter = filter_name.partition(":")
+        output_file = Path(out_dir) / f"{Path(doc_path).stem}.{extension}"
+        try:
+            document = self.desktop.loadComponentFromURL(
+                Path(doc_path).absolute().as_uri(),
+                "_blank",
+                0,
+                (_property_value("Hidden", True),),
+            )
+            if document is None:
+                outcome["error"] = "soffice could not open the document"
+                return
+            try:
+                document.storeToURL(
+                    output_file.absolute().as_uri(),
+                    (_property_value("FilterName", uno_filter),),
+                )
+            finally:
+                document.close(True)
+        except Exception as e:
+            outcome["error"] = str(e) or type(e).__name__
+
+    def start(self):
+        """Start soffice and connect to it."""
+        self.process = subprocess.Popen(
+            [
+                self.soffice,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={Path(self.profile_dir).as_uri()}",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+                )
+                break
+            except Exception:
+                # Not listening yet
+                if self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("soffice exited during startup")
+                if time.monotonic() > deadline:
+                    self.stop(kill=True)
+                    raise TimeoutError("soffice did not start in time")
+                time.sleep(0.1)
+
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def is_healthy(self):
+        """Whether soffice is running and answers a UNO call."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self.desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def stop(self, kill=False):
+        """Stop soffice, asking it to terminate first unless kill is set."""
+        if self.process is None:
+            return
+        if not kill and self.desktop is not None:
+            try:
+                self.desktop.terminate()
+                self.process.wait(timeout=10)
+            except Exception:
+                pass
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        self.desktop = None
+
+
+def _property_value(name, value):
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
 def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
+    """Strip unnecessary whitespace and remove comments, rewriting the file."""
+    xml_file = Path(xml_file)
+    xml_file.write_bytes(condense_xml_bytes(xml_file.read_bytes()))
+
+
+def condense_xml_bytes(data):
+    """Strip unnecessary whitespace and remove comments from serialized XML.
+
+    Whitespace-only text and comments are removed from every element except
+    text elements (w:t, a:t, ...), whose content is kept as it is. The input
+    is read as UTF-8 whatever its declaration says: unpack.py declares ascii,
+    but edited parts may contain raw UTF-8 text.
+
+    The XML is rewritten from a stream of expat events, with the output of the
+    minidom engine byte for byte but without building a DOM, which for a
+    large document.xml takes over 50 times the file size in memory. XML with
+    a DOCTYPE, or that expat rejects, goes through the minidom engine, whose
+    defusedxml parser refuses entity declarations and reports the error.
+
+    Returns:
+        bytes: The condensed XML, UTF-8 encoded
+    """
+    try:
+        return _StreamingCondenser().condense(data)
+    except (UnsupportedXML, xml.parsers.expat.ExpatError):
+        return condense_xml_bytes_minidom(data)
+
+
+def condense_xml_bytes_minidom(data):
+    """Reference engine of condense_xml_bytes, built on a minidom DOM."""
+    dom = defusedxml.minidom.parseString(data.decode("utf-8"))
 
     # Process each element to remove whitespace and comments
     for element in dom.getElementsByTagName("*"):
@@ -150,9 +574,226 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
+
+
+def _condense_file(xml_file, condensed_cache=None):
+    """Condense one part, in a worker process when packing in parallel."""
+    data = Path(xml_file).read_bytes()
+    if condensed_cache is None:
+        return condense_xml_bytes(data)
+
+    digest = condensed_cache.digest(data)
+    condensed = condensed_cache.get(digest)
+    if condensed is None:
+        condensed = condense_xml_bytes(data)
+        condensed_cache.put(digest, condensed)
+    return condensed
+
+
+class CondensedCache:
+    """Condensed XML parts, keyed by the SHA-256 of the uncondensed part.
+
+    A part that is unchanged since it was unpacked has the same content hash
+    as when the file was last packed, so its condensed bytes are read back
+    instead of being computed again. Entries are files in condensed/, whose
+    mtime marks their last use; beyond max_bytes, the least recently used
+    are removed by evict().
+    """
+
+    # Bump when the condensed output changes, so older entries aren't reused
+    CACHE_VERSION = 1
+
+    MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=MAX_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: Cache directory (default: default_cache_dir())
+            max_bytes: Total size of the cached parts to keep
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    @property
+    def _parts_dir(self):
+        return self.cache_dir / "condensed"
+
+    def digest(self, data):
+        """Return the cache key of a part.
+
+        The condensed output depends on how this Python's minidom escapes
+        text, so that is part of the key along with the version.
+        """
+        digest = hashlib.sha256(
+            f"{self.CACHE_VERSION} {TEXT_ESCAPES} {ATTRIBUTE_ESCAPES}\n".encode()
+        )
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, digest):
+        """Return the condensed bytes of a part, or None if not cached."""
+        entry = self._parts_dir / digest
+        try:
+            condensed = entry.read_bytes()
+            os.utime(entry)  # Mark as recently used
+            return condensed
+        except OSError:
+            return None
+
+    def put(self, digest, condensed):
+        """Store the condensed bytes of a part (best effort)."""
+        entry = self._parts_dir / digest
+        try:
+            self._parts_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = entry.with_name(f"{digest}.{os.getpid()}.tmp")
+            tmp_file.write_bytes(condensed)
+            os.replace(tmp_file, entry)
+        except OSError:
+            pass  # Caching is best effort (e.g. read-only home directory)
+
+    def evict(self):
+        """Remove the least recently used parts beyond max_bytes."""
+        try:
+            entries = []
+            with os.scandir(self._parts_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            total -= size
+
+
+class _StreamingCondenser(QualifiedNames):
+    """Condenses XML in a single expat pass, writing what minidom's toxml would.
+
+    Mirrors how minidom builds its tree: consecutive character data forms one
+    text node, CDATA sections with content are nodes of their own, and
+    namespace declarations come before the other attributes of an element.
+    Text is buffered until the next markup decides whether it is kept, and a
+    start tag is closed with "/>" if the element ends up without children.
+    """
+
+    def __init__(self):
+        self._output = io.StringIO()
+        self._write = self._output.write
+        self._elements = []  # Qualified names of the open elements
+        self._tag_open = False  # Whether the last start tag still lacks its ">"
+        self._text = []
+        self._cdata = None
+        self._namespaces = []
+        self._names = {}
+
+    def condense(self, data):
+        """Condense UTF-8 encoded XML and return it as UTF-8 bytes."""
+        self._write('<?xml version="1.0" encoding="UTF-8"?>')
+        parser = xml.parsers.expat.ParserCreate("utf-8", " ")
+        parser.namespace_prefixes = True
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.buffer_size = 1 << 16
+        parser.StartDoctypeDeclHandler = self._doctype
+        parser.StartNamespaceDeclHandler = self._start_namespace
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._character_data
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+        parser.Parse(data, True)
+
+        return self._output.getvalue().encode("utf-8", "xmlcharrefreplace")
+
+    def _add_child(self, markup):
+        if self._tag_open:
+            self._write(">")
+            self._tag_open = False
+        self._write(markup)
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text = []
+        if self._elements and (text.strip() or self._elements[-1].endswith(":t")):
+            self._add_child(escape(text, TEXT_ESCAPES))
+
+    def _doctype(self, *args):
+        raise UnsupportedXML("DOCTYPE")
+
+    def _start_namespace(self, prefix, uri):
+        name = f"xmlns:{prefix}" if prefix else "xmlns"
+        self._namespaces.append(f' {name}="{escape(uri or "", ATTRIBUTE_ESCAPES)}"')
+
+    def _start_element(self, name, attributes):
+        self._flush_text()
+        qualified_name = self._qualified_name(name)
+        markup = [f"<{qualified_name}"]
+        if self._namespaces:
+            markup.extend(self._namespaces)
+            self._namespaces = []
+        for i in range(0, len(attributes), 2):
+            markup.append(
+                f' {self._qualified_name(attributes[i])}="'
+                f'{escape(attributes[i + 1], ATTRIBUTE_ESCAPES)}"'
+            )
+        if self._elements:
+            self._add_child("".join(markup))
+        else:
+            self._write("".join(markup))
+        self._elements.append(qualified_name)
+        self._tag_open = True
+
+    def _end_element(self, name):
+        self._flush_text()
+        qualified_name = self._elements.pop()
+        if self._tag_open:
+            self._write("/>")
+            self._tag_open = False
+        else:
+            self._write(f"</{qualified_name}>")
+
+    def _character_data(self, data):
+        if self._cdata is None:
+            self._text.append(data)
+        else:
+            self._cdata.append(data)
+
+    def _start_cdata(self):
+        # An empty section adds no node, so it doesn't split the text around it
+        self._cdata = []
+
+    def _end_cdata(self):
+        cdata = "".join(self._cdata)
+        self._cdata = None
+        if cdata:
+            self._flush_text()
+            self._add_child(f"<![CDATA[{cdata}]]>")
+
+    def _comment(self, data):
+        self._flush_text()
+        if not self._elements:
+            self._write(f"<!--{data}-->")
+        elif self._elements[-1].endswith(":t"):
+            self._add_child(f"<!--{data}-->")
+
+    def _processing_instruction(self, target, data):
+        self._flush_text()
+        markup = f"<?{target} {data}?>"
+        if self._elements:
+            self._add_child(markup)
+        else:
+            self._write(markup)
 
 
 if __name__ == "__main__":
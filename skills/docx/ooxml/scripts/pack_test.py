@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from pack import pack_document
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    '  <Default Extension="xml" ContentType="application/xml"/>\n'
+    "</Types>\n"
+)
+
+DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n'
+    "  <w:body>\n"
+    "    <w:p>\n"
+    "      <w:r>\n"
+    "        <w:t>Hello</w:t>\n"
+    "      </w:r>\n"
+    "    </w:p>\n"
+    "  </w:body>\n"
+    "</w:document>\n"
+)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestPackDocument(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.input_dir = self.work_dir / "unpacked"
+        (self.input_dir / "word").mkdir(parents=True)
+        (self.input_dir / "[Content_Types].xml").write_text(CONTENT_TYPES)
+        (self.input_dir / "word" / "document.xml").write_text(DOCUMENT)
+        self.output_file = self.work_dir / "out.docx"
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_condenses_parts(self):
+        """Test that XML parts are packed without their formatting"""
+        self.assertTrue(pack_document(self.input_dir, self.output_file, cache=False))
+        with zipfile.ZipFile(self.output_file) as zf:
+            document = zf.read("word/document.xml").decode()
+        self.assertIn(
+            "<w:body><w:p><w:r><w:t>Hello</w:t></w:r></w:p></w:body>", document
+        )
+
+    def test_malformed_part_keeps_previous_output(self):
+        """Test that a part failing to condense leaves the previous output untouched"""
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                (self.input_dir / "word" / "document.xml").write_text(DOCUMENT)
+                pack_document(self.input_dir, self.output_file, cache=False)
+                previous = self.output_file.read_bytes()
+
+                (self.input_dir / "word" / "document.xml").write_text(
+                    DOCUMENT.replace("</w:body>", "")
+                )
+                with self.assertRaises(Exception):
+                    pack_document(
+                        self.input_dir, self.output_file, jobs=jobs, cache=False
+                    )
+
+                self.assertEqual(self.output_file.read_bytes(), previous)
+                self.assertEqual(
+                    sorted(f.name for f in self.work_dir.iterdir()),
+                    ["out.docx", "unpacked"],
+                )
+
+    def test_malformed_part_leaves_no_output(self):
+        """Test that no partial archive is left when there was no previous output"""
+        (self.input_dir / "word" / "document.xml").write_text("<w:document>")
+        with self.assertRaises(Exception):
+            pack_document(self.input_dir, self.output_file, cache=False)
+        self.assertEqual([f.name for f in self.work_dir.iterdir()], ["unpacked"])
+
+
+if __name__ == "__main__":
+    unittest.main()
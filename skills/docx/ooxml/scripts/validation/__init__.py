@@ -3,13 +3,21 @@ Validation modules for Word document processing.
 """
 
 from .base import BaseSchemaValidator
+from .diff import word_diff
 from .docx import DOCXSchemaValidator
+from .index import PackageIndex
+from .package import DirectoryPackage, ZipPackage, open_package
 from .pptx import PPTXSchemaValidator
 from .redlining import RedliningValidator
 
 __all__ = [
     "BaseSchemaValidator",
+    "DirectoryPackage",
     "DOCXSchemaValidator",
+    "PackageIndex",
     "PPTXSchemaValidator",
     "RedliningValidator",
+    "ZipPackage",
+    "open_package",
+    "word_diff",
 ]
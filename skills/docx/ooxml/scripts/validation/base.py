@@ -2,11 +2,93 @@
 Base validator with common validation logic for document files.
 """
 
+import copy
+import functools
+import hashlib
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import lxml.etree
 
+from .baseline import OriginalBaseline, file_sha256
+from .index import PackageIndex
+from .package import DirectoryPackage, open_package
+from .state import STATE_FILENAME, ValidationState
+
+# Directory containing the bundled XSD schemas
+SCHEMAS_DIR = Path(__file__).parent.parent.parent / "schemas"
+
+# Compiled XSD schemas shared by every validator in this process, keyed by
+# resolved schema path. Compiling wml.xsd/pml.xsd and their imports is the
+# most expensive step of a validation run, so each schema is compiled once.
+_compiled_schemas = {}
+_compiled_schemas_lock = threading.Lock()
+
+
+def get_compiled_schema(schema_path):
+    """Return the compiled XMLSchema for a schema file, compiling it on first use.
+
+    Args:
+        schema_path: Path to the .xsd file
+
+    Returns:
+        lxml.etree.XMLSchema: The compiled schema shared by all callers
+    """
+    schema_path = Path(schema_path).resolve()
+    schema = _compiled_schemas.get(schema_path)
+    if schema is None:
+        with _compiled_schemas_lock:
+            schema = _compiled_schemas.get(schema_path)
+            if schema is None:
+                with open(schema_path, "rb") as xsd_file:
+                    parser = lxml.etree.XMLParser()
+                    xsd_doc = lxml.etree.parse(
+                        xsd_file, parser=parser, base_url=str(schema_path)
+                    )
+                schema = lxml.etree.XMLSchema(xsd_doc)
+                _compiled_schemas[schema_path] = schema
+    return schema
+
+
+@functools.lru_cache(maxsize=None)
+def schemas_digest(schemas_dir=SCHEMAS_DIR):
+    """Return the hex SHA-256 digest of every file in a schemas directory.
+
+    Persisted validation results are keyed by it, so they are not reused
+    once a bundled schema changes.
+    """
+    digest = hashlib.sha256()
+    for schema_file in sorted(Path(schemas_dir).rglob("*")):
+        if schema_file.is_file():
+            digest.update(schema_file.relative_to(schemas_dir).as_posix().encode())
+            digest.update(b"\0")
+            digest.update(schema_file.read_bytes())
+    return digest.hexdigest()
+
+
+# Template tags ({{ ... }}) stripped from text before XSD validation
+_TEMPLATE_TAG = re.compile(r"\{\{[^}]*\}\}")
+_TEXT_WITH_TEMPLATE_TAG = lxml.etree.XPath(".//text()[contains(., '{{')]")
+
+# Validator owned by each XSD worker process (see _validate_files_xsd_parallel)
+_worker_validator = None
+
+
+def _init_xsd_worker(validator_class, package_path, original_file):
+    """Create the per-process validator; its compiled schemas stay cached."""
+    global _worker_validator
+    _worker_validator = validator_class(package_path, original_file, cache=False)
+
+
+def _validate_file_xsd_in_worker(xml_file):
+    """Validate one file against its XSD schema in a worker process."""
+    return _worker_validator._validate_single_file_xsd(
+        xml_file, _worker_validator.unpacked_dir
+    )
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,35 +185,213 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
-        self.unpacked_dir = Path(unpacked_dir).resolve()
-        self.original_file = Path(original_file)
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file,
+        verbose=False,
+        cache=True,
+        max_workers=None,
+        incremental=False,
+    ):
+        """
+        Args:
+            unpacked_dir: Unpacked document directory, or a packed Office file
+                whose parts are then read straight from the archive
+            original_file: Original Office file whose XSD errors are tolerated,
+                or None to report every XSD error
+            verbose: Enable verbose output
+            cache: Persist the XSD baseline of the original file across runs
+            max_workers: Processes for XSD validation (None or 1: in-process,
+                0: one per CPU)
+            incremental: Only re-check parts changed since the last passing
+                run (unpacked directories only)
+        """
+        # Parts are accessed through the package; for packed files,
+        # unpacked_dir is a virtual root that part paths are relative to
+        self.package = open_package(unpacked_dir)
+        self.unpacked_dir = self.package.root
+        self.original_file = Path(original_file) if original_file else None
         self.verbose = verbose
+        self.cache = cache
+        self.max_workers = max_workers
+        self.incremental = incremental
 
         # Set schemas directory
-        self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
+        self.schemas_dir = SCHEMAS_DIR
+
+        # Parts, content types and relationships, from one walk of the package
+        self.index = PackageIndex(self.package, self._parse_xml)
 
         # Get all XML and .rels files
         patterns = ["*.xml", "*.rels"]
-        self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
-        ]
+        self.xml_files = [f for pattern in patterns for f in self.index.rglob(pattern)]
 
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+        # Parts the per-part checks look at (all of them unless incremental)
+        self.files_to_check = self.xml_files
+        self._validation_state = None
+
+        # Parsed trees shared by all checks, keyed by file path
+        self._tree_cache = {}
+        self.parse_count = 0
+        self.bytes_read = 0
+
+        # XSD errors of the original document, computed on demand
+        self._original_baseline = None
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
 
+    @classmethod
+    def preload_schemas(cls):
+        """Compile every schema in SCHEMA_MAPPINGS ahead of the first validation.
+
+        Useful at process startup (e.g. in long-lived workers) so no validation
+        run pays the compilation cost. Schemas that fail to compile are skipped
+        here; the error is reported when a file using them is validated.
+
+        Returns:
+            int: Number of distinct schemas compiled
+        """
+        compiled = 0
+        for schema_path in {SCHEMAS_DIR / p for p in cls.SCHEMA_MAPPINGS.values()}:
+            try:
+                get_compiled_schema(schema_path)
+                compiled += 1
+            except Exception:
+                continue
+        return compiled
+
+    def clear_cache(self):
+        """Drop all parsed trees so the next check re-reads files from disk."""
+        self._tree_cache.clear()
+        self.index.invalidate()
+
+    def close(self):
+        """Release the package (the archive handle of a packed file)."""
+        self.package.close()
+
+    @property
+    def results_key(self):
+        """What persisted results (XSD baselines, validation state) depend on.
+
+        Results stored under another validator or other schemas are not reused.
+        """
+        return {
+            "validator": type(self).__name__,
+            "schemas": schemas_digest(self.schemas_dir),
+        }
+
+    def select_files_to_check(self):
+        """Choose the parts the per-part checks look at in this run.
+
+        Without incremental validation this is every part. Otherwise the parts
+        are hashed and compared with the state saved by the last passing run:
+        changed parts are checked along with the .rels files describing them,
+        the parts described by changed .rels files, and [Content_Types].xml.
+        Checks spanning the whole package (references, content types of
+        media, paragraph counts, ...) always look at everything.
+        """
+        self.files_to_check = self.xml_files
+        self._validation_state = None
+        # The state file lives in the unpacked directory
+        if not self.incremental or not isinstance(self.package, DirectoryPackage):
+            return
+
+        state = ValidationState(
+            self.unpacked_dir,
+            key={
+                **self.results_key,
+                "original": file_sha256(self.original_file)
+                if self.original_file
+                else None,
+            },
+        )
+        self._validation_state = state
+        changed = state.changed_files(self.xml_files)
+        content_types_file = self.unpacked_dir / "[Content_Types].xml"
+
+        # Content types affect every part
+        if not state.has_previous_run or content_types_file in changed:
+            return
+
+        dirty = {content_types_file}
+        for xml_file in changed:
+            dirty.add(xml_file)
+            if xml_file.suffix == ".rels":
+                # e.g. word/_rels/document.xml.rels -> word/document.xml
+                dirty.add(xml_file.parent.parent / xml_file.name[: -len(".rels")])
+            else:
+                dirty.add(xml_file.parent / "_rels" / f"{xml_file.name}.rels")
+
+        self.files_to_check = [f for f in self.xml_files if f in dirty]
+        if self.verbose:
+            print(
+                f"Incremental validation: checking {len(self.files_to_check)} "
+                f"of {len(self.xml_files)} files changed since the last passing run"
+            )
+
+    def save_validation_state(self):
+        """Record the parts of a passing run for the next incremental run."""
+        if self._validation_state is not None:
+            self._validation_state.save()
+
+    def _recorded_result(self, xml_file, name):
+        """Result of a check recorded for a part skipped in this run, else None."""
+        if self._validation_state is None or xml_file in self.files_to_check:
+            return None
+        return self._validation_state.results(xml_file).get(name)
+
+    def _record_result(self, xml_file, **results):
+        if self._validation_state is not None:
+            self._validation_state.record(xml_file, **results)
+
+    def _parse_xml(self, xml_file):
+        """Return the parsed tree for an XML file, reading it only on first use.
+
+        The returned tree is shared between checks and must not be modified;
+        use _copy_xml() to get a private copy. Parse errors are cached as well
+        and re-raised on every call.
+
+        Args:
+            xml_file: Path to the XML file
+
+        Returns:
+            lxml.etree._ElementTree: The parsed (read-only) tree
+        """
+        cached = self._tree_cache.get(xml_file)
+        if cached is None:
+            try:
+                data = self.package.read_bytes(xml_file)
+                self.bytes_read += len(data)
+                self.parse_count += 1
+                cached = lxml.etree.fromstring(
+                    data, base_url=str(xml_file)
+                ).getroottree()
+            except Exception as e:
+                cached = e
+            self._tree_cache[xml_file] = cached
+
+        if isinstance(cached, Exception):
+            raise cached
+        return cached
+
+    def _copy_xml(self, xml_file):
+        """Return a private copy of a cached tree that checks may modify."""
+        return copy.deepcopy(self._parse_xml(xml_file))
+
     def validate_xml(self):
         """Validate that all XML files are well-formed."""
         errors = []
 
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             try:
                 # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
+                self._parse_xml(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -157,9 +417,9 @@ class BaseSchemaValidator:
         """Validate that namespace prefixes in Ignorable attributes are declared."""
         errors = []
 
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self._parse_xml(xml_file).getroot()
                 declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
 
                 for attr_val in [
@@ -188,9 +448,18 @@ class BaseSchemaValidator:
         errors = []
         global_ids = {}  # Track globally unique IDs across all files
 
-        for xml_file in self.xml_files:
+        # Globally unique IDs in unchanged parts can only collide with a part
+        # being checked that declares such IDs; in that case check everything
+        files = self.files_to_check
+        if files is not self.xml_files and any(
+            self._has_global_ids(xml_file) for xml_file in files
+        ):
+            files = self.xml_files
+
+        for xml_file in files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                # Work on a copy since AlternateContent is stripped below
+                root = self._copy_xml(xml_file).getroot()
                 file_ids = {}  # Track IDs that must be unique within this file
 
                 # Remove all mc:AlternateContent elements from the tree
@@ -274,6 +543,22 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
+    def _has_global_ids(self, xml_file):
+        """Whether a part contains elements whose IDs must be globally unique."""
+        global_tags = {
+            tag
+            for tag, (_, scope) in self.UNIQUE_ID_REQUIREMENTS.items()
+            if scope == "global"
+        }
+        try:
+            root = self._parse_xml(xml_file).getroot()
+        except Exception:
+            return False
+        return any(
+            isinstance(elem.tag, str) and elem.tag.split("}")[-1].lower() in global_tags
+            for elem in root.iter()
+        )
+
     def validate_file_references(self):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
@@ -281,7 +566,7 @@ class BaseSchemaValidator:
         errors = []
 
         # Find all .rels files
-        rels_files = list(self.unpacked_dir.rglob("*.rels"))
+        rels_files = self.index.rglob("*.rels")
 
         if not rels_files:
             if self.verbose:
@@ -290,13 +575,13 @@ class BaseSchemaValidator:
 
         # Get all files in the unpacked directory (excluding reference files)
         all_files = []
-        for file_path in self.unpacked_dir.rglob("*"):
+        for file_path in self.index.parts:
             if (
-                file_path.is_file()
-                and file_path.name != "[Content_Types].xml"
+                file_path.name != "[Content_Types].xml"
+                and file_path.name != STATE_FILENAME
                 and not file_path.name.endswith(".rels")
             ):  # This file is not referenced by .rels
-                all_files.append(file_path.resolve())
+                all_files.append(file_path)
 
         # Track all files that are referenced by any .rels file
         all_referenced_files = set()
@@ -309,44 +594,19 @@ class BaseSchemaValidator:
         # Check each .rels file
         for rels_file in rels_files:
             try:
-                # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-
-                # Get the directory where this .rels file is located
-                rels_dir = rels_file.parent
-
-                # Find all relationships and their targets
-                referenced_files = set()
+                # Relationships with their targets resolved by the index
                 broken_refs = []
 
-                for rel in rels_root.findall(
-                    ".//ns:Relationship",
-                    namespaces={"ns": self.PACKAGE_RELATIONSHIPS_NAMESPACE},
-                ):
-                    target = rel.get("Target")
+                for rel in self.index.relationships(rels_file):
+                    target = rel["target"]
                     if target and not target.startswith(
                         ("http", "mailto:")
                     ):  # Skip external URLs
-                        # Resolve the target path relative to the .rels file location
-                        if rels_file.name == ".rels":
-                            # Root .rels file - targets are relative to unpacked_dir
-                            target_path = self.unpacked_dir / target
+                        # Check that the resolved target is a part of the package
+                        if rel["target_part"] in self.index:
+                            all_referenced_files.add(rel["target_part"])
                         else:
-                            # Other .rels files - targets are relative to their parent's parent
-                            # e.g., word/_rels/document.xml.rels -> targets relative to word/
-                            base_dir = rels_dir.parent
-                            target_path = base_dir / target
-
-                        # Normalize the path and check if it exists
-                        try:
-                            target_path = target_path.resolve()
-                            if target_path.exists() and target_path.is_file():
-                                referenced_files.add(target_path)
-                                all_referenced_files.add(target_path)
-                            else:
-                                broken_refs.append((target, rel.sourceline))
-                        except (OSError, ValueError):
-                            broken_refs.append((target, rel.sourceline))
+                            broken_refs.append((target, rel["line"]))
 
                 # Report broken references
                 if broken_refs:
@@ -390,12 +650,10 @@ class BaseSchemaValidator:
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             # Skip .rels files themselves
             if xml_file.suffix == ".rels":
                 continue
@@ -406,25 +664,22 @@ class BaseSchemaValidator:
             rels_file = rels_dir / f"{xml_file.name}.rels"
 
             # Skip if there's no corresponding .rels file (that's okay)
-            if not rels_file.exists():
+            if rels_file not in self.index:
                 continue
 
             try:
-                # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                # Get valid relationship IDs and their types from the .rels file
                 rid_to_type = {}
 
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rid = rel.get("Id")
-                    rel_type = rel.get("Type", "")
+                for rel in self.index.relationships(rels_file):
+                    rid = rel["id"]
+                    rel_type = rel["type"]
                     if rid:
                         # Check for duplicate rIds
                         if rid in rid_to_type:
                             rels_rel_path = rels_file.relative_to(self.unpacked_dir)
                             errors.append(
-                                f"  {rels_rel_path}: Line {rel.sourceline}: "
+                                f"  {rels_rel_path}: Line {rel['line']}: "
                                 f"Duplicate relationship ID '{rid}' (IDs must be unique)"
                             )
                         # Extract just the type name from the full URL
@@ -434,7 +689,7 @@ class BaseSchemaValidator:
                         rid_to_type[rid] = type_name
 
                 # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
+                xml_root = self._parse_xml(xml_file).getroot()
 
                 # Find all elements with r:id attributes
                 for elem in xml_root.iter():
@@ -525,31 +780,15 @@ class BaseSchemaValidator:
 
         # Find [Content_Types].xml file
         content_types_file = self.unpacked_dir / "[Content_Types].xml"
-        if not content_types_file.exists():
+        if content_types_file not in self.index:
             print("FAILED - [Content_Types].xml file not found")
             return False
 
         try:
-            # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
-            declared_parts = set()
-            declared_extensions = set()
-
-            # Get Override declarations (specific files)
-            for override in root.findall(
-                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Override"
-            ):
-                part_name = override.get("PartName")
-                if part_name is not None:
-                    declared_parts.add(part_name.lstrip("/"))
-
-            # Get Default declarations (by extension)
-            for default in root.findall(
-                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Default"
-            ):
-                extension = default.get("Extension")
-                if extension is not None:
-                    declared_extensions.add(extension.lower())
+            # Declared parts (Override) and extensions (Default)
+            content_types = self.index.content_types
+            declared_parts = content_types["overrides"]
+            declared_extensions = content_types["defaults"]
 
             # Root elements that require content type declaration
             declarable_roots = {
@@ -576,11 +815,10 @@ class BaseSchemaValidator:
             }
 
             # Get all files in the unpacked directory
-            all_files = list(self.unpacked_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
+            all_files = self.index.parts
 
             # Check all XML files for Override declarations
-            for xml_file in self.xml_files:
+            for xml_file in self.files_to_check:
                 path_str = str(xml_file.relative_to(self.unpacked_dir)).replace(
                     "\\", "/"
                 )
@@ -593,7 +831,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self._parse_xml(xml_file).getroot().tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -648,15 +886,23 @@ class BaseSchemaValidator:
         Returns:
             tuple: (is_valid, new_errors_set) where is_valid is True/False/None (skipped)
         """
-        # Resolve both paths to handle symlinks
-        xml_file = Path(xml_file).resolve()
-        unpacked_dir = self.unpacked_dir.resolve()
+        # Resolve the path to handle symlinks
+        xml_file = self.package.normalize(xml_file)
 
         # Validate current file
         is_valid, current_errors = self._validate_single_file_xsd(
-            xml_file, unpacked_dir
+            xml_file, self.unpacked_dir
+        )
+        return self._compare_with_original(
+            xml_file, is_valid, current_errors, verbose=verbose
         )
 
+    def _compare_with_original(self, xml_file, is_valid, current_errors, verbose):
+        """Reduce a file's XSD result to the errors not present in the original.
+
+        Returns:
+            tuple: (is_valid, new_errors_set) where is_valid is True/False/None (skipped)
+        """
         if is_valid is None:
             return None, set()  # Skipped
         elif is_valid:
@@ -671,7 +917,7 @@ class BaseSchemaValidator:
 
         if new_errors:
             if verbose:
-                relative_path = xml_file.relative_to(unpacked_dir)
+                relative_path = xml_file.relative_to(self.unpacked_dir)
                 print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
                 for error in list(new_errors)[:3]:
                     truncated = error[:250] + "..." if len(error) > 250 else error
@@ -692,11 +938,37 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
+        # Unchanged parts passed in the last run, keep their recorded outcome
+        results = {}
         for xml_file in self.xml_files:
+            recorded = self._recorded_result(xml_file, "xsd")
+            if recorded is not None:
+                results[xml_file] = (recorded["valid"], set())
+        pending = [f for f in self.xml_files if f not in results]
+
+        try:
+            if self._xsd_worker_count(len(pending)) > 1:
+                for xml_file, (is_valid, current_errors) in zip(
+                    pending, self._validate_files_xsd_parallel(pending)
+                ):
+                    results[xml_file] = self._compare_with_original(
+                        xml_file, is_valid, current_errors, verbose=False
+                    )
+            else:
+                for xml_file in pending:
+                    results[xml_file] = self.validate_file_against_xsd(
+                        xml_file, verbose=False
+                    )
+        finally:
+            if self._original_baseline is not None:
+                self._original_baseline.close()
+
+        for xml_file in pending:
+            self._record_result(xml_file, xsd={"valid": results[xml_file][0]})
+
+        for xml_file in self.xml_files:
+            is_valid, new_file_errors = results[xml_file]
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -738,6 +1010,44 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _xsd_worker_count(self, file_count):
+        """Number of processes to use for XSD validation of file_count files."""
+        workers = self.max_workers
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        return min(workers or 1, file_count)
+
+    def _validate_files_xsd_parallel(self, xml_files):
+        """Validate files against their schemas in a process pool.
+
+        Each worker keeps its own compiled-schema cache. The largest files are
+        submitted first to balance the load, but results are returned in the
+        order of xml_files so the report is identical to a serial run.
+
+        Args:
+            xml_files: Paths of the files to validate
+
+        Returns:
+            list: (is_valid, errors_set) tuples in xml_files order
+        """
+        xml_files = [self.package.normalize(f) for f in xml_files]
+        by_size = sorted(
+            range(len(xml_files)),
+            key=lambda i: self.package.size(xml_files[i]),
+            reverse=True,
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=self._xsd_worker_count(len(xml_files)),
+            initializer=_init_xsd_worker,
+            initargs=(type(self), self.package.path, self.original_file),
+        ) as executor:
+            futures = {
+                i: executor.submit(_validate_file_xsd_in_worker, xml_files[i])
+                for i in by_size
+            }
+            return [futures[i].result() for i in range(len(xml_files))]
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -762,96 +1072,110 @@ class BaseSchemaValidator:
 
         return None
 
-    def _clean_ignorable_namespaces(self, xml_doc):
-        """Remove attributes and elements not in allowed namespaces."""
-        # Create a clean copy
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
-
-        # Remove attributes not in allowed namespaces
-        for elem in xml_copy.iter():
-            attrs_to_remove = []
-
-            for attr in elem.attrib:
-                # Check if attribute is from a namespace other than allowed ones
-                if "{" in attr:
-                    ns = attr.split("}")[0][1:]
-                    if ns not in self.OOXML_NAMESPACES:
-                        attrs_to_remove.append(attr)
+    def _prepare_for_xsd(self, xml_doc, clean_namespaces):
+        """Return a copy of a parsed part ready for XSD validation.
+
+        Works on a single copy of the tree:
+        - Template tags ({{ ... }}) are removed from text outside w:t elements.
+          They are placeholders for content replacement and aren't valid
+          content.
+        - The root's mc:Ignorable attribute is removed.
+        - If clean_namespaces is set, attributes and elements outside
+          OOXML_NAMESPACES are removed, as in Office's handling of ignorable
+          content. A removed element's tail text is removed with it.
+        Namespaces are checked once per distinct tag or attribute name and the
+        matching nodes are removed by lxml, and only text containing '{{' is
+        searched for template tags.
 
-            # Remove collected attributes
-            for attr in attrs_to_remove:
-                del elem.attrib[attr]
-
-        # Remove elements not in allowed namespaces
-        self._remove_ignorable_elements(xml_copy)
-
-        return lxml.etree.ElementTree(xml_copy)
-
-    def _remove_ignorable_elements(self, root):
-        """Recursively remove all elements not in allowed namespaces."""
-        elements_to_remove = []
+        Args:
+            xml_doc: Parsed tree of the part (not modified)
+            clean_namespaces: Remove attributes and elements in other namespaces
 
-        # Find elements to remove
-        for elem in list(root):
-            # Skip non-element nodes (comments, processing instructions, etc.)
-            if not hasattr(elem, "tag") or callable(elem.tag):
+        Returns:
+            lxml.etree._ElementTree: The cleaned copy
+        """
+        root = copy.deepcopy(xml_doc.getroot())
+        root.attrib.pop(f"{{{self.MC_NAMESPACE}}}Ignorable", None)
+
+        if clean_namespaces:
+            # Collect the distinct tags and attribute names outside the allowed
+            # namespaces, then let lxml strip them in C. strip_elements never
+            # removes the root itself and drops the tail text of what it removes.
+            allowed = self.OOXML_NAMESPACES
+
+            def is_foreign(name):
+                return name[0] == "{" and name[1 : name.index("}")] not in allowed
+
+            tags, attribute_names = set(), set()
+            for elem in root.iter(lxml.etree.Element):
+                tags.add(elem.tag)
+                attribute_names.update(elem.keys())
+            foreign_tags = [tag for tag in tags if is_foreign(tag)]
+            foreign_attributes = [name for name in attribute_names if is_foreign(name)]
+            if foreign_tags:
+                lxml.etree.strip_elements(root, *foreign_tags, with_tail=True)
+            if foreign_attributes:
+                lxml.etree.strip_attributes(root, *foreign_attributes)
+
+        for text in _TEXT_WITH_TEMPLATE_TAG(root):
+            elem = text.getparent()
+            # Skip text of comments and processing instructions, and w:t
+            # content (both its text and its tail)
+            if (
+                not isinstance(elem.tag, str)
+                or elem.tag.endswith("}t")
+                or elem.tag == "t"
+            ):
                 continue
+            if text.is_tail:
+                elem.tail = _TEMPLATE_TAG.sub("", elem.tail)
+            else:
+                elem.text = _TEMPLATE_TAG.sub("", elem.text)
 
-            tag_str = str(elem.tag)
-            if tag_str.startswith("{"):
-                ns = tag_str.split("}")[0][1:]
-                if ns not in self.OOXML_NAMESPACES:
-                    elements_to_remove.append(elem)
-                    continue
-
-            # Recursively clean child elements
-            self._remove_ignorable_elements(elem)
+        return root.getroottree()
 
-        # Remove collected elements
-        for elem in elements_to_remove:
-            root.remove(elem)
+    def _validate_single_file_xsd(self, xml_file, base_path):
+        """Validate a single XML file against XSD schema. Returns (is_valid, errors_set)."""
+        relative_path = xml_file.relative_to(base_path)
+        return self._validate_xsd(relative_path, lambda: self._parse_xml(xml_file))
 
-    def _preprocess_for_mc_ignorable(self, xml_doc):
-        """Preprocess XML to handle mc:Ignorable attribute properly."""
-        # Remove mc:Ignorable attributes before validation
-        root = xml_doc.getroot()
+    def _validate_part_bytes_xsd(self, relative_path, data):
+        """Validate raw XML bytes of a part against XSD schema. Returns (is_valid, errors_set)."""
+        return self._validate_xsd(
+            relative_path, lambda: lxml.etree.fromstring(data).getroottree()
+        )
 
-        # Remove mc:Ignorable attribute from root
-        if f"{{{self.MC_NAMESPACE}}}Ignorable" in root.attrib:
-            del root.attrib[f"{{{self.MC_NAMESPACE}}}Ignorable"]
+    def _validate_xsd(self, relative_path, load_xml_doc):
+        """Validate a part against the XSD schema for its path.
 
-        return xml_doc
+        Args:
+            relative_path: Path of the part relative to the package root
+            load_xml_doc: Callable returning the parsed tree (not modified)
 
-    def _validate_single_file_xsd(self, xml_file, base_path):
-        """Validate a single XML file against XSD schema. Returns (is_valid, errors_set)."""
-        schema_path = self._get_schema_path(xml_file)
+        Returns:
+            tuple: (is_valid, errors_set), or (None, None) if no schema applies
+        """
+        schema_path = self._get_schema_path(relative_path)
         if not schema_path:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
-
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
-
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
-
-            # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+            # Load schema (compiled once per process)
+            try:
+                schema = get_compiled_schema(schema_path)
+            except lxml.etree.XMLSchemaParseError:
+                # Without an original whose identical error cancels this out,
+                # a schema that doesn't compile says nothing about the part
+                if self.original_file is None:
+                    return None, None
+                raise
+
+            # Load and preprocess XML, cleaning ignorable namespaces if needed
+            xml_doc = self._prepare_for_xsd(
+                load_xml_doc(),
+                clean_namespaces=bool(relative_path.parts)
+                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS,
+            )
 
             # Validate
             if schema.validate(xml_doc):
@@ -866,6 +1190,18 @@ class BaseSchemaValidator:
         except Exception as e:
             return False, {str(e)}
 
+    @property
+    def original_baseline(self):
+        """OriginalBaseline with the XSD errors of the original document's parts."""
+        if self._original_baseline is None:
+            self._original_baseline = OriginalBaseline(
+                self.original_file,
+                self._validate_part_bytes_xsd,
+                persist=self.cache,
+                key=self.results_key,
+            )
+        return self._original_baseline
+
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
@@ -873,78 +1209,17 @@ class BaseSchemaValidator:
             xml_file: Path to the XML file in unpacked_dir to check
 
         Returns:
-            set: Set of error messages from the original file
-        """
-        import tempfile
-        import zipfile
-
-        # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
-        xml_file = Path(xml_file).resolve()
-        unpacked_dir = self.unpacked_dir.resolve()
-        relative_path = xml_file.relative_to(unpacked_dir)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
-
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
-
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
-            )
-            return errors if errors else set()
-
-    def _remove_template_tags_from_text_nodes(self, xml_doc):
-        """Remove template tags from XML text nodes and collect warnings.
-
-        Template tags follow the pattern {{ ... }} and are used as placeholders
-        for content replacement. They should be removed from text content before
-        XSD validation while preserving XML structure.
-
-        Returns:
-            tuple: (cleaned_xml_doc, warnings_list)
+            set: Set of error messages from the original file (empty if
+            there is no original file)
         """
-        warnings = []
-        template_pattern = re.compile(r"\{\{[^}]*\}\}")
-
-        # Create a copy of the document to avoid modifying the original
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
-
-        def process_text_content(text, content_type):
-            if not text:
-                return text
-            matches = list(template_pattern.finditer(text))
-            if matches:
-                for match in matches:
-                    warnings.append(
-                        f"Found template tag in {content_type}: {match.group()}"
-                    )
-                return template_pattern.sub("", text)
-            return text
-
-        # Process all text nodes in the document
-        for elem in xml_copy.iter():
-            # Skip processing if this is a w:t element
-            if not hasattr(elem, "tag") or callable(elem.tag):
-                continue
-            tag_str = str(elem.tag)
-            if tag_str.endswith("}t") or tag_str == "t":
-                continue
+        if self.original_file is None:
+            return set()
 
-            elem.text = process_text_content(elem.text, "text content")
-            elem.tail = process_text_content(elem.tail, "tail content")
+        # Resolve the path to handle symlinks (e.g., /var vs /private/var on macOS)
+        xml_file = self.package.normalize(xml_file)
+        relative_path = xml_file.relative_to(self.unpacked_dir)
 
-        return lxml.etree.ElementTree(xml_copy), warnings
+        return self.original_baseline.errors_for(relative_path)
 
 
 if __name__ == "__main__":
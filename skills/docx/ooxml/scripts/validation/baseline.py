@@ -0,0 +1,157 @@
+"""
+XSD error baseline of the original document, computed lazily from the archive.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path, PurePosixPath
+
+try:
+    from ..ooxml_cache import default_cache_dir
+except ImportError:  # validation imported from the scripts directory
+    from ooxml_cache import default_cache_dir
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OriginalBaseline:
+    """XSD error sets of the parts of an original Office file.
+
+    Parts are read straight from the archive into memory (nothing is
+    extracted to disk), validated the first time their errors are requested
+    and memoized. When persisting is enabled, results are also stored in a
+    cache file named after the original file's SHA-256 and the key of what
+    validated it, so repeated runs against the same original skip the work
+    entirely.
+    """
+
+    # Bump when the format or meaning of cached error sets changes
+    CACHE_VERSION = 2
+
+    # Number of cache files kept before the least recently used are removed
+    MAX_CACHE_FILES = 64
+
+    def __init__(
+        self, original_file, validate_part, persist=True, cache_dir=None, key=None
+    ):
+        """
+        Args:
+            original_file: Path to the original .docx/.pptx/.xlsx file
+            validate_part: Callable (relative_path, data) -> (is_valid, errors)
+                that validates one part given its raw bytes
+            persist: If True, load and store results in the cache directory
+            cache_dir: Cache directory (default: default_cache_dir())
+            key: JSON-serializable value identifying what the errors depend
+                on besides the original (validator and schemas); results
+                stored under a different key are not reused
+        """
+        self.original_file = Path(original_file)
+        self._validate_part = validate_part
+        self.key = key
+        self.persist = persist
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self._digest = None
+        self._errors = None
+        self._dirty = False
+        self._zip = None
+        self._members = None
+
+    def errors_for(self, relative_path):
+        """Return the set of XSD errors of a part in the original document.
+
+        Args:
+            relative_path: Part path relative to the package root
+
+        Returns:
+            set: Error messages (empty if the part is valid or did not exist)
+        """
+        key = PurePosixPath(relative_path).as_posix()
+        errors = self._load()
+        if key not in errors:
+            errors[key] = sorted(self._compute(key))
+            self._dirty = True
+        return set(errors[key])
+
+    def close(self):
+        """Persist new results and release the archive handle."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self.persist and self._dirty:
+            self._store()
+            self._dirty = False
+
+    def _compute(self, key):
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.original_file, "r")
+            self._members = set(self._zip.namelist())
+
+        # Part didn't exist in original, so no original errors
+        if key not in self._members:
+            return set()
+
+        _, errors = self._validate_part(PurePosixPath(key), self._zip.read(key))
+        return errors if errors else set()
+
+    @property
+    def _baselines_dir(self):
+        return self.cache_dir / "baselines"
+
+    @property
+    def _cache_file(self):
+        if self._digest is None:
+            digest = hashlib.sha256(
+                json.dumps([self.CACHE_VERSION, self.key], sort_keys=True).encode()
+            )
+            digest.update(file_sha256(self.original_file).encode())
+            self._digest = digest.hexdigest()
+        return self._baselines_dir / f"{self._digest}.json"
+
+    def _load(self):
+        if self._errors is not None:
+            return self._errors
+
+        self._errors = {}
+        if self.persist:
+            try:
+                cache_file = self._cache_file
+                data = json.loads(cache_file.read_text(encoding="utf-8"))
+                if data.get("version") == self.CACHE_VERSION:
+                    self._errors = data["errors"]
+                    os.utime(cache_file)  # Mark as recently used
+            except (OSError, ValueError, KeyError):
+                pass
+        return self._errors
+
+    def _store(self):
+        try:
+            self._baselines_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self._cache_file
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(
+                json.dumps({"version": self.CACHE_VERSION, "errors": self._errors}),
+                encoding="utf-8",
+            )
+            os.replace(tmp_file, cache_file)
+
+            # Evict least recently used cache files
+            cache_files = sorted(
+                self._baselines_dir.glob("*.json"), key=lambda f: f.stat().st_mtime
+            )
+            for stale in cache_files[: -self.MAX_CACHE_FILES]:
+                stale.unlink(missing_ok=True)
+        except OSError:
+            pass  # Caching is best effort (e.g. read-only home directory)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,170 @@
+"""
+Word-level text diff in the style of `git diff --word-diff=plain -U0`.
+"""
+
+import difflib
+import re
+
+# Words and single punctuation characters, each with the spaces after it,
+# and newlines. Keeping spaces out of the token sequence avoids a very common
+# element, which is what makes SequenceMatcher slow.
+_WORD_TOKEN = re.compile(r"(?:\w+|[^\w\s])[^\S\n]*|\n|[^\S\n]+")
+
+# Limits on the product of the compared lengths, which keep the quadratic
+# worst case of SequenceMatcher away from long rewritten passages: larger
+# replaced hunks are compared paragraph by paragraph, and larger replaced
+# word runs aren't refined to characters
+_MAX_HUNK_DIFF_WORK = 1_000_000
+_MAX_CHAR_DIFF_WORK = 100_000
+
+
+def word_diff(original_text, modified_text, granularity="char"):
+    """Describe the differences between two texts like git's plain word diff.
+
+    Lines (paragraphs) are aligned first, so only the changed lines are
+    compared word by word. With granularity="char", replaced words are
+    refined to the changed characters, like git's --word-diff-regex=.
+    Removed text is shown as [-...-] and added text as {+...+}. Unchanged
+    lines are omitted, as with -U0.
+
+    Unchanged leading and trailing lines are skipped before aligning, so
+    the cost for a few local edits is linear in the text length.
+
+    Args:
+        original_text: Text before the changes
+        modified_text: Text after the changes
+        granularity: "char" or "word"
+
+    Returns:
+        str: The changed lines with inline markup, or "" if the texts match
+    """
+    if granularity not in ("char", "word"):
+        raise ValueError(f"Unknown diff granularity: {granularity!r}")
+    if original_text == modified_text:
+        return ""
+
+    original_lines = original_text.split("\n")
+    modified_lines = modified_text.split("\n")
+
+    output = []
+    matcher = difflib.SequenceMatcher(None, autojunk=False)
+    for start, end in _changed_line_ranges(original_lines, modified_lines, matcher):
+        removed = original_lines[start[0] : end[0]]
+        added = modified_lines[start[1] : end[1]]
+        for removed_text, added_text in _align_hunk(removed, added):
+            segments = _diff_tokens(removed_text, added_text, granularity)
+            output.extend(line for line in _render(segments) if line.strip())
+
+    return "\n".join(output)
+
+
+def _changed_line_ranges(original_lines, modified_lines, matcher):
+    """Yield ((orig_start, mod_start), (orig_end, mod_end)) of each changed hunk."""
+    # Trim the common prefix and suffix so SequenceMatcher only sees the
+    # region that changed
+    prefix = 0
+    limit = min(len(original_lines), len(modified_lines))
+    while prefix < limit and original_lines[prefix] == modified_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < limit - prefix
+        and original_lines[-1 - suffix] == modified_lines[-1 - suffix]
+    ):
+        suffix += 1
+
+    matcher.set_seqs(
+        original_lines[prefix : len(original_lines) - suffix],
+        modified_lines[prefix : len(modified_lines) - suffix],
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            yield (prefix + i1, prefix + j1), (prefix + i2, prefix + j2)
+
+
+def _align_hunk(removed, added):
+    """Split a changed hunk into (original, modified) texts to compare.
+
+    Small hunks are compared as a whole, like git does. Large ones are
+    compared paragraph by paragraph, with surplus paragraphs shown as
+    entirely removed or added.
+    """
+    removed_text, added_text = "\n".join(removed), "\n".join(added)
+    if len(removed_text) * len(added_text) <= _MAX_HUNK_DIFF_WORK:
+        return [(removed_text, added_text)]
+
+    pairs = list(zip(removed, added))
+    pairs += [(line, "") for line in removed[len(added) :]]
+    pairs += [("", line) for line in added[len(removed) :]]
+    return pairs
+
+
+def _diff_tokens(original, modified, granularity):
+    """Return [(tag, text)] segments, tag being "equal", "delete" or "insert"."""
+    a = _WORD_TOKEN.findall(original)
+    b = _WORD_TOKEN.findall(modified)
+    segments = []
+
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b).get_opcodes():
+        removed, added = "".join(a[i1:i2]), "".join(b[j1:j2])
+        if tag == "equal":
+            segments.append(("equal", removed))
+        elif (
+            tag == "replace"
+            and granularity == "char"
+            and len(removed) * len(added) <= _MAX_CHAR_DIFF_WORK
+        ):
+            segments.extend(_diff_chars(removed, added))
+        else:
+            segments.append(("delete", removed))
+            segments.append(("insert", added))
+
+    # Merge neighbours of the same kind, e.g. word- and character-level
+    # deletions that touch
+    merged = []
+    for tag, text in segments:
+        if not text:
+            continue
+        if merged and merged[-1][0] == tag:
+            merged[-1] = (tag, merged[-1][1] + text)
+        else:
+            merged.append((tag, text))
+    return merged
+
+
+def _diff_chars(removed, added):
+    """Character-level segments for a replaced run of words."""
+    segments = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(
+        None, removed, added
+    ).get_opcodes():
+        if tag == "equal":
+            segments.append(("equal", removed[i1:i2]))
+        else:
+            segments.append(("delete", removed[i1:i2]))
+            segments.append(("insert", added[j1:j2]))
+    return segments
+
+
+def _render(segments):
+    """Render segments as output lines, marking changes per line like git."""
+    markers = {"delete": ("[-", "-]"), "insert": ("{+", "+}")}
+    lines = [[]]
+
+    for tag, text in segments:
+        for i, piece in enumerate(text.split("\n")):
+            if i:
+                lines.append([])
+            if not piece:
+                continue
+            if tag == "equal":
+                lines[-1].append(piece)
+            else:
+                opening, closing = markers[tag]
+                lines[-1].append(f"{opening}{piece}{closing}")
+
+    return ["".join(line) for line in lines]
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
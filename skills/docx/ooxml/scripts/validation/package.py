@@ -0,0 +1,112 @@
+"""
+Access to the parts of an Office document, either unpacked on disk or still packed.
+"""
+
+import os
+import posixpath
+import zipfile
+from pathlib import Path, PurePosixPath
+
+
+def open_package(path):
+    """Return the package for an unpacked directory or a packed Office file."""
+    if Path(path).is_file():
+        return ZipPackage(path)
+    return DirectoryPackage(path)
+
+
+class DirectoryPackage:
+    """Parts of an unpacked Office document directory."""
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        # Part paths are absolute paths below this root
+        self.root = self.path
+
+    def walk(self):
+        """Yield (path, size) for every file, in the order of Path.rglob("*").
+
+        Uses os.scandir so each directory is listed once and each file costs
+        a single stat.
+        """
+
+        def walk_dir(directory):
+            with os.scandir(directory) as it:
+                entries = list(it)
+            for entry in entries:
+                if entry.is_file():
+                    yield Path(entry.path), entry.stat().st_size
+            for entry in entries:
+                if entry.is_dir():
+                    yield from walk_dir(entry.path)
+
+        yield from walk_dir(self.root)
+
+    def read_bytes(self, path):
+        return Path(path).read_bytes()
+
+    def open(self, path):
+        """Open a part for streaming binary reads."""
+        return open(path, "rb")
+
+    def size(self, path):
+        return Path(path).stat().st_size
+
+    def normalize(self, path):
+        """Resolve '..' segments (and symlinks) in a part path."""
+        return Path(path).resolve()
+
+    def normpath(self, path):
+        """Resolve '..' segments in a part path without touching the disk."""
+        return Path(os.path.normpath(path))
+
+    def close(self):
+        pass
+
+
+class ZipPackage:
+    """Parts of a packed Office file, read from the archive without extracting it.
+
+    Part paths are PurePosixPaths below a virtual root named after the file, so
+    validators can use them exactly like paths in an unpacked directory (e.g.
+    relative_to(root) gives the part name). Members are decompressed on
+    demand, straight into memory.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.root = PurePosixPath(self.path.as_posix())
+        self._zip = zipfile.ZipFile(self.path, "r")
+        self._members = {
+            self.root / info.filename: info
+            for info in self._zip.infolist()
+            if not info.is_dir()
+        }
+
+    def walk(self):
+        """Yield (path, size) for every part, in archive order."""
+        for part, info in self._members.items():
+            yield part, info.file_size
+
+    def read_bytes(self, path):
+        return self._zip.read(self._members[PurePosixPath(path)])
+
+    def open(self, path):
+        """Open a part for streaming binary reads (decompressed on the fly)."""
+        return self._zip.open(self._members[PurePosixPath(path)])
+
+    def size(self, path):
+        return self._members[PurePosixPath(path)].file_size
+
+    def normalize(self, path):
+        """Resolve '..' segments in a part path."""
+        return PurePosixPath(posixpath.normpath(PurePosixPath(path).as_posix()))
+
+    normpath = normalize
+
+    def close(self):
+        self._zip.close()
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
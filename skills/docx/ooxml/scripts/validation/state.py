@@ -0,0 +1,143 @@
+"""
+Per-part validation state of an unpacked document, used to re-check only changed parts.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from .baseline import file_sha256
+
+# Name of the state file kept in the unpacked directory. It is not part of the
+# document: pack.py and the package checks skip it.
+STATE_FILENAME = ".validation_state.json"
+
+
+class ValidationState:
+    """Content hashes and check results of the parts from the last passing run.
+
+    A part whose hash matches the last run that passed every check is known
+    to pass the per-part checks again, so only changed parts need to be
+    re-validated. Results recorded for a part (e.g. its XSD outcome) are kept
+    as long as the part is unchanged.
+    """
+
+    # Bump when the format or meaning of recorded results changes
+    VERSION = 1
+
+    def __init__(self, unpacked_dir, key):
+        """
+        Args:
+            unpacked_dir: Path to the unpacked document directory
+            key: JSON-serializable value identifying what the results depend
+                on (validator, schemas and original document); a state
+                recorded under a different key is ignored
+        """
+        self.unpacked_dir = Path(unpacked_dir)
+        self.key = key
+        self.path = self.unpacked_dir / STATE_FILENAME
+        self._previous, self._written_ns = self._load()
+        self._parts = {}
+
+    @property
+    def has_previous_run(self):
+        """Whether a passing run was recorded for this validator and original."""
+        return self._previous is not None
+
+    def changed_files(self, files):
+        """Hash the given parts and return those changed since the last passing run.
+
+        Like git's index, a part whose size and mtime are unchanged (and older
+        than the state file itself) is not re-read.
+
+        Args:
+            files: Paths of the parts in the unpacked directory
+
+        Returns:
+            list: Parts that are new or whose content differs, in input order
+        """
+        previous = self._previous or {}
+        changed = []
+
+        for file_path in files:
+            name = self._part_name(file_path)
+            stat = file_path.stat()
+            entry = previous.get(name)
+
+            if (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and stat.st_mtime_ns < self._written_ns
+            ):
+                digest = entry["sha256"]
+            else:
+                digest = file_sha256(file_path)
+
+            if entry and entry["sha256"] == digest:
+                # Unchanged: carry the recorded results over
+                self._parts[name] = dict(
+                    entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns
+                )
+            else:
+                self._parts[name] = {
+                    "sha256": digest,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+                changed.append(file_path)
+
+        return changed
+
+    def results(self, file_path):
+        """Return the recorded results of an unchanged part (empty dict if none)."""
+        entry = (self._previous or {}).get(self._part_name(file_path))
+        current = self._parts.get(self._part_name(file_path))
+        if entry is None or current is None or entry["sha256"] != current["sha256"]:
+            return {}
+        return {
+            k: v for k, v in entry.items() if k not in ("sha256", "size", "mtime_ns")
+        }
+
+    def record(self, file_path, **results):
+        """Record check results of a part, stored with the next save()."""
+        entry = self._parts.get(self._part_name(file_path))
+        if entry is not None:
+            entry.update(results)
+
+    def save(self):
+        """Write the state after a passing run (best effort)."""
+        try:
+            written_ns = time.time_ns()
+            tmp_file = self.path.with_name(f"{STATE_FILENAME}.{os.getpid()}.tmp")
+            tmp_file.write_text(
+                json.dumps(
+                    {
+                        "version": self.VERSION,
+                        "key": self.key,
+                        "written_ns": written_ns,
+                        "parts": self._parts,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            os.replace(tmp_file, self.path)
+        except OSError:
+            pass
+
+    def _part_name(self, file_path):
+        return Path(file_path).relative_to(self.unpacked_dir).as_posix()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION and data.get("key") == self.key:
+                return data["parts"], data["written_ns"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return None, 0
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
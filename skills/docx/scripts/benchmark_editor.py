@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Benchmark the XMLEditor engines on large document.xml files and check that they agree.
+
+Usage (from the docx skill root):
+    python -m scripts.benchmark_editor [path]... [--paragraphs N] [--edits N]
+                                       [--inserts N] [--repeat N]
+
+Runs the same session with the minidom and the lxml engine of DocxXMLEditor
+on each document.xml (given as XML files, unpacked directories or .docx
+files, or generated with --paragraphs): parse, lookups by attribute, line
+number and text, tracked-change edits and save. Each phase is timed, and
+peak RSS is measured per engine in a fresh process. The saved documents
+must be equal up to timestamps and whitespace-only text. Exits with 1 if
+they differ.
+
+A microbenchmark then measures the cost of one insert_after call with a
+recurring set of run fragments, with and without the editor's fragment
+cache.
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lxml import etree
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from . import utilities
+from .document import DocxXMLEditor
+from .utilities import ENGINES, NodeQuery, XMLEditor
+
+PHASES = ("parse", "lookup", "edit", "save")
+
+W_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml"'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the XMLEditor engines and compare their output"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="path",
+        help="document.xml files, unpacked .docx directories or .docx files "
+        "(default: a generated document.xml)",
+    )
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=20000,
+        help="Paragraphs in the generated document.xml (default: 20000)",
+    )
+    parser.add_argument(
+        "--edits",
+        type=int,
+        default=50,
+        help="Lookups and tracked-change edits per session (default: 50)",
+    )
+    parser.add_argument(
+        "--inserts",
+        type=int,
+        default=2000,
+        help="Fragment inserts in the microbenchmark (default: 2000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per engine; the median times are reported (default: 3)",
+    )
+    args = parser.parse_args()
+
+    assert args.paragraphs > 0, "Error: --paragraphs must be positive"
+    assert args.edits > 0, "Error: --edits must be positive"
+    assert args.inserts > 0, "Error: --inserts must be positive"
+    assert args.repeat > 0, "Error: --repeat must be positive"
+    for path in args.paths:
+        assert Path(path).exists(), f"Error: {path} does not exist"
+
+    failed = False
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        if args.paths:
+            documents = [
+                locate_document_xml(Path(p), work_dir / str(i))
+                for i, p in enumerate(args.paths)
+            ]
+        else:
+            documents = [work_dir / "document.xml"]
+            documents[0].write_text(generate_document_xml(args.paragraphs))
+
+        for document in documents:
+            size_mb = document.stat().st_size / (1024 * 1024)
+            print(f"\n{document} ({size_mb:.1f} MB)")
+            results = {
+                engine: benchmark_engine(engine, document, args.edits, args.repeat)
+                for engine in ENGINES
+            }
+            print_results(results)
+
+            digests = {result["digest"] for result in results.values()}
+            if len(digests) > 1:
+                print("FAILED - The engines saved different documents")
+                failed = True
+            else:
+                print("PASSED - The engines saved the same document")
+
+            print_insert_results(
+                {
+                    engine: {
+                        cached: benchmark_inserts(
+                            engine, document, cached, args.inserts, args.repeat
+                        )
+                        for cached in (False, True)
+                    }
+                    for engine in ENGINES
+                },
+                args.inserts,
+            )
+
+    if failed:
+        sys.exit(1)
+
+
+def locate_document_xml(path, work_dir):
+    """Get word/document.xml of a .docx file or unpacked directory, or path itself."""
+    if path.is_dir():
+        return path / "word" / "document.xml"
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return Path(zf.extract("word/document.xml", work_dir))
+    return path
+
+
+def generate_document_xml(paragraphs):
+    """Generate a document.xml laid out like unpack.py's output, one tag per line."""
+    lines = [
+        '<?xml version="1.0" encoding="utf-8" standalone="yes"?>',
+        f"<w:document {W_NAMESPACES}>",
+        "  <w:body>",
+    ]
+    for i in range(paragraphs):
+        lines.append(
+            f'    <w:p w14:paraId="{i:08X}" w:rsidR="00A1B2C3" w:rsidRDefault="00A1B2C3">'
+        )
+        lines.extend(
+            [
+                '      <w:r w:rsidR="00A1B2C3">',
+                "        <w:rPr>",
+                "          <w:b/>",
+                "        </w:rPr>",
+                f"        <w:t>Clause {i}:</w:t>",
+                "      </w:r>",
+                "      <w:r>",
+                f'        <w:t xml:space="preserve"> the party of part {i % 97} &amp; its successors</w:t>',
+                "      </w:r>",
+            ]
+        )
+        if i % 10 == 0:
+            lines.extend(
+                [
+                    f'      <w:del w:id="{i}" w:author="Reviewer" w:date="2024-01-01T00:00:00Z">',
+                    '        <w:r w:rsidDel="00A1B2C3">',
+                    f"          <w:delText> formerly {i}</w:delText>",
+                    "        </w:r>",
+                    "      </w:del>",
+                ]
+            )
+        lines.append("    </w:p>")
+    lines.extend(["  </w:body>", "</w:document>"])
+    return "\n".join(lines)
+
+
+def benchmark_engine(engine, document, edits, repeat=3):
+    """Run the session with an engine, once per run in a fresh process.
+
+    Returns:
+        dict: Median time of each phase, peak RSS and the saved document's digest
+    """
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(measure, engine, str(document), edits).result())
+    print(
+        f"  {engine}: {statistics.median(sum(r['times'].values()) for r in runs):.3f}s",
+        file=sys.stderr,
+    )
+
+    return {
+        "times": {
+            phase: statistics.median(run["times"][phase] for run in runs)
+            for phase in PHASES
+        },
+        "peak_rss_kb": max(
+            (run["peak_rss_kb"] for run in runs if run["peak_rss_kb"]), default=None
+        ),
+        "digest": runs[-1]["digest"],
+    }
+
+
+def measure(engine, document, edits):
+    """Run the session once on a copy of the document. Called in a fresh worker process."""
+    times = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_path = Path(work_dir) / "document.xml"
+        shutil.copyfile(document, xml_path)
+        # Same paraIds/textIds and choices for both engines
+        random.seed(0)
+        rnd = random.Random(0)
+
+        start = time.perf_counter()
+        editor = DocxXMLEditor(xml_path, rsid="00C0FFEE", engine=engine)
+        paragraphs = editor.dom.getElementsByTagName("w:p")
+        times["parse"] = time.perf_counter() - start
+
+        picks = [rnd.randrange(len(paragraphs)) for _ in range(edits)]
+        start = time.perf_counter()
+        targets = []
+        for index in picks:
+            para = paragraphs[index]
+            para_id = para.getAttribute("w14:paraId")
+            if para_id:
+                para = editor.get_node(tag="w:p", attrs={"w14:paraId": para_id})
+            line = getattr(para, "parse_position", (None,))[0]
+            if line is not None:
+                editor.find_all("w:r", line_number=range(line, line + 20))
+            targets.append(para)
+        editor.find_all(NodeQuery("w:p", pattern=r"part 1\d\b"))
+        times["lookup"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, para in enumerate(targets):
+            runs = [
+                r
+                for r in para.getElementsByTagName("w:r")
+                if r.getElementsByTagName("w:t")
+            ]
+            if i % 3 == 0 and runs:
+                editor.suggest_deletion(runs[0])
+            elif i % 3 == 1:
+                editor.insert_after(
+                    para,
+                    f"<w:p><w:ins><w:r><w:t>Inserted {i}</w:t></w:r></w:ins></w:p>",
+                )
+            elif runs:
+                editor.insert_before(
+                    runs[-1], f"<w:ins><w:r><w:t> added {i} </w:t></w:r></w:ins>"
+                )
+        times["edit"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        editor.save()
+        times["save"] = time.perf_counter() - start
+
+        # Measured before the digest, which parses the saved document again
+        peak = peak_rss_kb()
+        digest = canonical_digest(xml_path.read_bytes())
+
+    return {"times": times, "peak_rss_kb": peak, "digest": digest}
+
+
+def benchmark_inserts(engine, document, cached, inserts, repeat=3):
+    """Time insert_after with and without the fragment cache, once per run in a fresh process.
+
+    Returns:
+        float: Median time of one insert in seconds
+    """
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(
+                executor.submit(
+                    measure_inserts, engine, str(document), cached, inserts
+                ).result()
+            )
+    return statistics.median(runs)
+
+
+def measure_inserts(engine, document, cached, inserts):
+    """Insert recurring run fragments after a run. Called in a fresh worker process."""
+    if not cached:
+        utilities.FRAGMENT_CACHE_SIZE = 0
+    # Like redlining output: a few distinct runs, inserted over and over
+    fragments = [
+        f'<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">Term {i} </w:t></w:r>'
+        for i in range(8)
+    ]
+
+    editor = XMLEditor(document, engine=engine)
+    runs = editor.dom.getElementsByTagName("w:r")
+    start = time.perf_counter()
+    for i in range(inserts):
+        editor.insert_after(runs[i % len(runs)], fragments[i % len(fragments)])
+    return (time.perf_counter() - start) / inserts
+
+
+def canonical_digest(data):
+    """Digest of a saved document, ignoring timestamps and whitespace-only text."""
+    data = re.sub(rb' (w:date|w16du:dateUtc)="[^"]*"', b"", data)
+    root = etree.fromstring(data)
+    for elem in root.iter():
+        if elem.text is not None and not elem.text.strip():
+            elem.text = None
+        if elem.tail is not None and not elem.tail.strip():
+            elem.tail = None
+    return hashlib.sha256(etree.tostring(root, method="c14n")).hexdigest()
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def print_insert_results(results, inserts):
+    """Print a table of the time per insert with and without the fragment cache."""
+    print(f"\ninsert_after with recurring fragments ({inserts} inserts)")
+    print(f"{'engine':<9} {'uncached (us)':>14} {'cached (us)':>12} {'speedup':>8}")
+    for engine, times in results.items():
+        print(
+            f"{engine:<9} {times[False] * 1e6:>14.1f} {times[True] * 1e6:>12.1f} "
+            f"{times[False] / times[True]:>7.2f}x"
+        )
+
+
+def print_results(results):
+    """Print a table of the engines' phase times, with their speedup over minidom."""
+    reference = sum(results["minidom"]["times"].values())
+    header = " ".join(f"{phase + ' (s)':>10}" for phase in PHASES)
+    print(f"{'engine':<9} {header} {'peak RSS (MB)':>14} {'speedup':>8}")
+    for engine, result in results.items():
+        times = " ".join(f"{result['times'][phase]:>10.3f}" for phase in PHASES)
+        peak = result["peak_rss_kb"]
+        total = sum(result["times"].values())
+        print(
+            f"{engine:<9} {times} "
+            f"{'-' if peak is None else f'{peak / 1024:.1f}':>14} "
+            f"{reference / total:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
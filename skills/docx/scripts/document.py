@@ -26,10 +26,13 @@ Usage:
     doc.save()
 """
 
+import filecmp
 import html
+import os
 import random
 import shutil
 import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -44,6 +47,46 @@ from .utilities import XMLEditor
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
 
+class ChangeIdAllocator:
+    """Allocates w:id values for tracked changes (w:ins and w:del).
+
+    Ids only increase: each allocated id is greater than every id allocated
+    or observed before, so allocating is O(1) instead of a scan of the
+    document. Editors observe the ids already in their DOM when they are
+    created and the explicit ids of inserted content; ids added to the DOM
+    directly must be passed to observe().
+
+    Example:
+        ids = ChangeIdAllocator()
+        ids.observe_dom(editor.dom)
+        change_id = ids.allocate()
+    """
+
+    def __init__(self, next_id=0):
+        self.next_id = next_id
+
+    def allocate(self) -> int:
+        """Get a new change id."""
+        change_id = self.next_id
+        self.next_id += 1
+        return change_id
+
+    def observe(self, change_id):
+        """Note an id in use so it is never allocated. Non-numeric ids are ignored."""
+        try:
+            change_id = int(change_id)
+        except (TypeError, ValueError):
+            return
+        if change_id >= self.next_id:
+            self.next_id = change_id + 1
+
+    def observe_dom(self, dom):
+        """Note the ids of all tracked change elements in a DOM."""
+        for tag in ("w:ins", "w:del"):
+            for elem in dom.getElementsByTagName(tag):
+                self.observe(elem.getAttribute("w:id"))
+
+
 class DocxXMLEditor(XMLEditor):
     """XMLEditor that automatically applies RSID, author, and date to new elements.
 
@@ -54,10 +97,17 @@ class DocxXMLEditor(XMLEditor):
 
     Attributes:
         dom (defusedxml.minidom.Document): The DOM document for direct manipulation
+        change_ids (ChangeIdAllocator): Allocator of the w:id values of tracked changes
     """
 
     def __init__(
-        self, xml_path, rsid: str, author: str = "Claude", initials: str = "C"
+        self,
+        xml_path,
+        rsid: str,
+        author: str = "Claude",
+        initials: str = "C",
+        engine: str = "minidom",
+        change_ids: ChangeIdAllocator = None,
     ):
         """Initialize with required RSID and optional author.
 
@@ -66,52 +116,70 @@ class DocxXMLEditor(XMLEditor):
             rsid: RSID to automatically apply to new elements
             author: Author name for tracked changes and comments (default: "Claude")
             initials: Author initials (default: "C")
+            engine: DOM implementation, "minidom" (default) or "lxml" (see XMLEditor)
+            change_ids: Allocator of tracked change ids to share with other editors
+                (default: a new one). The ids in this file are observed by it.
         """
-        super().__init__(xml_path)
+        super().__init__(xml_path, engine=engine)
         self.rsid = rsid
         self.author = author
         self.initials = initials
-
-    def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        # Nodes to inject attributes into at the end of the current batch()
+        self._batch_nodes = None
+        self.change_ids = change_ids if change_ids is not None else ChangeIdAllocator()
+        self.change_ids.observe_dom(self.dom)
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16du"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16du",
-                "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
-            )
+        self._ensure_namespace(
+            "w16du", "http://schemas.microsoft.com/office/word/2023/wordml/word16du"
+        )
 
     def _ensure_w16cex_namespace(self):
         """Ensure w16cex namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16cex",
-                "http://schemas.microsoft.com/office/word/2018/wordml/cex",
-            )
+        self._ensure_namespace(
+            "w16cex", "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+        )
 
     def _ensure_w14_namespace(self):
         """Ensure w14 namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w14"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w14",
-                "http://schemas.microsoft.com/office/word/2010/wordml",
-            )
+        self._ensure_namespace(
+            "w14", "http://schemas.microsoft.com/office/word/2010/wordml"
+        )
+
+    @contextmanager
+    def batch(self):
+        """Inject attributes into everything inserted in the block at once, when it ends.
+
+        insert_after, insert_before, append_to, replace_node and the tracked
+        change methods normally add RSIDs, authors, dates and ids to each
+        insertion right away. Inside a batch, the nodes are collected and all
+        get their attributes in a single traversal at the end of the block,
+        with one timestamp. Nested batches join the outermost one.
+
+        Example:
+            with editor.batch():
+                for run, xml in edits:
+                    editor.insert_after(run, xml)
+        """
+        if self._batch_nodes is not None:
+            yield
+            return
+        self._batch_nodes = []
+        try:
+            yield
+        finally:
+            nodes, self._batch_nodes = self._batch_nodes, None
+            self._inject_attributes_to_nodes(nodes)
+            # Their attributes changed after they were indexed
+            self._nodes_changed(None, added=nodes)
+
+    def _inject_attributes(self, nodes):
+        """Inject attributes into inserted nodes now, or at the end of the batch."""
+        if self._batch_nodes is not None:
+            self._batch_nodes.extend(nodes)
+        else:
+            self._inject_attributes_to_nodes(nodes)
 
     def _inject_attributes_to_nodes(self, nodes):
         """Inject RSID, author, and date attributes into DOM nodes where applicable.
@@ -124,11 +192,12 @@ class DocxXMLEditor(XMLEditor):
         - w:comment: gets w:author, w:date, w:initials
         - w16cex:commentExtensible: gets w16cex:dateUtc
 
+        The nodes and their descendants are visited once, in document order,
+        carrying whether the current element is inside a w:del.
+
         Args:
             nodes: List of DOM nodes to process
         """
-        from datetime import datetime, timezone
-
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         def is_inside_deletion(elem):
@@ -140,7 +209,7 @@ class DocxXMLEditor(XMLEditor):
                 parent = parent.parentNode
             return False
 
-        def add_rsid_to_p(elem):
+        def add_rsid_to_p(elem, inside_deletion):
             if not elem.hasAttribute("w:rsidR"):
                 elem.setAttribute("w:rsidR", self.rsid)
             if not elem.hasAttribute("w:rsidRDefault"):
@@ -155,31 +224,35 @@ class DocxXMLEditor(XMLEditor):
                 self._ensure_w14_namespace()
                 elem.setAttribute("w14:textId", _generate_hex_id())
 
-        def add_rsid_to_r(elem):
+        def add_rsid_to_r(elem, inside_deletion):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
-            if is_inside_deletion(elem):
+            if inside_deletion:
                 if not elem.hasAttribute("w:rsidDel"):
                     elem.setAttribute("w:rsidDel", self.rsid)
             else:
                 if not elem.hasAttribute("w:rsidR"):
                     elem.setAttribute("w:rsidR", self.rsid)
 
+        def collect_tracked_change(elem, inside_deletion):
+            # Attributes are added after the walk, once the explicit ids of
+            # all the nodes have been observed
+            tracked_changes.append(elem)
+            self.change_ids.observe(elem.getAttribute("w:id"))
+
         def add_tracked_change_attrs(elem):
             # Auto-assign w:id if not present
             if not elem.hasAttribute("w:id"):
-                elem.setAttribute("w:id", str(self._get_next_change_id()))
+                elem.setAttribute("w:id", str(self.change_ids.allocate()))
             if not elem.hasAttribute("w:author"):
                 elem.setAttribute("w:author", self.author)
             if not elem.hasAttribute("w:date"):
                 elem.setAttribute("w:date", timestamp)
             # Add w16du:dateUtc for tracked changes (same as w:date since we generate UTC timestamps)
-            if elem.tagName in ("w:ins", "w:del") and not elem.hasAttribute(
-                "w16du:dateUtc"
-            ):
+            if not elem.hasAttribute("w16du:dateUtc"):
                 self._ensure_w16du_namespace()
                 elem.setAttribute("w16du:dateUtc", timestamp)
 
-        def add_comment_attrs(elem):
+        def add_comment_attrs(elem, inside_deletion):
             if not elem.hasAttribute("w:author"):
                 elem.setAttribute("w:author", self.author)
             if not elem.hasAttribute("w:date"):
@@ -187,13 +260,13 @@ class DocxXMLEditor(XMLEditor):
             if not elem.hasAttribute("w:initials"):
                 elem.setAttribute("w:initials", self.initials)
 
-        def add_comment_extensible_date(elem):
+        def add_comment_extensible_date(elem, inside_deletion):
             # Add w16cex:dateUtc for comment extensible elements
             if not elem.hasAttribute("w16cex:dateUtc"):
                 self._ensure_w16cex_namespace()
                 elem.setAttribute("w16cex:dateUtc", timestamp)
 
-        def add_xml_space_to_t(elem):
+        def add_xml_space_to_t(elem, inside_deletion):
             # Add xml:space="preserve" to w:t if text has leading/trailing whitespace
             if (
                 elem.firstChild
@@ -204,61 +277,61 @@ class DocxXMLEditor(XMLEditor):
                     if not elem.hasAttribute("xml:space"):
                         elem.setAttribute("xml:space", "preserve")
 
-        for node in nodes:
-            if node.nodeType != node.ELEMENT_NODE:
-                continue
+        handlers = {
+            "w:p": add_rsid_to_p,
+            "w:r": add_rsid_to_r,
+            "w:t": add_xml_space_to_t,
+            "w:ins": collect_tracked_change,
+            "w:del": collect_tracked_change,
+            "w:comment": add_comment_attrs,
+            "w16cex:commentExtensible": add_comment_extensible_date,
+        }
+
+        tracked_changes = []
+        # (element, inside w:del) pairs still to visit, next one last
+        stack = [
+            (node, is_inside_deletion(node))
+            for node in reversed(nodes)
+            if node.nodeType == node.ELEMENT_NODE
+        ]
+        while stack:
+            elem, inside_deletion = stack.pop()
+            handler = handlers.get(elem.tagName)
+            if handler:
+                handler(elem, inside_deletion)
+
+            inside_deletion = inside_deletion or elem.tagName == "w:del"
+            stack.extend(
+                (child, inside_deletion)
+                for child in reversed(elem.childNodes)
+                if child.nodeType == child.ELEMENT_NODE
+            )
 
-            # Handle the node itself
-            if node.tagName == "w:p":
-                add_rsid_to_p(node)
-            elif node.tagName == "w:r":
-                add_rsid_to_r(node)
-            elif node.tagName == "w:t":
-                add_xml_space_to_t(node)
-            elif node.tagName in ("w:ins", "w:del"):
-                add_tracked_change_attrs(node)
-            elif node.tagName == "w:comment":
-                add_comment_attrs(node)
-            elif node.tagName == "w16cex:commentExtensible":
-                add_comment_extensible_date(node)
-
-            # Process descendants (getElementsByTagName doesn't return the element itself)
-            for elem in node.getElementsByTagName("w:p"):
-                add_rsid_to_p(elem)
-            for elem in node.getElementsByTagName("w:r"):
-                add_rsid_to_r(elem)
-            for elem in node.getElementsByTagName("w:t"):
-                add_xml_space_to_t(elem)
-            for tag in ("w:ins", "w:del"):
-                for elem in node.getElementsByTagName(tag):
-                    add_tracked_change_attrs(elem)
-            for elem in node.getElementsByTagName("w:comment"):
-                add_comment_attrs(elem)
-            for elem in node.getElementsByTagName("w16cex:commentExtensible"):
-                add_comment_extensible_date(elem)
+        for elem in tracked_changes:
+            add_tracked_change_attrs(elem)
 
     def replace_node(self, elem, new_content):
         """Replace node with automatic attribute injection."""
         nodes = super().replace_node(elem, new_content)
-        self._inject_attributes_to_nodes(nodes)
+        self._inject_attributes(nodes)
         return nodes
 
     def insert_after(self, elem, xml_content):
         """Insert after with automatic attribute injection."""
         nodes = super().insert_after(elem, xml_content)
-        self._inject_attributes_to_nodes(nodes)
+        self._inject_attributes(nodes)
         return nodes
 
     def insert_before(self, elem, xml_content):
         """Insert before with automatic attribute injection."""
         nodes = super().insert_before(elem, xml_content)
-        self._inject_attributes_to_nodes(nodes)
+        self._inject_attributes(nodes)
         return nodes
 
     def append_to(self, elem, xml_content):
         """Append to with automatic attribute injection."""
         nodes = super().append_to(elem, xml_content)
-        self._inject_attributes_to_nodes(nodes)
+        self._inject_attributes(nodes)
         return nodes
 
     def revert_insertion(self, elem):
@@ -335,8 +408,9 @@ class DocxXMLEditor(XMLEditor):
             ins_elem.appendChild(del_wrapper)
 
             # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
+            self._inject_attributes([del_wrapper])
 
+        self._nodes_changed(elem.parentNode, added=[elem])
         return [elem]
 
     def revert_deletion(self, elem):
@@ -527,8 +601,9 @@ class DocxXMLEditor(XMLEditor):
             del_wrapper.appendChild(elem)
 
             # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
+            self._inject_attributes([del_wrapper])
 
+            self._nodes_changed(parent, added=[del_wrapper])
             return del_wrapper
 
         elif elem.nodeName == "w:p":
@@ -585,8 +660,9 @@ class DocxXMLEditor(XMLEditor):
             elem.appendChild(del_wrapper)
 
             # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
+            self._inject_attributes([del_wrapper])
 
+            self._nodes_changed(elem.parentNode, added=[elem])
             return elem
 
         else:
@@ -609,6 +685,11 @@ def _generate_rsid() -> str:
     return "".join(random.choices("0123456789ABCDEF", k=8))
 
 
+def _same_content(source, target) -> bool:
+    """Check if target exists with the same content as source."""
+    return target.is_file() and filecmp.cmp(source, target, shallow=False)
+
+
 class Document:
     """Manages comments in unpacked Word documents."""
 
@@ -619,6 +700,8 @@ class Document:
         track_revisions=False,
         author="Claude",
         initials="C",
+        overlay=False,
+        engine="minidom",
     ):
         """
         Initialize with path to unpacked Word document directory.
@@ -630,6 +713,14 @@ class Document:
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Claude")
             initials: Default author initials for comments (default: "C")
+            overlay: If False (default), the whole directory is copied to
+                unpacked_path and packed as the validation baseline up front.
+                If True, a lightweight session: unpacked_path only holds the
+                parts opened or added in this session, the other parts are
+                read from unpacked_dir, and the baseline is packed when first
+                needed.
+            engine: DOM implementation of the editors, "minidom" (default) or
+                "lxml", which is much faster and leaner on large documents
         """
         self.original_path = Path(unpacked_dir)
 
@@ -639,13 +730,25 @@ class Document:
         # Create temporary directory with subdirectories for unpacked content and baseline
         self.temp_dir = tempfile.mkdtemp(prefix="docx_")
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
-        shutil.copytree(self.original_path, self.unpacked_path)
+        self.overlay = overlay
+        if overlay:
+            # Parts are copied in when first opened (see _part_path)
+            self.unpacked_path.mkdir()
+        else:
+            shutil.copytree(self.original_path, self.unpacked_path)
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
+        # Temporary .docx of the original directory for the validation baseline
+        # (outside unpacked dir). Overlay sessions pack it when it is first
+        # needed; until then, saving in place keeps the files it replaces and
+        # notes those it adds.
         self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        self.replaced_path = Path(self.temp_dir) / "replaced"
+        self._added_files = set()
+        if not overlay:
+            pack_document(self.original_path, self.original_docx, validate=False)
 
         self.word_path = self.unpacked_path / "word"
+        self.word_path.mkdir(exist_ok=True)
 
         # Generate RSID if not provided
         self.rsid = rsid if rsid else _generate_rsid()
@@ -654,9 +757,12 @@ class Document:
         # Set default author and initials
         self.author = author
         self.initials = initials
+        self.engine = engine
 
         # Cache for lazy-loaded editors
         self._editors = {}
+        # Tracked change ids, unique across all the editors' parts
+        self.change_ids = ChangeIdAllocator()
 
         # Comment file paths
         self.comments_path = self.word_path / "comments.xml"
@@ -701,12 +807,15 @@ class Document:
             comment = doc["word/comments.xml"].get_node(tag="w:comment", attrs={"w:id": "0"})
         """
         if xml_path not in self._editors:
-            file_path = self.unpacked_path / xml_path
-            if not file_path.exists():
-                raise ValueError(f"XML file not found: {xml_path}")
+            file_path = self._part_path(xml_path)
             # Use DocxXMLEditor with RSID, author, and initials for all editors
             self._editors[xml_path] = DocxXMLEditor(
-                file_path, rsid=self.rsid, author=self.author, initials=self.initials
+                file_path,
+                rsid=self.rsid,
+                author=self.author,
+                initials=self.initials,
+                engine=self.engine,
+                change_ids=self.change_ids,
             )
         return self._editors[xml_path]
 
@@ -842,32 +951,44 @@ class Document:
         Raises:
             ValueError: If validation fails.
         """
-        # Create validators with current state
-        schema_validator = DOCXSchemaValidator(
-            self.unpacked_path, self.original_docx, verbose=False
-        )
-        redlining_validator = RedliningValidator(
-            self.unpacked_path, self.original_docx, verbose=False
-        )
+        self._ensure_original_docx()
+        if self.overlay:
+            document_path = self._link_tree(
+                self._iter_files([self.unpacked_path, self.original_path])
+            )
+        else:
+            document_path = self.unpacked_path
+        try:
+            # Create validators with current state
+            schema_validator = DOCXSchemaValidator(
+                document_path, self.original_docx, verbose=False
+            )
+            redlining_validator = RedliningValidator(
+                document_path, self.original_docx, verbose=False, authors=[self.author]
+            )
 
-        # Run validations
-        if not schema_validator.validate():
-            raise ValueError("Schema validation failed")
-        if not redlining_validator.validate():
-            raise ValueError("Redlining validation failed")
+            # Run validations
+            if not schema_validator.validate():
+                raise ValueError("Schema validation failed")
+            if not redlining_validator.validate():
+                raise ValueError("Redlining validation failed")
+        finally:
+            if document_path != self.unpacked_path:
+                shutil.rmtree(document_path, ignore_errors=True)
 
     def save(self, destination=None, validate=True) -> None:
         """
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        Only files whose content differs from the destination are written.
 
         Args:
             destination: Optional path to save to. If None, saves back to original directory.
             validate: If True, validates document before saving (default: True).
         """
         # Only ensure comment relationships and content types if comment files exist
-        if self.comments_path.exists():
+        if self._has_part("word/comments.xml"):
             self._ensure_comment_relationships()
             self._ensure_comment_content_types()
 
@@ -879,15 +1000,121 @@ class Document:
         if validate:
             self.validate()
 
-        # Copy contents from temp directory to destination (or original directory)
+        # Copy changed files from temp directory to destination (or original directory)
         target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+        in_place = target_path.resolve() == self.original_path.resolve()
+        roots = [self.unpacked_path]
+        if self.overlay and not in_place:
+            roots.append(self.original_path)
+
+        for relative_path, source in self._iter_files(roots):
+            target = target_path / relative_path
+            if _same_content(source, target):
+                continue
+            if in_place and not self.original_docx.exists():
+                # Later validations must still compare against the document
+                # as it was opened
+                self._keep_original(relative_path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.unlink(missing_ok=True)
+            shutil.copy2(source, target)
+
+    # ==================== Private: Session Files ====================
+
+    def _has_part(self, xml_path):
+        """Check if a file exists in the session or in the original directory."""
+        return (self.unpacked_path / xml_path).exists() or (
+            self.overlay and (self.original_path / xml_path).exists()
+        )
+
+    def _part_path(self, xml_path):
+        """Get the session copy of a file, copying it from the original directory on first use.
+
+        Raises:
+            ValueError: If the file does not exist
+        """
+        file_path = self.unpacked_path / xml_path
+        if not file_path.exists():
+            source = self.original_path / xml_path
+            if not self.overlay or not source.is_file():
+                raise ValueError(f"XML file not found: {xml_path}")
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, file_path)
+        return file_path
+
+    def _iter_files(self, roots, exclude=()):
+        """Yield (relative path, path) for every file below the roots.
+
+        Files of earlier roots shadow those of the same name in later roots.
+        Relative paths in exclude are skipped.
+        """
+        seen = set(exclude)
+        for root in roots:
+            for path in sorted(root.rglob("*")):
+                if not path.is_file():
+                    continue
+                relative_path = path.relative_to(root)
+                if relative_path not in seen:
+                    seen.add(relative_path)
+                    yield relative_path, path
+
+    def _link_tree(self, files):
+        """Build a temporary directory from (relative path, path) pairs.
+
+        Files are hard links (copies where linking is not possible), so a
+        whole document costs no copying. The caller removes the directory.
+        """
+        tree_path = Path(tempfile.mkdtemp(prefix="tree_", dir=self.temp_dir))
+        for relative_path, source in files:
+            target = tree_path / relative_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        return tree_path
+
+    def _keep_original(self, relative_path):
+        """Keep a file of the original directory before saving replaces it."""
+        source = self.original_path / relative_path
+        kept = self.replaced_path / relative_path
+        if relative_path in self._added_files or kept.exists():
+            return
+        if not source.exists():
+            self._added_files.add(relative_path)
+            return
+        kept.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, kept)
+        except OSError:
+            shutil.copy2(source, kept)
+
+    def _ensure_original_docx(self):
+        """Pack the original directory for the validation baseline, once."""
+        if self.original_docx.exists():
+            return
+        if not self.replaced_path.exists() and not self._added_files:
+            pack_document(self.original_path, self.original_docx, validate=False)
+            return
+
+        # Saved in place since opening: rebuild the original directory first
+        original_path = self._link_tree(
+            self._iter_files(
+                [self.replaced_path, self.original_path], exclude=self._added_files
+            )
+        )
+        try:
+            pack_document(original_path, self.original_docx, validate=False)
+        finally:
+            shutil.rmtree(original_path, ignore_errors=True)
+        shutil.rmtree(self.replaced_path, ignore_errors=True)
+        self._added_files.clear()
 
     # ==================== Private: Initialization ====================
 
     def _get_next_comment_id(self):
         """Get the next available comment ID."""
-        if not self.comments_path.exists():
+        if not self._has_part("word/comments.xml"):
             return 0
 
         editor = self["word/comments.xml"]
@@ -903,7 +1130,7 @@ class Document:
 
     def _load_existing_comments(self):
         """Load existing comments from files to enable replies."""
-        if not self.comments_path.exists():
+        if not self._has_part("word/comments.xml"):
             return {}
 
         editor = self["word/comments.xml"]
@@ -953,7 +1180,7 @@ class Document:
 
     def _update_people_xml(self, path):
         """Create people.xml if it doesn't exist."""
-        if not path.exists():
+        if not self._has_part("word/people.xml"):
             # Copy from template
             shutil.copy(TEMPLATE_DIR / "people.xml", path)
 
@@ -1069,7 +1296,7 @@ class Document:
         self, comment_id, para_id, text, author, initials, timestamp
     ):
         """Add a single comment to comments.xml."""
-        if not self.comments_path.exists():
+        if not self._has_part("word/comments.xml"):
             shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
 
         editor = self["word/comments.xml"]
@@ -1090,7 +1317,7 @@ class Document:
 
     def _add_to_comments_extended_xml(self, para_id, parent_para_id):
         """Add a single comment to commentsExtended.xml."""
-        if not self.comments_extended_path.exists():
+        if not self._has_part("word/commentsExtended.xml"):
             shutil.copy(
                 TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
             )
@@ -1106,7 +1333,7 @@ class Document:
 
     def _add_to_comments_ids_xml(self, para_id, durable_id):
         """Add a single comment to commentsIds.xml."""
-        if not self.comments_ids_path.exists():
+        if not self._has_part("word/commentsIds.xml"):
             shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
 
         editor = self["word/commentsIds.xml"]
@@ -1117,7 +1344,7 @@ class Document:
 
     def _add_to_comments_extensible_xml(self, durable_id):
         """Add a single comment to commentsExtensible.xml."""
-        if not self.comments_extensible_path.exists():
+        if not self._has_part("word/commentsExtensible.xml"):
             shutil.copy(
                 TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
             )
@@ -1180,10 +1407,8 @@ class Document:
 
     def _add_author_to_people(self, author):
         """Add author to people.xml (called during initialization)."""
-        people_path = self.word_path / "people.xml"
-
         # people.xml should already exist from _setup_tracking
-        if not people_path.exists():
+        if not self._has_part("word/people.xml"):
             raise ValueError("people.xml should exist after _setup_tracking")
 
         editor = self["word/people.xml"]
@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+A minidom-compatible DOM over lxml, used by XMLEditor(engine="lxml").
+
+Document, DocxXMLEditor and user scripts work through the minidom API
+(getElementsByTagName, firstChild, appendChild, setAttribute("w:id", ...)).
+This module provides that API on lxml trees, which take a fraction of
+minidom's memory and serialize much faster:
+
+- Elements, comments and processing instructions are lxml nodes with DOM
+  properties and methods added by custom element classes.
+- Text lives in lxml's text and tail slots; Text objects are views of a
+  slot and move its content on insertBefore/removeChild.
+- Qualified names ("w:p", "w14:paraId") are resolved against the in-scope
+  namespace declarations. Declaring a namespace with
+  setAttribute("xmlns:p", uri) takes effect on the root element when the
+  prefix is first used.
+- parse_position holds (line, None) from lxml's sourceline for parsed
+  elements, and is missing on inserted or created ones.
+
+Only the parts of the minidom API that the editors use are implemented.
+"""
+
+import copy
+import re
+import weakref
+import xml.dom
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Root element -> Document facade (see Document.__init__)
+_documents = weakref.WeakValueDictionary()
+# Element -> (owner, slot) its tail text moved to when it was removed (see Text)
+_moved_tails = weakref.WeakKeyDictionary()
+
+
+class _Node:
+    """DOM node properties shared by elements, comments and processing instructions."""
+
+    ELEMENT_NODE = 1
+    TEXT_NODE = 3
+    PROCESSING_INSTRUCTION_NODE = 7
+    COMMENT_NODE = 8
+    DOCUMENT_NODE = 9
+
+    childNodes = ()
+    firstChild = None
+    lastChild = None
+
+    def __bool__(self):
+        # lxml nodes are falsy without children; DOM nodes are always true
+        return True
+
+    @property
+    def parentNode(self):
+        parent = self.getparent()
+        if parent is None:
+            document = _documents.get(id(self))
+            if document is not None and document.documentElement is self:
+                return document
+        return parent
+
+    @property
+    def ownerDocument(self):
+        return _documents.get(id(self.getroottree().getroot()))
+
+    @property
+    def nextSibling(self):
+        if self.tail:
+            return Text(self, "tail")
+        return self.getnext()
+
+    @property
+    def previousSibling(self):
+        previous = self.getprevious()
+        if previous is not None:
+            return Text(previous, "tail") if previous.tail else previous
+        parent = self.getparent()
+        if parent is not None and parent.text:
+            return Text(parent, "text")
+        return None
+
+    def hasChildNodes(self):
+        return False
+
+    def cloneNode(self, deep=False):
+        clone = copy.deepcopy(self)
+        clone.tail = None
+        return clone
+
+    def toxml(self, encoding=None):
+        return etree.tostring(self, encoding=encoding or "unicode", with_tail=False)
+
+
+class Element(_Node, etree.ElementBase):
+    """An lxml element with the minidom Element API."""
+
+    nodeType = _Node.ELEMENT_NODE
+
+    @property
+    def tagName(self):
+        local = self.tag.rpartition("}")[2]
+        prefix = self.prefix
+        return f"{prefix}:{local}" if prefix else local
+
+    nodeName = tagName
+
+    @property
+    def localName(self):
+        return self.tag.rpartition("}")[2]
+
+    @property
+    def namespaceURI(self):
+        return etree.QName(self).namespace
+
+    @property
+    def parse_position(self):
+        # Line of the start tag, like the minidom engine; no column from lxml
+        if self.sourceline is None:
+            raise AttributeError("parse_position")
+        return (self.sourceline, None)
+
+    # Children
+
+    @property
+    def childNodes(self):
+        nodes = [Text(self, "text")] if self.text else []
+        for child in self:
+            nodes.append(child)
+            if child.tail:
+                nodes.append(Text(child, "tail"))
+        return nodes
+
+    @property
+    def firstChild(self):
+        if self.text:
+            return Text(self, "text")
+        return self[0] if len(self) else None
+
+    @property
+    def lastChild(self):
+        if not len(self):
+            return Text(self, "text") if self.text else None
+        last = self[-1]
+        return Text(last, "tail") if last.tail else last
+
+    def hasChildNodes(self):
+        return bool(self.text) or len(self) > 0
+
+    def toxml(self, encoding=None):
+        xml = etree.tostring(self, encoding="unicode", with_tail=False)
+        parent = self.getparent()
+        if parent is not None:
+            # Like minidom, leave out the declarations inherited from ancestors
+            end = xml.index(">")
+            start_tag = xml[:end]
+            for prefix, uri in parent.nsmap.items():
+                name = f"xmlns:{prefix}" if prefix else "xmlns"
+                start_tag = start_tag.replace(f' {name}="{uri}"', "", 1)
+            xml = start_tag + xml[end:]
+        return xml.encode(encoding, "xmlcharrefreplace") if encoding else xml
+
+    def getElementsByTagName(self, name):
+        tag = self._resolve_name(name)
+        return list(self.iterdescendants(tag)) if tag else []
+
+    def appendChild(self, node):
+        return self.insertBefore(node, None)
+
+    def insertBefore(self, node, ref):
+        """Insert node before ref (a child of this element), or last if ref is None."""
+        if isinstance(node, Text):
+            _insert_text(self, node, ref)
+            return node
+
+        _detach(node)
+        if ref is None:
+            self.append(node)
+        elif isinstance(ref, Text):
+            ref._resolve()
+            text = getattr(ref._owner, ref._slot)
+            setattr(ref._owner, ref._slot, None)
+            if ref._slot == "text":
+                self.insert(0, node)
+            else:
+                ref._owner.addnext(node)
+            node.tail = text
+            ref._bind(node, "tail")
+        else:
+            ref.addprevious(node)
+
+        document = self.ownerDocument
+        if document is not None and document._pending:
+            document._declare_used(node)
+        return node
+
+    def removeChild(self, node):
+        if isinstance(node, Text):
+            node._take()
+        else:
+            _detach(node)
+        return node
+
+    def replaceChild(self, new_child, old_child):
+        self.insertBefore(new_child, old_child)
+        return self.removeChild(old_child)
+
+    def cloneNode(self, deep=False):
+        if deep:
+            clone = copy.deepcopy(self)
+        else:
+            clone = self.makeelement(self.tag, self.attrib, nsmap=self.nsmap)
+        clone.tail = None
+        # Like minidom, copies have no parse position
+        for elem in clone.iter():
+            elem.sourceline = 0
+        return clone
+
+    # Attributes
+
+    @property
+    def attributes(self):
+        return _Attributes(self)
+
+    def getAttribute(self, name):
+        if name == "xmlns" or name.startswith("xmlns:"):
+            return self._namespaces().get(name[6:] or None, "")
+        key = self._resolve_name(name, attribute=True)
+        return self.get(key, "") if key else ""
+
+    def hasAttribute(self, name):
+        if name == "xmlns" or name.startswith("xmlns:"):
+            return (name[6:] or None) in self._namespaces()
+        key = self._resolve_name(name, attribute=True)
+        return key is not None and key in self.attrib
+
+    def setAttribute(self, name, value):
+        if name == "xmlns" or name.startswith("xmlns:"):
+            prefix = name[6:] or None
+            document = self.ownerDocument
+            if self.nsmap.get(prefix) != value and document is not None:
+                document._pending[prefix] = value
+            return
+
+        key = self._resolve_name(name, attribute=True)
+        if key is None:
+            raise ValueError(f"Undeclared namespace prefix in attribute: {name}")
+        self.set(key, value)
+
+        prefix = name.partition(":")[0] if ":" in name else None
+        if prefix not in (None, "xml") and prefix not in self.nsmap:
+            # Declared through setAttribute("xmlns:...") but not used before
+            document = self.ownerDocument
+            if document is not None:
+                document._declare_used(self)
+
+    def removeAttribute(self, name):
+        key = self._resolve_name(name, attribute=True)
+        if key is None or key not in self.attrib:
+            raise xml.dom.NotFoundErr()
+        del self.attrib[key]
+
+    def _namespaces(self):
+        """Get the in-scope namespaces, including pending declarations."""
+        document = self.ownerDocument
+        if document is None or not document._pending:
+            return self.nsmap
+        return {**document._pending, **self.nsmap}
+
+    def _resolve_name(self, name, attribute=False):
+        """Get the lxml name ("{uri}local") of a qualified name, or None if undeclared."""
+        prefix, _, local = name.rpartition(":")
+        if not prefix:
+            if attribute:
+                return local
+            uri = self.nsmap.get(None)
+        elif prefix == "xml":
+            uri = XML_NAMESPACE
+        else:
+            uri = self.nsmap.get(prefix)
+            if uri is None:
+                uri = self._namespaces().get(prefix)
+                if uri is None:
+                    return None
+        return f"{{{uri}}}{local}" if uri else local
+
+    def _qualified_name(self, key, prefixes):
+        """Get the qualified name of an lxml attribute name."""
+        if not key.startswith("{"):
+            return key
+        uri, _, local = key[1:].partition("}")
+        if uri == XML_NAMESPACE:
+            return f"xml:{local}"
+        prefix = prefixes.get(uri)
+        return f"{prefix}:{local}" if prefix else local
+
+
+class Comment(_Node, etree.CommentBase):
+    """An lxml comment with the minidom Comment API."""
+
+    nodeType = _Node.COMMENT_NODE
+    nodeName = "#comment"
+
+    @property
+    def data(self):
+        return self.text or ""
+
+    @data.setter
+    def data(self, value):
+        self.text = value
+
+
+class ProcessingInstruction(_Node, etree.PIBase):
+    """An lxml processing instruction with the minidom API."""
+
+    nodeType = _Node.PROCESSING_INSTRUCTION_NODE
+
+    @property
+    def nodeName(self):
+        return self.target
+
+    @property
+    def data(self):
+        return self.text or ""
+
+    @data.setter
+    def data(self, value):
+        self.text = value
+
+
+class Text:
+    """
+    A DOM text node: a view of an element's text or tail slot.
+
+    Detached text (removed, or created by createTextNode) holds its own data.
+    Inserting it merges the data into the slot at the insertion point, which
+    the node then refers to.
+    """
+
+    nodeType = _Node.TEXT_NODE
+    nodeName = "#text"
+    ELEMENT_NODE = _Node.ELEMENT_NODE
+    TEXT_NODE = _Node.TEXT_NODE
+    COMMENT_NODE = _Node.COMMENT_NODE
+    childNodes = ()
+    firstChild = None
+    lastChild = None
+
+    def __init__(self, owner=None, slot=None, data=""):
+        self._owner = owner
+        self._slot = slot
+        self._data = data
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        if not isinstance(other, Text) or self._owner is None:
+            return self is other
+        self._resolve()
+        other._resolve()
+        return self._owner is other._owner and self._slot == other._slot
+
+    def __hash__(self):
+        # Views of the same slot are equal, so they must hash alike
+        if self._owner is None:
+            return id(self)
+        self._resolve()
+        return hash((id(self._owner), self._slot))
+
+    @property
+    def data(self):
+        if self._owner is None:
+            return self._data
+        self._resolve()
+        return getattr(self._owner, self._slot) or ""
+
+    @data.setter
+    def data(self, value):
+        if self._owner is None:
+            self._data = value
+        else:
+            self._resolve()
+            setattr(self._owner, self._slot, value)
+
+    nodeValue = data
+
+    @property
+    def parentNode(self):
+        if self._owner is None:
+            return None
+        self._resolve()
+        return self._owner if self._slot == "text" else self._owner.getparent()
+
+    @property
+    def nextSibling(self):
+        if self._owner is None:
+            return None
+        self._resolve()
+        if self._slot == "text":
+            return self._owner[0] if len(self._owner) else None
+        return self._owner.getnext()
+
+    @property
+    def previousSibling(self):
+        if self._owner is None:
+            return None
+        self._resolve()
+        return self._owner if self._slot == "tail" else None
+
+    def hasChildNodes(self):
+        return False
+
+    def toxml(self, encoding=None):
+        text = escape(self.data)
+        return text.encode(encoding, "xmlcharrefreplace") if encoding else text
+
+    def _resolve(self):
+        """Follow the tail text of removed elements to where it was moved."""
+        seen = set()
+        while (
+            self._slot == "tail"
+            and self._owner.tail is None
+            and self._owner in _moved_tails
+            and self._owner not in seen
+        ):
+            seen.add(self._owner)
+            self._owner, self._slot = _moved_tails[self._owner]
+
+    def _bind(self, owner, slot):
+        self._owner, self._slot = owner, slot
+
+    def _take(self):
+        """Remove the text from its slot and hold it; return the data."""
+        data = self.data
+        if self._owner is not None:
+            setattr(self._owner, self._slot, None)
+            self._owner = None
+        self._data = data
+        return data
+
+
+class _Attribute:
+    """An attribute as returned by NamedNodeMap.item (name and value only)."""
+
+    def __init__(self, name, value):
+        self.name = self.nodeName = name
+        self.value = self.nodeValue = value
+
+    def __repr__(self):
+        return f"<Attribute {self.name}={self.value!r}>"
+
+
+class _Attributes:
+    """The NamedNodeMap of an element: namespace declarations, then attributes."""
+
+    def __init__(self, elem):
+        parent = elem.getparent()
+        if parent is None:
+            inherited, namespaces = {}, elem._namespaces()
+        else:
+            inherited, namespaces = parent.nsmap, elem.nsmap
+        items = [
+            (f"xmlns:{prefix}" if prefix else "xmlns", uri)
+            for prefix, uri in namespaces.items()
+            if inherited.get(prefix) != uri
+        ]
+        prefixes = {uri: prefix for prefix, uri in namespaces.items()}
+        items.extend(
+            (elem._qualified_name(key, prefixes), value)
+            for key, value in elem.attrib.items()
+        )
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def length(self):
+        return len(self._items)
+
+    def item(self, index):
+        if 0 <= index < len(self._items):
+            return _Attribute(*self._items[index])
+        return None
+
+    def keys(self):
+        return [name for name, _ in self._items]
+
+    def items(self):
+        return list(self._items)
+
+    def __getitem__(self, name):
+        for item_name, value in self._items:
+            if item_name == name:
+                return _Attribute(item_name, value)
+        raise KeyError(name)
+
+
+class Document:
+    """A parsed XML file with the minidom Document API."""
+
+    nodeType = _Node.DOCUMENT_NODE
+    nodeName = "#document"
+    parentNode = None
+    ELEMENT_NODE = _Node.ELEMENT_NODE
+    TEXT_NODE = _Node.TEXT_NODE
+    DOCUMENT_NODE = _Node.DOCUMENT_NODE
+
+    def __init__(self, tree, prefixes=()):
+        """
+        Args:
+            tree: lxml ElementTree parsed with create_parser()
+            prefixes: Namespace prefixes declared anywhere in the file; they
+                are kept when declarations are rewritten (see _declare_used)
+        """
+        self._tree = tree
+        self.documentElement = tree.getroot()
+        # Declared through setAttribute("xmlns:...") and not used yet
+        self._pending = {}
+        self._prefixes = set(prefixes) | {
+            p for p in self.documentElement.nsmap if p is not None
+        }
+        _documents[id(self.documentElement)] = self
+
+    def __bool__(self):
+        return True
+
+    @property
+    def childNodes(self):
+        root = self.documentElement
+        before = list(root.itersiblings(preceding=True))[::-1]
+        return [*before, root, *root.itersiblings()]
+
+    @property
+    def firstChild(self):
+        return self.childNodes[0]
+
+    def getElementsByTagName(self, name):
+        tag = self.documentElement._resolve_name(name)
+        return list(self.documentElement.iter(tag)) if tag else []
+
+    def iter(self, *tags):
+        """Iterate over the elements in document order (lxml's Element.iter)."""
+        return self.documentElement.iter(*tags)
+
+    def createElement(self, name):
+        root = self.documentElement
+        tag = root._resolve_name(name)
+        if tag is None:
+            raise ValueError(f"Undeclared namespace prefix in element: {name}")
+        prefix = name.rpartition(":")[0] or None
+        uri = etree.QName(tag).namespace
+        return root.makeelement(tag, nsmap={prefix: uri} if uri else None)
+
+    def createTextNode(self, data):
+        return Text(data=data)
+
+    def importNode(self, node, deep):
+        if isinstance(node, Text):
+            return Text(data=node.data)
+        return node.cloneNode(deep)
+
+    def toxml(self, encoding=None):
+        """Serialize the document like minidom's Document.toxml."""
+        if encoding is None:
+            body = etree.tostring(self._tree, encoding="unicode")
+            return f'<?xml version="1.0" ?>{body}'
+        body = etree.tostring(self._tree, encoding=encoding, xml_declaration=False)
+        return f'<?xml version="1.0" encoding="{encoding}"?>'.encode(encoding) + body
+
+    def parse_fragment(self, xml_content):
+        """
+        Parse an XML fragment, e.g. "<root xmlns:w=...>...</root>".
+
+        Returns:
+            list: The detached children of the fragment's root element
+                (Element, Text, Comment and ProcessingInstruction nodes)
+        """
+        wrapper = etree.fromstring(xml_content, create_parser())
+        nodes = [Text(data=wrapper.text)] if wrapper.text else []
+        wrapper.text = None
+        for child in list(wrapper):
+            if child.tail:
+                nodes.extend([child, Text(data=child.tail)])
+                child.tail = None
+            else:
+                nodes.append(child)
+            wrapper.remove(child)
+            for elem in child.iter():
+                elem.sourceline = 0
+        return nodes
+
+    def _declare_used(self, node):
+        """Declare the pending namespaces used in node's subtree on the root element."""
+        uris = {uri: prefix for prefix, uri in self._pending.items()}
+        used = {}
+        for elem in node.iter(etree.Element):
+            for name in (elem.tag, *elem.attrib):
+                if name.startswith("{"):
+                    uri = name[1:].partition("}")[0]
+                    if uri in uris:
+                        used[uris[uri]] = uri
+        if not used:
+            return
+
+        # Rewrite the auto-generated prefixes (ns0) to the declared ones, on the
+        # root, keeping every declaration the file had
+        etree.cleanup_namespaces(
+            self.documentElement,
+            top_nsmap=used,
+            keep_ns_prefixes=sorted(self._prefixes),
+        )
+        for prefix in used:
+            del self._pending[prefix]
+            self._prefixes.add(prefix)
+
+
+def create_parser():
+    """
+    Create an lxml parser that is safe for untrusted files.
+
+    Entities are not expanded, no DTD is loaded and nothing is fetched from
+    the network, like defusedxml's defaults. Nodes get the DOM classes of
+    this module.
+    """
+    parser = etree.XMLParser(
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+        dtd_validation=False,
+        huge_tree=False,
+    )
+    parser.set_element_class_lookup(
+        etree.ElementDefaultClassLookup(
+            element=Element, comment=Comment, pi=ProcessingInstruction
+        )
+    )
+    return parser
+
+
+def parse(path):
+    """
+    Parse an XML file into a Document.
+
+    Args:
+        path: Path to the XML file (str or Path)
+
+    Returns:
+        Document: The parsed document; elements have parse_position (line, None)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    root = etree.fromstring(data, create_parser())
+    prefixes = {p.decode() for p in re.findall(rb"xmlns:([^\s=/>]+)\s*=", data)}
+    return Document(root.getroottree(), prefixes)
+
+
+def element_text(elem):
+    """Get the text of an element without whitespace-only text nodes (see XMLEditor)."""
+    return "".join(text for text in elem.itertext() if text.strip())
+
+
+def iter_elements(node):
+    """Yield node (an Element or Document) and its descendant elements, in document order."""
+    return node.iter(etree.Element)
+
+
+def _detach(node):
+    """Remove an element from its parent, leaving its tail text in place."""
+    parent = node.getparent()
+    if parent is None:
+        return
+    if node.tail:
+        previous = node.getprevious()
+        owner, slot = (previous, "tail") if previous is not None else (parent, "text")
+        setattr(owner, slot, (getattr(owner, slot) or "") + node.tail)
+        node.tail = None
+        _moved_tails[node] = (owner, slot)
+    parent.remove(node)
+
+
+def _insert_text(parent, text, ref):
+    """Insert a Text node before ref (a child of parent), or last if ref is None."""
+    data = text._take()
+    if isinstance(ref, Text):
+        ref._resolve()
+        owner, slot = ref._owner, ref._slot
+        setattr(owner, slot, data + (getattr(owner, slot) or ""))
+    else:
+        previous = ref.getprevious() if ref is not None else None
+        if ref is None and len(parent):
+            previous = parent[-1]
+        owner, slot = (previous, "tail") if previous is not None else (parent, "text")
+        setattr(owner, slot, (getattr(owner, slot) or "") + data)
+    text._bind(owner, slot)
@@ -8,6 +8,7 @@ annotated with its original line and column position during parsing.
 
 Example usage:
     editor = XMLEditor("document.xml")
+    editor = XMLEditor("document.xml", engine="lxml")  # Faster on large files
 
     # Find node by line number or range
     elem = editor.get_node(tag="w:r", line_number=519)
@@ -22,6 +23,12 @@ Example usage:
     # Combine filters
     elem = editor.get_node(tag="w:p", line_number=range(1, 50), contains="text")
 
+    # Find every match, or resolve many lookups at once
+    runs = editor.find_all("w:r", line_number=range(1000, 5000), contains="X")
+    query = NodeQuery("w:p", pattern=r"\bTotal\b")
+    paras = list(editor.iter_nodes(query))
+    start, end = editor.get_nodes([NodeQuery("w:p", contains="A"), NodeQuery("w:p", contains="B")])
+
     # Replace, insert, or manipulate
     new_elem = editor.replace_node(elem, "<w:r><w:t>new text</w:t></w:r>")
     editor.insert_after(new_elem, "<w:r><w:t>more</w:t></w:r>")
@@ -30,12 +37,138 @@ Example usage:
     editor.save()
 """
 
+import bisect
 import html
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Optional, Union
+from xml.parsers.expat import ExpatError
 
 import defusedxml.minidom
 import defusedxml.sax
+from lxml import etree
+
+from . import lxml_dom
+
+# DOM implementations XMLEditor can parse into
+ENGINES = ("minidom", "lxml")
+
+# Parsed fragments each XMLEditor keeps for reuse (see XMLEditor._parse_fragment)
+FRAGMENT_CACHE_SIZE = 128
+
+
+class NodeQuery:
+    """
+    Compiled node query for XMLEditor.get_node, find_all, iter_nodes and get_nodes.
+
+    Build a query once and reuse it across lookups; the text filters are
+    normalized and compiled up front.
+
+    Attributes:
+        tag: The XML tag name (e.g., "w:p"), or "*" for any element
+        attrs: Attribute name to expected value, or to a predicate called with
+            the attribute value ("" if the attribute is missing)
+        line_number: Line number (int) or line range (range) in the original file
+        contains: Text that must appear in the element's text
+        pattern: Compiled regular expression searched in the element's text
+    """
+
+    def __init__(
+        self,
+        tag: str,
+        attrs: Optional[dict[str, Union[str, Callable[[str], bool]]]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+        pattern: Optional[Union[str, re.Pattern]] = None,
+    ):
+        """
+        Args:
+            tag: The XML tag name (e.g., "w:del", "w:ins", "w:r")
+            attrs: Dictionary of attribute names to values or predicates
+                (e.g., {"w:id": "1"} or {"w:id": lambda v: int(v) > 5})
+            line_number: Line number (int) or line range (range) in original XML file (1-indexed)
+            contains: Text string that must appear in any text node within the element.
+                      Supports both entity notation (&#8220;) and Unicode characters (\u201c).
+            pattern: Regular expression (str or compiled) searched in the element's text
+        """
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.line_number = line_number
+        self.contains = contains
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        # Normalize the search string: convert HTML entities to Unicode characters
+        # This allows searching for both "&#8220;Rowan" and ""Rowan"
+        self._unescaped_contains = (
+            html.unescape(contains) if contains is not None else None
+        )
+
+    def matches(self, elem, get_text) -> bool:
+        """
+        Check an element against every filter of the query.
+
+        Args:
+            elem: defusedxml.minidom.Element to check
+            get_text: Function returning the text of an element (see
+                XMLEditor._get_element_text)
+        """
+        if self.tag != "*" and elem.tagName != self.tag:
+            return False
+
+        # Check line_number filter
+        if self.line_number is not None:
+            elem_line = getattr(elem, "parse_position", (None,))[0]
+            # Handle both single line number and range
+            if isinstance(self.line_number, range):
+                if elem_line not in self.line_number:
+                    return False
+            elif elem_line != self.line_number:
+                return False
+
+        # Check attrs filter
+        for attr_name, expected in self.attrs.items():
+            value = elem.getAttribute(attr_name)
+            if callable(expected):
+                if not expected(value):
+                    return False
+            elif value != expected:
+                return False
+
+        # Check text filters
+        if self._unescaped_contains is not None or self.pattern is not None:
+            elem_text = get_text(elem)
+            if (
+                self._unescaped_contains is not None
+                and self._unescaped_contains not in elem_text
+            ):
+                return False
+            if self.pattern is not None and not self.pattern.search(elem_text):
+                return False
+
+        return True
+
+    def describe(self) -> str:
+        """Describe the query for error messages, e.g. "<w:p> at line 5"."""
+        filters = []
+        if self.line_number is not None:
+            line_str = (
+                f"lines {self.line_number.start}-{self.line_number.stop - 1}"
+                if isinstance(self.line_number, range)
+                else f"line {self.line_number}"
+            )
+            filters.append(f"at {line_str}")
+        if self.attrs:
+            filters.append(f"with attributes {self.attrs}")
+        if self.contains is not None:
+            filters.append(f"containing '{self.contains}'")
+        if self.pattern is not None:
+            filters.append(f"matching '{self.pattern.pattern}'")
+
+        filter_desc = " ".join(filters) if filters else ""
+        return f"<{self.tag}> {filter_desc}".strip()
+
+    def __repr__(self):
+        return f"NodeQuery({self.describe()})"
 
 
 class XMLEditor:
@@ -49,36 +182,54 @@ class XMLEditor:
     Attributes:
         xml_path: Path to the XML file being edited
         encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        engine: DOM implementation, "minidom" or "lxml"
         dom: Parsed DOM tree with parse_position attributes on elements
     """
 
-    def __init__(self, xml_path):
+    def __init__(self, xml_path, engine="minidom"):
         """
         Initialize with path to XML file and parse with line number tracking.
 
         Args:
             xml_path: Path to XML file to edit (str or Path)
+            engine: "minidom" (default) or "lxml", which parses large files
+                several times faster into a fraction of the memory. Both
+                offer the same minidom API (see lxml_dom).
 
         Raises:
-            ValueError: If the XML file does not exist
+            ValueError: If the XML file does not exist or the engine is unknown
         """
         self.xml_path = Path(xml_path)
         if not self.xml_path.exists():
             raise ValueError(f"XML file not found: {xml_path}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {ENGINES})")
+        self.engine = engine
 
         with open(self.xml_path, "rb") as f:
             header = f.read(200).decode("utf-8", errors="ignore")
         self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
 
-        parser = _create_line_tracking_parser()
-        self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        if engine == "lxml":
+            self.dom = lxml_dom.parse(self.xml_path)
+        else:
+            parser = _create_line_tracking_parser()
+            self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+
+        # Lookup indexes, built on the first query (see _NodeIndex)
+        self._index = None
+        # Start tag declaring the root's namespaces to parse fragments in, and
+        # the most recently parsed fragments (see _parse_fragment)
+        self._fragment_root = None
+        self._fragments = OrderedDict()
 
     def get_node(
         self,
-        tag: str,
+        tag: Union[str, NodeQuery],
         attrs: Optional[dict[str, str]] = None,
         line_number: Optional[Union[int, range]] = None,
         contains: Optional[str] = None,
+        pattern: Optional[Union[str, re.Pattern]] = None,
     ):
         """
         Get a DOM element by tag and identifier.
@@ -87,11 +238,13 @@ class XMLEditor:
         matching attribute values. Exactly one match must be found.
 
         Args:
-            tag: The XML tag name (e.g., "w:del", "w:ins", "w:r")
+            tag: The XML tag name (e.g., "w:del", "w:ins", "w:r"), or a NodeQuery
+                (then no other filters may be given)
             attrs: Dictionary of attribute name-value pairs to match (e.g., {"w:id": "1"})
             line_number: Line number (int) or line range (range) in original XML file (1-indexed)
             contains: Text string that must appear in any text node within the element.
                       Supports both entity notation (&#8220;) and Unicode characters (\u201c).
+            pattern: Regular expression (str or compiled) searched in the element's text
 
         Returns:
             defusedxml.minidom.Element: The matching DOM element
@@ -109,76 +262,157 @@ class XMLEditor:
             elem = editor.get_node(tag="w:t", contains="&#8220;Agreement")  # Entity notation
             elem = editor.get_node(tag="w:t", contains="\u201cAgreement")   # Unicode character
         """
-        matches = []
-        for elem in self.dom.getElementsByTagName(tag):
-            # Check line_number filter
-            if line_number is not None:
-                parse_pos = getattr(elem, "parse_position", (None,))
-                elem_line = parse_pos[0]
-
-                # Handle both single line number and range
-                if isinstance(line_number, range):
-                    if elem_line not in line_number:
-                        continue
+        query = _as_query(tag, attrs, line_number, contains, pattern)
+        return self.get_nodes([query])[0]
+
+    def get_nodes(self, queries):
+        """
+        Get one DOM element per query, resolving all lookups in one pass over the DOM.
+
+        The first lookup builds the editor's indexes (tag, attribute values,
+        line numbers) in a single traversal; each query is then answered from
+        them. As with get_node, every query must match exactly one element.
+
+        Args:
+            queries: NodeQuery objects, or dicts of get_node keyword arguments
+
+        Returns:
+            list[defusedxml.minidom.Element]: The matching element of each query, in order
+
+        Raises:
+            ValueError: If a query matches no node or multiple nodes
+
+        Example:
+            start, end = editor.get_nodes([
+                NodeQuery("w:p", contains="First clause"),
+                {"tag": "w:p", "attrs": {"w14:paraId": "12345678"}},
+            ])
+        """
+        results = []
+        for query in queries:
+            if not isinstance(query, NodeQuery):
+                query = NodeQuery(**query)
+            matches = self._find(query)
+            if len(matches) != 1:
+                # The DOM may have been changed directly: retry on fresh indexes
+                self.reindex()
+                matches = self._find(query)
+
+            if not matches:
+                # Add helpful hint based on filters used
+                if query.contains or query.pattern is not None:
+                    hint = "Text may be split across elements or use different wording."
+                elif query.line_number:
+                    hint = "Line numbers may have changed if document was modified."
+                elif query.attrs:
+                    hint = "Verify attribute values are correct."
                 else:
-                    if elem_line != line_number:
-                        continue
-
-            # Check attrs filter
-            if attrs is not None:
-                if not all(
-                    elem.getAttribute(attr_name) == attr_value
-                    for attr_name, attr_value in attrs.items()
-                ):
-                    continue
-
-            # Check contains filter
-            if contains is not None:
-                elem_text = self._get_element_text(elem)
-                # Normalize the search string: convert HTML entities to Unicode characters
-                # This allows searching for both "&#8220;Rowan" and ""Rowan"
-                normalized_contains = html.unescape(contains)
-                if normalized_contains not in elem_text:
-                    continue
-
-            # If all applicable filters passed, this is a match
-            matches.append(elem)
-
-        if not matches:
-            # Build descriptive error message
-            filters = []
-            if line_number is not None:
-                line_str = (
-                    f"lines {line_number.start}-{line_number.stop - 1}"
-                    if isinstance(line_number, range)
-                    else f"line {line_number}"
+                    hint = "Try adding filters (attrs, line_number, or contains)."
+
+                raise ValueError(f"Node not found: {query.describe()}. {hint}")
+            if len(matches) > 1:
+                raise ValueError(
+                    f"Multiple nodes found: <{query.tag}>. "
+                    f"Add more filters (attrs, line_number, or contains) to narrow the search."
                 )
-                filters.append(f"at {line_str}")
-            if attrs is not None:
-                filters.append(f"with attributes {attrs}")
-            if contains is not None:
-                filters.append(f"containing '{contains}'")
-
-            filter_desc = " ".join(filters) if filters else ""
-            base_msg = f"Node not found: <{tag}> {filter_desc}".strip()
-
-            # Add helpful hint based on filters used
-            if contains:
-                hint = "Text may be split across elements or use different wording."
-            elif line_number:
-                hint = "Line numbers may have changed if document was modified."
-            elif attrs:
-                hint = "Verify attribute values are correct."
-            else:
-                hint = "Try adding filters (attrs, line_number, or contains)."
+            results.append(matches[0])
+        return results
+
+    def find_all(
+        self,
+        tag: Union[str, NodeQuery],
+        attrs: Optional[dict[str, str]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+        pattern: Optional[Union[str, re.Pattern]] = None,
+    ):
+        """
+        Get every DOM element matching a query, in document order.
+
+        Takes the same filters as get_node, but any number of matches is allowed.
+
+        Returns:
+            list[defusedxml.minidom.Element]: The matching elements (possibly none)
+
+        Example:
+            runs = editor.find_all("w:r", line_number=range(1000, 5000), contains="X")
+            others = editor.find_all("w:ins", attrs={"w:author": lambda a: a != "Claude"})
+        """
+        return list(self.iter_nodes(tag, attrs, line_number, contains, pattern))
+
+    def iter_nodes(
+        self,
+        tag: Union[str, NodeQuery],
+        attrs: Optional[dict[str, str]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+        pattern: Optional[Union[str, re.Pattern]] = None,
+    ):
+        """
+        Yield every DOM element matching a query, in document order.
 
-            raise ValueError(f"{base_msg}. {hint}")
+        The matches are collected before the first one is yielded, so the DOM
+        may be edited while iterating.
+        """
+        query = _as_query(tag, attrs, line_number, contains, pattern)
+        matches = self._find(query)
         if len(matches) > 1:
-            raise ValueError(
-                f"Multiple nodes found: <{tag}>. "
-                f"Add more filters (attrs, line_number, or contains) to narrow the search."
-            )
-        return matches[0]
+            matches.sort(key=self._index.position)
+        yield from matches
+
+    def reindex(self):
+        """
+        Drop the lookup indexes, e.g. after changing the DOM directly.
+
+        The editor's own methods keep the indexes current; this is only needed
+        when nodes or attributes were changed through the DOM API and a
+        find_all/iter_nodes query must see the change. get_node and get_nodes
+        retry on fresh indexes by themselves before reporting no or multiple
+        matches. Namespace declarations added to the root element are read
+        again as well.
+        """
+        self._index = None
+        self._fragment_root = None
+
+    def _find(self, query):
+        """Return the elements matching a query, in no particular order."""
+        if self._index is None:
+            self._index = _NodeIndex(self.dom)
+        matches = [
+            elem
+            for elem in self._index.candidates(query)
+            if query.matches(elem, self._get_cached_text)
+            and _in_document(elem, self.dom)
+        ]
+        if query.contains is not None or query.pattern is not None:
+            # Text changed through the DOM isn't seen by the cache: check the
+            # matches against the current text
+            matches = [
+                elem for elem in matches if query.matches(elem, self._get_fresh_text)
+            ]
+        return matches
+
+    def _get_cached_text(self, elem):
+        """Get _get_element_text(elem), cached until the element changes."""
+        text = self._index.texts.get(elem)
+        if text is None:
+            text = self._index.texts[elem] = self._get_element_text(elem)
+        return text
+
+    def _get_fresh_text(self, elem):
+        """Get _get_element_text(elem), replacing its cached text."""
+        text = self._index.texts[elem] = self._get_element_text(elem)
+        return text
+
+    def _nodes_changed(self, parent, added=(), removed=()):
+        """Update the lookup indexes after nodes were added to or removed from parent."""
+        if self._index is None:
+            return
+        for node in removed:
+            self._index.remove(node)
+        for node in added:
+            self._index.add(node)
+        self._index.touch(parent)
 
     def _get_element_text(self, elem):
         """
@@ -193,6 +427,8 @@ class XMLEditor:
         Returns:
             str: Concatenated text from all non-whitespace text nodes within the element
         """
+        if self.engine == "lxml":
+            return lxml_dom.element_text(elem)
         text_parts = []
         for node in elem.childNodes:
             if node.nodeType == node.TEXT_NODE:
@@ -222,6 +458,7 @@ class XMLEditor:
         for node in nodes:
             parent.insertBefore(node, elem)
         parent.removeChild(elem)
+        self._nodes_changed(parent, added=nodes, removed=[elem])
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -246,6 +483,7 @@ class XMLEditor:
                 parent.insertBefore(node, next_sibling)
             else:
                 parent.appendChild(node)
+        self._nodes_changed(parent, added=nodes)
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -266,6 +504,7 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             parent.insertBefore(node, elem)
+        self._nodes_changed(parent, added=nodes)
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -285,6 +524,7 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             elem.appendChild(node)
+        self._nodes_changed(elem, added=nodes)
         return nodes
 
     def get_next_rid(self):
@@ -299,6 +539,14 @@ class XMLEditor:
                     pass
         return f"rId{max_id + 1}"
 
+    def _ensure_namespace(self, prefix, uri):
+        """Ensure a namespace prefix is declared on the root element."""
+        root = self.dom.documentElement
+        if not root.hasAttribute(f"xmlns:{prefix}"):  # type: ignore
+            root.setAttribute(f"xmlns:{prefix}", uri)  # type: ignore
+            # Fragments may now use the prefix
+            self._fragment_root = None
+
     def save(self):
         """
         Save the edited XML back to the file.
@@ -313,15 +561,57 @@ class XMLEditor:
         """
         Parse XML fragment and return list of imported nodes.
 
+        The parsed fragments of the last FRAGMENT_CACHE_SIZE distinct strings
+        are kept as templates, so inserting the same XML again only copies
+        nodes.
+
         Args:
             xml_content: String containing XML fragment
 
         Returns:
-            List of defusedxml.minidom.Node objects imported into this document
+            List of DOM nodes imported into this document (fresh copies)
 
         Raises:
             AssertionError: If fragment contains no element nodes
         """
+        templates = self._fragments.get(xml_content)
+        if templates is None:
+            templates = self._parse_fragment_templates(xml_content)
+            self._fragments[xml_content] = templates
+            if len(self._fragments) > FRAGMENT_CACHE_SIZE:
+                self._fragments.popitem(last=False)
+        else:
+            self._fragments.move_to_end(xml_content)
+        return [self.dom.importNode(node, deep=True) for node in templates]
+
+    def _parse_fragment_templates(self, xml_content):
+        """Parse XML fragment into nodes that are copied into the document on use."""
+        if self._fragment_root is None:
+            self._fragment_root = self._get_fragment_root()
+        try:
+            nodes = self._parse_wrapped(xml_content)
+        except (ExpatError, etree.XMLSyntaxError):
+            # Namespaces may have been declared on the root element through
+            # the DOM since the wrapper was built
+            fragment_root = self._get_fragment_root()
+            if fragment_root == self._fragment_root:
+                raise
+            self._fragment_root = fragment_root
+            nodes = self._parse_wrapped(xml_content)
+        elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+        assert elements, "Fragment must contain at least one element"
+        return nodes
+
+    def _parse_wrapped(self, xml_content):
+        """Parse XML fragment in the fragment wrapper and return the wrapper's children."""
+        wrapper = f"{self._fragment_root}{xml_content}</root>"
+        if self.engine == "lxml":
+            return self.dom.parse_fragment(wrapper)
+        fragment_doc = defusedxml.minidom.parseString(wrapper)
+        return list(fragment_doc.documentElement.childNodes)  # type: ignore
+
+    def _get_fragment_root(self):
+        """Get the start tag of the fragment wrapper, declaring the root element's namespaces."""
         # Extract namespace declarations from the root document element
         root_elem = self.dom.documentElement
         namespaces = []
@@ -332,15 +622,167 @@ class XMLEditor:
                     namespaces.append(f'{attr.name}="{attr.value}"')  # type: ignore
 
         ns_decl = " ".join(namespaces)
-        wrapper = f"<root {ns_decl}>{xml_content}</root>"
-        fragment_doc = defusedxml.minidom.parseString(wrapper)
-        nodes = [
-            self.dom.importNode(child, deep=True)
-            for child in fragment_doc.documentElement.childNodes  # type: ignore
+        return f"<root {ns_decl}>"
+
+
+class _NodeIndex:
+    """
+    Lookup tables for XMLEditor queries, built lazily from one traversal of the DOM.
+
+    The editor keeps them current through add/remove/touch as its methods
+    change the DOM. Entries are candidates only: XMLEditor._find re-checks
+    every one against the DOM, so an element changed or detached since it
+    was indexed is never returned.
+    """
+
+    def __init__(self, dom):
+        # tag -> {element: None}
+        self.by_tag = {}
+        # element -> position in document order, until elements are added
+        self._positions = {}
+        for position, elem in enumerate(_iter_elements(dom)):
+            self.by_tag.setdefault(elem.tagName, {})[elem] = None
+            self._positions[elem] = position
+        self.dom = dom
+
+        # (tag, attribute) -> {value: {element: None}}, built on first use
+        self._by_attr = {}
+        # (tag, attribute) -> {element: indexed value}
+        self._attr_values = {}
+        # (tag, attribute) -> elements whose value must be read again
+        self._stale_attrs = {}
+        # tag -> ([line, ...], [element, ...]) sorted by line, built on first use
+        self._lines = {}
+        # element -> text, see XMLEditor._get_cached_text
+        self.texts = {}
+
+    def candidates(self, query):
+        """Get the indexed elements that may match a query."""
+        if query.tag == "*":
+            return [elem for elems in self.by_tag.values() for elem in elems]
+
+        # Exact attribute values are the most selective
+        attr_matches = [
+            self._with_attr(query.tag, name, value)
+            for name, value in query.attrs.items()
+            if isinstance(value, str)
         ]
-        elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
-        assert elements, "Fragment must contain at least one element"
-        return nodes
+        if attr_matches:
+            return list(min(attr_matches, key=len))
+
+        if query.line_number is not None:
+            return self._on_lines(query.tag, query.line_number)
+        return list(self.by_tag.get(query.tag, ()))
+
+    def position(self, elem):
+        """Get the position of an element in document order."""
+        if self._positions is None:
+            self._positions = {
+                e: position for position, e in enumerate(_iter_elements(self.dom))
+            }
+        # Detached elements sort last
+        return self._positions.get(elem, len(self._positions))
+
+    def add(self, node):
+        """Index node and its descendants, which are new or were changed in place."""
+        for elem in _iter_elements(node):
+            tag = elem.tagName
+            self.by_tag.setdefault(tag, {})[elem] = None
+            self.texts.pop(elem, None)
+            for key, stale in self._stale_attrs.items():
+                if key[0] == tag:
+                    stale.append(elem)
+        self._positions = None
+
+    def remove(self, node):
+        """Drop node and its descendants, which were removed from the DOM."""
+        for elem in _iter_elements(node):
+            self.by_tag.get(elem.tagName, {}).pop(elem, None)
+            self.texts.pop(elem, None)
+            for key, values in self._attr_values.items():
+                if key[0] == elem.tagName and elem in values:
+                    self._by_attr[key][values.pop(elem)].pop(elem, None)
+
+    def touch(self, node):
+        """Drop the cached text of node and its ancestors, whose content changed."""
+        while node is not None:
+            self.texts.pop(node, None)
+            node = node.parentNode
+
+    def _with_attr(self, tag, name, value):
+        """Get the elements of a tag whose attribute has a value."""
+        key = (tag, name)
+        if key not in self._by_attr:
+            self._by_attr[key] = {}
+            self._attr_values[key] = {}
+            self._stale_attrs[key] = list(self.by_tag.get(tag, ()))
+
+        # Read the values of new and changed elements now, so attributes set
+        # right after an insertion are seen
+        by_value, values = self._by_attr[key], self._attr_values[key]
+        for elem in self._stale_attrs[key]:
+            if elem in values:
+                by_value[values[elem]].pop(elem, None)
+            values[elem] = elem.getAttribute(name)
+            by_value.setdefault(values[elem], {})[elem] = None
+        self._stale_attrs[key] = []
+
+        return by_value.get(value, {})
+
+    def _on_lines(self, tag, line_number):
+        """Get the elements of a tag parsed at a line or in a line range."""
+        if tag not in self._lines:
+            positioned = sorted(
+                (elem.parse_position, i, elem)
+                for i, elem in enumerate(self.by_tag.get(tag, ()))
+                if hasattr(elem, "parse_position")
+            )
+            self._lines[tag] = (
+                [position[0] for position, _, _ in positioned],
+                [elem for _, _, elem in positioned],
+            )
+        lines, elems = self._lines[tag]
+
+        if isinstance(line_number, range):
+            if line_number.step < 0:
+                return elems
+            start = bisect.bisect_left(lines, line_number.start)
+            end = bisect.bisect_left(lines, line_number.stop)
+        else:
+            start = bisect.bisect_left(lines, line_number)
+            end = bisect.bisect_right(lines, line_number)
+        return elems[start:end]
+
+
+def _as_query(tag, attrs, line_number, contains, pattern):
+    """Get the NodeQuery for get_node style arguments (tag may already be one)."""
+    if not isinstance(tag, NodeQuery):
+        return NodeQuery(tag, attrs, line_number, contains, pattern)
+    if any(f is not None for f in (attrs, line_number, contains, pattern)):
+        raise ValueError("Pass filters either in the NodeQuery or as arguments")
+    return tag
+
+
+def _iter_elements(node):
+    """Yield node (if an element) and its descendant elements, in document order."""
+    if isinstance(node, (lxml_dom.Document, lxml_dom.Element)):
+        yield from lxml_dom.iter_elements(node)
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.nodeType == node.ELEMENT_NODE:
+            yield node
+        if node.childNodes:
+            stack.extend(reversed(node.childNodes))
+
+
+def _in_document(elem, dom):
+    """Check whether an element is (still) part of the DOM."""
+    node = elem.parentNode
+    while node is not None and node is not dom:
+        node = node.parentNode
+    return node is dom
 
 
 def _create_line_tracking_parser():
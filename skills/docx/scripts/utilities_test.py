@@ -0,0 +1,388 @@
+import random
+import re
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from lxml import etree
+
+from .document import DocxXMLEditor
+from .utilities import ENGINES, NodeQuery, XMLEditor, _iter_elements
+
+W14 = "http://schemas.microsoft.com/office/word/2010/wordml"
+
+
+def document_xml(paragraphs=30):
+    """A document.xml laid out like unpack.py's output, one tag per line."""
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<w:document "
+        'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        f'xmlns:w14="{W14}">',
+        "  <w:body>",
+    ]
+    for i in range(paragraphs):
+        lines.append(f'    <w:p w14:paraId="{i:08X}" w:rsidR="00A1B2C3">')
+        lines.extend(
+            [
+                '      <w:r w:rsidR="00A1B2C3">',
+                f"        <w:t>Paragraph number {i} </w:t>",
+                "      </w:r>",
+                "      <w:r>",
+                f'        <w:t xml:space="preserve"> of part {i % 7} &amp; more</w:t>',
+                "      </w:r>",
+            ]
+        )
+        if i % 5 == 0:
+            lines.extend(
+                [
+                    f'      <w:del w:id="{i}" w:author="Reviewer" w:date="2024-01-01T00:00:00Z">',
+                    "        <w:r>",
+                    f"          <w:delText>formerly {i}</w:delText>",
+                    "        </w:r>",
+                    "      </w:del>",
+                ]
+            )
+        if i % 5 == 1:
+            lines.extend(
+                [
+                    f'      <w:ins w:id="{i}" w:author="Reviewer" w:date="2024-01-01T00:00:00Z">',
+                    "        <w:r>",
+                    f"          <w:t>added {i}</w:t>",
+                    "        </w:r>",
+                    "      </w:ins>",
+                ]
+            )
+        lines.append("    </w:p>")
+    lines.extend(["  </w:body>", "</w:document>"])
+    return "\n".join(lines)
+
+
+def canonical(xml_path):
+    """The saved document, ignoring timestamps and whitespace-only text."""
+    data = re.sub(rb' (w:date|w16du:dateUtc)="[^"]*"', b"", xml_path.read_bytes())
+    root = etree.fromstring(data)
+    for elem in root.iter():
+        if elem.text is not None and not elem.text.strip():
+            elem.text = None
+        if elem.tail is not None and not elem.tail.strip():
+            elem.tail = None
+    return etree.tostring(root, method="c14n")
+
+
+def text_runs(editor):
+    return [
+        r
+        for r in editor.dom.getElementsByTagName("w:r")
+        if r.getElementsByTagName("w:t")
+    ]
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+# Run from the docx skill root: python -m unittest scripts.utilities_test
+class EditorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.source = self.work_dir / "source.xml"
+        self.source.write_text(document_xml())
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def open_editor(self, engine, cls=XMLEditor, **kwargs):
+        xml_path = self.work_dir / f"{engine}.xml"
+        shutil.copyfile(self.source, xml_path)
+        return cls(xml_path, engine=engine, **kwargs)
+
+
+class TestEnginesAgree(EditorTestCase):
+    """The minidom and lxml engines must give the same results and documents."""
+
+    def run_on_engines(self, session):
+        results = {}
+        for engine in ENGINES:
+            # Same paraIds and textIds on both engines
+            random.seed(0)
+            editor = self.open_editor(engine, DocxXMLEditor, rsid="00C0FFEE")
+            log = session(editor)
+            editor.save()
+            results[engine] = (log, canonical(editor.xml_path))
+        return results
+
+    def assertEnginesAgree(self, results):
+        (minidom_log, minidom_xml), (lxml_log, lxml_xml) = results.values()
+        self.assertEqual(minidom_log, lxml_log)
+        self.assertEqual(minidom_xml, lxml_xml)
+
+    def test_edit_session(self):
+        """Test the editing methods, direct DOM edits and queries"""
+
+        def session(editor):
+            log = []
+            paragraphs = editor.dom.getElementsByTagName("w:p")
+            runs = text_runs(editor)
+
+            editor.replace_node(runs[0], "<w:r><w:t>Replaced</w:t></w:r>")
+            nodes = editor.insert_after(
+                paragraphs[2], "<w:p><w:r><w:t> spaced </w:t></w:r></w:p>\n<w:p/>"
+            )
+            log.append([node.nodeName for node in nodes])
+            editor.insert_before(runs[5], "<w:ins><w:r><w:t>new</w:t></w:r></w:ins>")
+            editor.append_to(paragraphs[3], "<w:r><w:t>end</w:t></w:r><!-- note -->")
+            editor.suggest_deletion(runs[8])
+            editor.suggest_deletion(paragraphs[12])
+            editor.revert_insertion(editor.dom.getElementsByTagName("w:ins")[-1])
+            log.append(
+                len(editor.revert_deletion(editor.dom.getElementsByTagName("w:del")[0]))
+            )
+            with editor.batch():
+                for para in paragraphs[20:25]:
+                    editor.insert_after(
+                        para, "<w:p><w:ins><w:r><w:t>batched</w:t></w:r></w:ins></w:p>"
+                    )
+
+            # Direct DOM edits
+            para = paragraphs[6]
+            para.appendChild(para.firstChild)
+            para.setAttribute("xml:space", "preserve")
+            para.removeAttribute("w:rsidR")
+            editor.dom.documentElement.setAttribute("xmlns:zz", "urn:zz")
+            para.setAttribute("zz:mark", "1")
+            editor.insert_after(para, "<zz:x/>")
+            paragraphs[7].parentNode.removeChild(paragraphs[7])
+            editor.reindex()
+
+            for query in (
+                NodeQuery("w:p", contains="Paragraph number 1"),
+                NodeQuery("w:r", pattern=r"part [35]"),
+                NodeQuery("w:r", line_number=range(40, 90)),
+                NodeQuery("w:ins", attrs={"w:author": "Claude"}),
+                NodeQuery("w:p", attrs={"zz:mark": "1"}),
+            ):
+                log.append(
+                    [
+                        (
+                            elem.tagName,
+                            editor._get_element_text(elem),
+                            getattr(elem, "parse_position", (None,))[0],
+                            sorted(elem.attributes.keys()),
+                        )
+                        for elem in editor.find_all(query)
+                    ]
+                )
+            para = editor.get_node(tag="w:p", attrs={"w14:paraId": "0000000A"})
+            log.append(editor._get_element_text(para))
+            return log
+
+        self.assertEnginesAgree(self.run_on_engines(session))
+
+    def test_random_sessions(self):
+        """Test random sequences of edits and queries"""
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertEnginesAgree(
+                    self.run_on_engines(lambda editor: random_session(editor, seed))
+                )
+
+
+def random_session(editor, seed, steps=120):
+    rnd = random.Random(seed)
+    words = "Paragraph number part more formerly added 1 2 3".split()
+    log = []
+    for step in range(steps):
+        paragraphs = editor.dom.getElementsByTagName("w:p")
+        runs = text_runs(editor)
+        para = paragraphs[rnd.randrange(len(paragraphs))]
+        run = runs[rnd.randrange(len(runs))] if runs else None
+        word = rnd.choice(words)
+        op = rnd.random()
+        try:
+            if op < 0.1 and run:
+                editor.replace_node(run, f"<w:r><w:t>{word} new</w:t></w:r>")
+            elif op < 0.2:
+                editor.insert_after(para, f"<w:p><w:r><w:t>{word}</w:t></w:r></w:p>")
+            elif op < 0.25 and run:
+                editor.insert_before(
+                    run, f"<w:ins><w:r><w:t>{word}</w:t></w:r></w:ins>"
+                )
+            elif op < 0.3:
+                editor.append_to(para, f"<w:r><w:t> {word} </w:t></w:r>")
+            elif op < 0.38 and run:
+                editor.suggest_deletion(run)
+            elif op < 0.42:
+                if not para.getElementsByTagName(
+                    "w:ins"
+                ) and not para.getElementsByTagName("w:del"):
+                    editor.suggest_deletion(para)
+            elif op < 0.46:
+                insertions = editor.dom.getElementsByTagName("w:ins")
+                if insertions:
+                    editor.revert_insertion(insertions[step % len(insertions)])
+            elif op < 0.5:
+                deletions = editor.dom.getElementsByTagName("w:del")
+                if deletions:
+                    editor.revert_deletion(deletions[step % len(deletions)])
+            elif op < 0.56:
+                if para.firstChild:
+                    para.appendChild(para.firstChild)
+                para.setAttribute("w14:paraId", f"{step:08X}")
+                editor.reindex()
+            elif op < 0.75:
+                query = NodeQuery(rnd.choice(["w:p", "w:r", "w:t"]), contains=word)
+                log.append(
+                    [editor._get_element_text(e) for e in editor.find_all(query)]
+                )
+            elif op < 0.85:
+                start = rnd.randrange(1, 200)
+                query = NodeQuery("w:r", line_number=range(start, start + 30))
+                log.append([e.getAttribute("w:rsidR") for e in editor.find_all(query)])
+            else:
+                para_id = para.getAttribute("w14:paraId")
+                found = editor.get_node(tag="w:p", attrs={"w14:paraId": para_id})
+                log.append(editor._get_element_text(found))
+        except ValueError as e:
+            log.append(str(e))
+    return log
+
+
+class TestQueriesAfterDirectEdits(EditorTestCase):
+    """get_node and find_all must follow changes made through the DOM API."""
+
+    def test_changed_text(self):
+        """Test that an element isn't found by its text after the text changed"""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                editor = self.open_editor(engine)
+                para = editor.get_node(tag="w:p", contains="Paragraph number 7 ")
+                para.getElementsByTagName("w:t")[0].firstChild.data = "Changed text"
+
+                with self.assertRaises(ValueError):
+                    editor.get_node(tag="w:p", contains="Paragraph number 7 ")
+                self.assertEqual(
+                    editor.find_all("w:p", contains="Paragraph number 7 "), []
+                )
+                self.assertIs(editor.get_node(tag="w:p", contains="Changed text"), para)
+
+    def test_changed_attribute(self):
+        """Test lookups by an attribute value that was changed directly"""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                editor = self.open_editor(engine)
+                para = editor.get_node(tag="w:p", attrs={"w14:paraId": "00000003"})
+                para.setAttribute("w14:paraId", "ABCDEF01")
+
+                with self.assertRaises(ValueError):
+                    editor.get_node(tag="w:p", attrs={"w14:paraId": "00000003"})
+                self.assertIs(
+                    editor.get_node(tag="w:p", attrs={"w14:paraId": "ABCDEF01"}), para
+                )
+
+    def test_removed_and_added_elements(self):
+        """Test that removed elements aren't found and added ones are"""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                editor = self.open_editor(engine)
+                para = editor.get_node(tag="w:p", contains="Paragraph number 4 ")
+                body = para.parentNode
+                body.removeChild(para)
+                with self.assertRaises(ValueError):
+                    editor.get_node(tag="w:p", contains="Paragraph number 4 ")
+                self.assertNotIn(para, editor.find_all("w:p"))
+
+                body.appendChild(para)
+                self.assertIs(
+                    editor.get_node(tag="w:p", contains="Paragraph number 4 "), para
+                )
+                self.assertIs(editor.find_all("w:p")[-1], para)
+
+    def test_namespace_declared_on_root(self):
+        """Test inserting a fragment with a prefix declared directly on the root"""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                editor = self.open_editor(engine)
+                para = editor.dom.getElementsByTagName("w:p")[0]
+                editor.insert_after(para, "<w:p/>")
+                editor.dom.documentElement.setAttribute("xmlns:foo", "urn:foo")
+                (node,) = editor.insert_after(para, "<foo:x/>")
+                self.assertEqual(node.namespaceURI, "urn:foo")
+
+    def test_queries_match_a_full_scan(self):
+        """Test indexed queries against checking every element, after edits"""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                editor = self.open_editor(engine)
+                rnd = random.Random(0)
+                for step in range(60):
+                    stale = random_edit(editor, rnd, step)
+                    tag = rnd.choice(["w:p", "w:r", "w:t", "w:ins", "w:del", "*"])
+                    start = rnd.randrange(1, 200)
+                    for query in (
+                        NodeQuery(tag),
+                        NodeQuery(
+                            tag, contains=rnd.choice(["number", "part 3", "new"])
+                        ),
+                        NodeQuery(tag, pattern=r"\d{2}"),
+                        NodeQuery(tag, line_number=range(start, start + 40)),
+                        NodeQuery(tag, line_number=start),
+                        NodeQuery(tag, attrs={"w:rsidR": "00A1B2C3"}),
+                        NodeQuery(tag, attrs={"w:author": lambda a: a != "Reviewer"}),
+                    ):
+                        expected = [
+                            elem
+                            for elem in _iter_elements(editor.dom)
+                            if query.matches(elem, editor._get_element_text)
+                        ]
+                        found = editor.find_all(query)
+                        if stale:
+                            # Elements that only match since the direct edit
+                            # may be missed, but no stale match is returned
+                            self.assertLessEqual(set(found), set(expected))
+                        else:
+                            self.assertEqual(found, expected)
+                    if stale:
+                        editor.reindex()
+
+
+def random_edit(editor, rnd, step):
+    """Change the DOM through the editor or directly.
+
+    Returns:
+        bool: Whether text or attributes were changed directly, without reindexing
+    """
+    paragraphs = editor.dom.getElementsByTagName("w:p")
+    para = paragraphs[rnd.randrange(len(paragraphs))]
+    texts = editor.dom.getElementsByTagName("w:t")
+    op = rnd.random()
+    if op < 0.3:
+        editor.insert_after(para, f"<w:p><w:r><w:t>new {step}</w:t></w:r></w:p>")
+    elif op < 0.45:
+        editor.append_to(para, f"<w:r><w:t>part {step % 7}</w:t></w:r>")
+    elif op < 0.55 and len(paragraphs) > 1:
+        editor.replace_node(para, "<w:p><w:r><w:t>replaced</w:t></w:r></w:p>")
+    elif op < 0.7:
+        texts[rnd.randrange(len(texts))].firstChild.data = f"edited {step}"
+        para.setAttribute("w:rsidR", rnd.choice(["00A1B2C3", "00FFFFFF"]))
+        return True
+    elif op < 0.85 and len(paragraphs) > 1:
+        para.parentNode.removeChild(para)
+        editor.reindex()
+    else:
+        para.parentNode.appendChild(para)
+        editor.reindex()
+    return False
+
+
+class TestLxmlTextNodes(EditorTestCase):
+    def test_views_of_a_slot_are_equal(self):
+        """Test that text views of the same slot are equal and hash alike"""
+        editor = self.open_editor("lxml")
+        t = editor.dom.getElementsByTagName("w:t")[0]
+        first, second = t.firstChild, t.firstChild
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
+        self.assertNotEqual(first, editor.dom.getElementsByTagName("w:t")[1].firstChild)
+
+
+if __name__ == "__main__":
+    unittest.main()
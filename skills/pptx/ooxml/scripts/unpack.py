@@ -1,29 +1,513 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""
+Tool to unpack an Office file (.docx, .pptx, .xlsx) into a directory with its XML pretty-printed.
 
+Example usage:
+    python unpack.py <office_file> <output_dir> [--part NAME]... [--jobs N] [--no-cache]
+
+Unpacked trees are cached by the content hash of the Office file (see
+UnpackCache), so unpacking the same file again is a copy.
+Set $OOXML_CACHE_DIR to move the caches (see ooxml_cache.py).
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import posixpath
 import random
+import shutil
 import sys
+import xml.parsers.expat
 import defusedxml.minidom
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
-
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
-
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
-    dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
-
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+try:
+    from .minidom_compat import (
+        ATTRIBUTE_ESCAPES,
+        TEXT_ESCAPES,
+        QualifiedNames,
+        UnsupportedXML,
+        escape,
+    )
+    from .ooxml_cache import default_cache_dir
+except ImportError:  # Run as a script, not imported from the ooxml package
+    from minidom_compat import (
+        ATTRIBUTE_ESCAPES,
+        TEXT_ESCAPES,
+        QualifiedNames,
+        UnsupportedXML,
+        escape,
+    )
+    from ooxml_cache import default_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Linux ioctl that makes a file share another's blocks (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Unpack an Office file and pretty-print its XML"
+    )
+    parser.add_argument("office_file", help="Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument("output_dir", help="Directory to unpack into")
+    parser.add_argument(
+        "--part",
+        action="append",
+        dest="parts",
+        metavar="NAME",
+        help="Only extract this part (and its relationships), e.g. word/document.xml; "
+        "glob patterns are allowed and the option can be repeated. "
+        "The result can't be packed back into a complete document",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processes for pretty-printing the XML parts (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the cache of unpacked files",
+    )
+    args = parser.parse_args()
+
+    try:
+        unpack_document(
+            args.office_file,
+            args.output_dir,
+            parts=args.parts,
+            jobs=args.jobs,
+            cache=not args.no_cache,
+        )
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    # For .docx files, suggest an RSID for tracked changes
+    if args.office_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(
+    input_file, output_dir, parts=None, jobs=1, cache=True, cache_dir=None
+):
+    """Extract an Office file and pretty-print its XML parts.
+
+    Args:
+        input_file: Path to the .docx/.pptx/.xlsx file
+        output_dir: Directory to unpack into (created if needed)
+        parts: If given, part names or glob patterns (e.g. "word/document.xml",
+            "ppt/slides/*.xml") of the only parts to extract. The
+            relationships part of each selected part is extracted with it.
+            Other parts, such as media, are not written, so the directory
+            can't be packed back into a complete document.
+        jobs: Processes for pretty-printing the XML parts (0 = one per CPU)
+        cache: Copy a complete unpack from the cache if there is one, and
+            store it there otherwise (not used with parts)
+        cache_dir: Cache directory (default: default_cache_dir())
+
+    Returns:
+        list: Names of the extracted parts
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    unpack_cache = digest = None
+    if cache and parts is None:
+        unpack_cache = UnpackCache(cache_dir)
+        digest = unpack_cache.digest(input_file)
+        names = unpack_cache.materialize(digest, output_path)
+        if names is not None:
+            return names
+
+    with zipfile.ZipFile(input_file) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
+        if parts is not None:
+            members = _select_parts(members, parts)
+        xml_members = [m for m in members if m.filename.endswith((".xml", ".rels"))]
+
+        # Other parts are copied as they are, XML parts are pretty-printed from
+        # memory without being written twice
+        for info in members:
+            if not info.filename.endswith((".xml", ".rels")):
+                zf.extract(info, output_path)
+
+        workers = min(jobs or os.cpu_count() or 1, len(xml_members))
+        contents = (zf.read(info) for info in xml_members)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                _write_parts(
+                    output_path,
+                    xml_members,
+                    executor.map(pretty_print_xml_bytes, contents, chunksize=4),
+                )
+        else:
+            _write_parts(
+                output_path, xml_members, map(pretty_print_xml_bytes, contents)
+            )
+
+    names = [info.filename for info in members]
+    if unpack_cache is not None:
+        unpack_cache.store(digest, output_path, names)
+    return names
+
+
+def _select_parts(members, parts):
+    """Return the members matching the part names or patterns, with their rels."""
+    names = {info.filename for info in members}
+    selected = set()
+    for pattern in parts:
+        matches = fnmatch.filter(names, pattern.lstrip("/"))
+        if not matches:
+            raise ValueError(f"No part matches {pattern}")
+        selected.update(matches)
+
+    for name in list(selected):
+        directory, filename = posixpath.split(name)
+        rels_name = posixpath.join(directory, "_rels", f"{filename}.rels")
+        if rels_name in names:
+            selected.add(rels_name)
+
+    return [info for info in members if info.filename in selected]
+
+
+def _write_parts(output_path, members, contents):
+    for info, data in zip(members, contents):
+        part_path = output_path / _safe_member_path(info.filename)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.write_bytes(data)
+
+
+def _safe_member_path(name):
+    # Like ZipFile.extract, drop empty, "." and ".." components so that a
+    # part can't be written outside the output directory
+    components = [
+        c for c in name.replace("\\", "/").split("/") if c not in ("", ".", "..")
+    ]
+    return Path(*components)
+
+
+class UnpackCache:
+    """Unpacked trees of Office files, keyed by the SHA-256 of the file.
+
+    unpacked/<digest>/ holds the tree and unpacked/<digest>.json lists its
+    parts. The list is written last, so a tree without one is incomplete and
+    ignored. Trees are copied out with reflinks where the file system
+    supports them, which share blocks copy-on-write, and plain copies
+    elsewhere. Hard links aren't used because parts are edited in place,
+    which would change the cached copy. Beyond max_bytes, the least recently
+    used trees are removed.
+    """
+
+    # Bump when the unpacked output changes, so older trees aren't reused
+    CACHE_VERSION = 1
+
+    MAX_CACHE_BYTES = 1024 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=MAX_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: Cache directory (default: default_cache_dir())
+            max_bytes: Total size of the cached trees to keep
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    @property
+    def _trees_dir(self):
+        return self.cache_dir / "unpacked"
+
+    def digest(self, input_file):
+        """Return the cache key of an Office file.
+
+        The pretty-printed output depends on how this Python's minidom
+        escapes text, so that is part of the key along with the version.
+        """
+        digest = hashlib.sha256(
+            f"{self.CACHE_VERSION} {TEXT_ESCAPES} {ATTRIBUTE_ESCAPES}\n".encode()
+        )
+        with open(input_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def materialize(self, digest, output_path):
+        """Copy a cached tree into output_path.
+
+        Returns:
+            list: Names of the parts, or None if the tree isn't cached
+        """
+        manifest_file = self._trees_dir / f"{digest}.json"
+        try:
+            manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+            if manifest.get("version") != self.CACHE_VERSION:
+                return None
+            tree = self._trees_dir / digest
+            for name in manifest["parts"]:
+                target = output_path / _safe_member_path(name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                _clone_file(tree / _safe_member_path(name), target)
+            os.utime(manifest_file)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+        return manifest["parts"]
+
+    def store(self, digest, output_path, names):
+        """Copy a freshly unpacked tree into the cache (best effort)."""
+        tree = self._trees_dir / digest
+        tmp_tree = self._trees_dir / f"{digest}.{os.getpid()}.tmp"
+        try:
+            size = 0
+            for name in names:
+                source = output_path / _safe_member_path(name)
+                target = tmp_tree / _safe_member_path(name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                _clone_file(source, target)
+                size += target.stat().st_size
+            tmp_tree.mkdir(parents=True, exist_ok=True)
+
+            if tree.exists():
+                # Left over without its manifest, or stored by another
+                # process in the meantime: either way, replace it
+                shutil.rmtree(tree, ignore_errors=True)
+            os.replace(tmp_tree, tree)
+
+            manifest_file = self._trees_dir / f"{digest}.json"
+            tmp_file = manifest_file.with_name(f"{digest}.json.{os.getpid()}.tmp")
+            tmp_file.write_text(
+                json.dumps(
+                    {"version": self.CACHE_VERSION, "parts": names, "bytes": size}
+                ),
+                encoding="utf-8",
+            )
+            os.replace(tmp_file, manifest_file)
+
+            self._evict()
+        except OSError:
+            pass  # Caching is best effort (e.g. read-only home directory)
+        finally:
+            shutil.rmtree(tmp_tree, ignore_errors=True)
+
+    def _evict(self):
+        """Remove the least recently used trees beyond max_bytes."""
+        entries = []
+        for manifest_file in self._trees_dir.glob("*.json"):
+            try:
+                size = json.loads(manifest_file.read_text(encoding="utf-8"))["bytes"]
+                entries.append((manifest_file.stat().st_mtime, size, manifest_file))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, manifest_file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # The manifest goes first so the tree is never used half removed
+            manifest_file.unlink(missing_ok=True)
+            shutil.rmtree(manifest_file.with_suffix(""), ignore_errors=True)
+            total -= size
+
+
+def _clone_file(source, target):
+    """Copy a file, as a reflink where the file system supports them."""
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+
+
+def pretty_print_xml_bytes(data):
+    """Pretty-print serialized XML with two-space indentation.
+
+    The input is read as UTF-8. The XML is rewritten from a stream of expat
+    events, with the output of minidom's toprettyxml(indent="  ",
+    encoding="ascii") byte for byte but without building a DOM. XML with a
+    DOCTYPE, or that expat rejects, goes through minidom, whose defusedxml
+    parser refuses entity declarations and reports the error.
+
+    Returns:
+        bytes: The pretty-printed XML, declared and encoded as ascii
+    """
+    try:
+        return _StreamingPrettyPrinter().pretty_print(data)
+    except (UnsupportedXML, xml.parsers.expat.ExpatError):
+        return pretty_print_xml_bytes_minidom(data)
+
+
+def pretty_print_xml_bytes_minidom(data):
+    """Reference engine of pretty_print_xml_bytes, built on a minidom DOM."""
+    dom = defusedxml.minidom.parseString(data.decode("utf-8"))
+    return dom.toprettyxml(indent="  ", encoding="ascii")
+
+
+class _StreamingPrettyPrinter(QualifiedNames):
+    """Pretty-prints XML in a single expat pass, writing what toprettyxml would.
+
+    minidom puts every child of an element on its own indented line, except
+    a lone text or CDATA child, which stays inline. So the first child of an
+    element is held back while it is text, until the next child or the end
+    of the element shows whether it is alone. Text nodes and namespace
+    declarations are formed as in pack.py's streaming condenser.
+    """
+
+    INDENT = "  "
+
+    def __init__(self):
+        self._output = io.StringIO()
+        self._write = self._output.write
+        # Per open element: [qualified name, child count, held-back first child]
+        self._elements = []
+        self._text = []
+        self._cdata = None
+        self._namespaces = []
+        self._names = {}
+
+    def pretty_print(self, data):
+        """Pretty-print UTF-8 encoded XML and return it as ascii bytes."""
+        self._write('<?xml version="1.0" encoding="ascii"?>\n')
+
+        parser = xml.parsers.expat.ParserCreate("utf-8", " ")
+        parser.namespace_prefixes = True
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.buffer_size = 1 << 16
+        parser.StartDoctypeDeclHandler = self._doctype
+        parser.StartNamespaceDeclHandler = self._start_namespace
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._character_data
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+        parser.Parse(data, True)
+
+        return self._output.getvalue().encode("ascii", "xmlcharrefreplace")
+
+    def _add_child(self, kind, value):
+        """Write a child node of the current element (or of the document).
+
+        kind is "element" (value: the start tag without its ">"), "text",
+        "cdata" or "markup" (a comment or processing instruction).
+        """
+        if not self._elements:
+            # Children of the document: the root element, comments and
+            # processing instructions
+            self._write(value if kind == "element" else f"{value}\n")
+            return
+
+        parent = self._elements[-1]
+        if parent[1] == 0:
+            if kind in ("text", "cdata"):
+                parent[1] = 1
+                parent[2] = (kind, value)
+                return
+            self._write(">\n")
+        elif parent[2] is not None:
+            self._write(">\n")
+            self._write_node(*parent[2])
+            parent[2] = None
+        parent[1] += 1
+        self._write_node(kind, value)
+
+    def _write_node(self, kind, value):
+        indent = self.INDENT * len(self._elements)
+        if kind == "text":
+            self._write(escape(f"{indent}{value}\n", TEXT_ESCAPES))
+        elif kind == "cdata":
+            self._write(f"<![CDATA[{value}]]>")
+        elif kind == "element":
+            self._write(f"{indent}{value}")
+        else:
+            self._write(f"{indent}{value}\n")
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text = []
+        if self._elements:
+            self._add_child("text", text)
+
+    def _doctype(self, *args):
+        raise UnsupportedXML("DOCTYPE")
+
+    def _start_namespace(self, prefix, uri):
+        name = f"xmlns:{prefix}" if prefix else "xmlns"
+        self._namespaces.append(f' {name}="{escape(uri or "", ATTRIBUTE_ESCAPES)}"')
+
+    def _start_element(self, name, attributes):
+        self._flush_text()
+        qualified_name = self._qualified_name(name)
+        markup = [f"<{qualified_name}"]
+        if self._namespaces:
+            markup.extend(self._namespaces)
+            self._namespaces = []
+        for i in range(0, len(attributes), 2):
+            markup.append(
+                f' {self._qualified_name(attributes[i])}="'
+                f'{escape(attributes[i + 1], ATTRIBUTE_ESCAPES)}"'
+            )
+        self._add_child("element", "".join(markup))
+        self._elements.append([qualified_name, 0, None])
+
+    def _end_element(self, name):
+        self._flush_text()
+        qualified_name, child_count, first_child = self._elements.pop()
+        if child_count == 0:
+            self._write("/>\n")
+        elif first_child is not None:
+            # A lone text or CDATA child stays on the line of its element
+            kind, value = first_child
+            if kind == "text":
+                self._write(f">{escape(value, TEXT_ESCAPES)}</{qualified_name}>\n")
+            else:
+                self._write(f"><![CDATA[{value}]]></{qualified_name}>\n")
+        else:
+            indent = self.INDENT * len(self._elements)
+            self._write(f"{indent}</{qualified_name}>\n")
+
+    def _character_data(self, data):
+        if self._cdata is None:
+            self._text.append(data)
+        else:
+            self._cdata.append(data)
+
+    def _start_cdata(self):
+        # An empty section adds no node, so it doesn't split the text around it
+        self._cdata = []
+
+    def _end_cdata(self):
+        cdata = "".join(self._cdata)
+        self._cdata = None
+        if cdata:
+            self._flush_text()
+            self._add_child("cdata", cdata)
+
+    def _comment(self, data):
+        self._flush_text()
+        self._add_child("markup", f"<!--{data}-->")
+
+    def _processing_instruction(self, target, data):
+        self._flush_text()
+        self._add_child("markup", f"<?{target} {data}?>")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,22 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <dir> --original <original_file>
+    python validate.py <dir> --original <original_file> [--author NAME]... [--jobs N] [--full] [--rels-graph FILE]
+    python validate.py <file>... [--original <original_file>] [--author NAME]... [--jobs N]
+
+Packed .docx/.pptx files are validated straight from the archive, without
+unpacking them. Several files are validated in a pool of --jobs processes and
+their reports are printed in the order given. Without --original, every XSD
+error is reported and tracked changes are not checked. Tracked changes are
+checked for the authors given with --author (default: Claude).
 """
 
 import argparse
+import contextlib
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
@@ -16,13 +27,21 @@ from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValida
 def main():
     parser = argparse.ArgumentParser(description="Validate Office document XML files")
     parser.add_argument(
-        "unpacked_dir",
-        help="Path to unpacked Office document directory",
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="Path to unpacked Office document directory, or one or more packed Office files",
     )
     parser.add_argument(
         "--original",
-        required=True,
-        help="Path to original file (.docx/.pptx/.xlsx)",
+        help="Path to original file (.docx/.pptx/.xlsx), required for an unpacked directory",
+    )
+    parser.add_argument(
+        "--author",
+        action="append",
+        dest="authors",
+        metavar="NAME",
+        help="Author whose tracked changes are validated; repeat for several (default: Claude)",
     )
     parser.add_argument(
         "-v",
@@ -30,17 +49,104 @@ def main():
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the persisted XSD baseline of the original file",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes for XSD validation, or for validating several files (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-check every part instead of only those changed since the last passing run",
+    )
+    parser.add_argument(
+        "--rels-graph",
+        metavar="FILE",
+        help="Write the package's parts, content types and relationship graph as JSON",
+    )
     args = parser.parse_args()
 
     # Validate paths
-    unpacked_dir = Path(args.unpacked_dir)
-    original_file = Path(args.original)
-    file_extension = original_file.suffix.lower()
-    assert unpacked_dir.is_dir(), f"Error: {unpacked_dir} is not a directory"
-    assert original_file.is_file(), f"Error: {original_file} is not a file"
-    assert file_extension in [".docx", ".pptx", ".xlsx"], (
-        f"Error: {original_file} must be a .docx, .pptx, or .xlsx file"
-    )
+    paths = [Path(p) for p in args.paths]
+    original_file = Path(args.original) if args.original else None
+    for path in paths:
+        assert path.exists(), f"Error: {path} does not exist"
+    if original_file is not None:
+        assert original_file.is_file(), f"Error: {original_file} is not a file"
+        assert original_file.suffix.lower() in [".docx", ".pptx", ".xlsx"], (
+            f"Error: {original_file} must be a .docx, .pptx, or .xlsx file"
+        )
+
+    if len(paths) == 1:
+        path = paths[0]
+        if path.is_dir():
+            assert original_file is not None, (
+                f"Error: --original is required to validate {path}"
+            )
+        success = validate_document(
+            path,
+            original_file,
+            verbose=args.verbose,
+            cache=not args.no_cache,
+            jobs=args.jobs,
+            incremental=not args.full,
+            rels_graph=args.rels_graph,
+            authors=args.authors,
+        )
+        if success:
+            print("All validations PASSED!")
+    else:
+        assert not args.rels_graph, "Error: --rels-graph needs a single document"
+        for path in paths:
+            assert path.is_file(), (
+                f"Error: {path} is a directory; only packed files can be validated together"
+            )
+        success = validate_batch(
+            paths,
+            original_file,
+            verbose=args.verbose,
+            cache=not args.no_cache,
+            jobs=args.jobs,
+            authors=args.authors,
+        )
+
+    sys.exit(0 if success else 1)
+
+
+def validate_document(
+    path,
+    original_file,
+    verbose=False,
+    cache=True,
+    jobs=1,
+    incremental=False,
+    rels_graph=None,
+    authors=None,
+):
+    """Run all validators for an unpacked directory or a packed Office file.
+
+    Args:
+        path: Unpacked document directory or packed .docx/.pptx file
+        original_file: Original file to compare against, or None
+        verbose: Enable verbose output
+        cache: Persist the XSD baseline of the original file
+        jobs: Processes for XSD validation (0 = one per CPU)
+        incremental: Only re-check parts changed since the last passing run
+        rels_graph: If set, path of a JSON file to write the package index to
+        authors: Authors whose tracked changes are validated (default: Claude)
+
+    Returns:
+        bool: True if all validations passed
+    """
+    path = Path(path)
+    file_extension = (original_file if path.is_dir() else path).suffix.lower()
 
     # Run validations
     match file_extension:
@@ -50,19 +156,86 @@ def main():
             validators = [PPTXSchemaValidator]
         case _:
             print(f"Error: Validation not supported for file type {file_extension}")
-            sys.exit(1)
+            return False
 
     # Run validators
     success = True
     for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
-        if not validator.validate():
-            success = False
+        if V is RedliningValidator:
+            # Tracked changes can only be checked against the original text
+            if original_file is None:
+                continue
+            if not V(path, original_file, verbose=verbose, authors=authors).validate():
+                success = False
+            continue
 
-    if success:
-        print("All validations PASSED!")
+        validator = V(
+            path,
+            original_file,
+            verbose=verbose,
+            cache=cache,
+            max_workers=jobs,
+            incremental=incremental,
+        )
+        try:
+            if not validator.validate():
+                success = False
+            if rels_graph:
+                Path(rels_graph).write_text(validator.index.to_json(), encoding="utf-8")
+        finally:
+            validator.close()
 
-    sys.exit(0 if success else 1)
+    return success
+
+
+def validate_batch(
+    paths, original_file, verbose=False, cache=True, jobs=1, authors=None
+):
+    """Validate several packed files in a process pool, printing reports in order.
+
+    Returns:
+        bool: True if every file passed
+    """
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+        results = executor.map(
+            _validate_captured,
+            paths,
+            repeat(original_file),
+            repeat(verbose),
+            repeat(cache),
+            repeat(authors),
+        )
+
+        for path, (success, report) in zip(paths, results):
+            print(f"=== {path} ===")
+            if report:
+                print(report.rstrip("\n"))
+            if success:
+                print("All validations PASSED!")
+            else:
+                failed += 1
+            print()
+
+    if failed:
+        print(f"FAILED - {failed} of {len(paths)} files failed validation")
+        return False
+    print(f"All {len(paths)} files PASSED!")
+    return True
+
+
+def _validate_captured(path, original_file, verbose, cache, authors):
+    """Validate one file in a worker process. Returns (success, report)."""
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        try:
+            success = validate_document(
+                path, original_file, verbose=verbose, cache=cache, authors=authors
+            )
+        except Exception as e:
+            print(f"FAILED - Error reading {path}: {e}")
+            success = False
+    return success, report.getvalue()
 
 
 if __name__ == "__main__":
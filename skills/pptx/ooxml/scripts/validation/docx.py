@@ -3,13 +3,20 @@ Validator for Word document XML files against XSD schemas.
 """
 
 import re
-import tempfile
 import zipfile
 
 import lxml.etree
 
 from .base import BaseSchemaValidator
 
+_LEADING_WHITESPACE = re.compile(r"^\s.*")
+_TRAILING_WHITESPACE = re.compile(r".*\s$")
+
+
+def _text_preview(text):
+    """Show a preview of the text"""
+    return repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
+
 
 class DOCXSchemaValidator(BaseSchemaValidator):
     """Validator for Word document XML files against XSD schemas."""
@@ -21,8 +28,17 @@ class DOCXSchemaValidator(BaseSchemaValidator):
     # Start with empty mapping - add specific cases as we discover them
     ELEMENT_RELATIONSHIP_TYPES = {}
 
+    def __init__(self, *args, **kwargs):
+        # Per-file results of the fused document.xml scan
+        self._document_scans = {}
+        super().__init__(*args, **kwargs)
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
+        # Every check below shares one parse of each file
+        self.clear_cache()
+        self.select_files_to_check()
+
         # Test 0: XML well-formedness
         if not self.validate_xml():
             return False
@@ -67,6 +83,8 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         # Count and compare paragraphs
         self.compare_paragraph_counts()
 
+        if all_valid:
+            self.save_validation_state()
         return all_valid
 
     def validate_whitespace_preservation(self):
@@ -75,41 +93,18 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         """
         errors = []
 
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             # Only check document.xml files
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                # Find all w:t elements
-                for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
-                    if elem.text:
-                        text = elem.text
-                        # Check if text starts or ends with whitespace
-                        if re.match(r"^\s.*", text) or re.match(r".*\s$", text):
-                            # Check if xml:space="preserve" attribute exists
-                            xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
-                            if (
-                                xml_space_attr not in elem.attrib
-                                or elem.attrib[xml_space_attr] != "preserve"
-                            ):
-                                # Show a preview of the text
-                                text_preview = (
-                                    repr(text)[:50] + "..."
-                                    if len(repr(text)) > 50
-                                    else repr(text)
-                                )
-                                errors.append(
-                                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                    f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
-                                )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
+            scan = self._scan_document_xml(xml_file)
+            if "error" in scan:
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {scan['error']}"
                 )
+            else:
+                errors.extend(scan["whitespace"])
 
         if errors:
             print(f"FAILED - Found {len(errors)} whitespace preservation violations:")
@@ -128,37 +123,18 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         """
         errors = []
 
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             # Only check document.xml files
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                # Find all w:t elements that are descendants of w:del elements
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-                xpath_expression = ".//w:del//w:t"
-                problematic_t_elements = root.xpath(
-                    xpath_expression, namespaces=namespaces
-                )
-                for t_elem in problematic_t_elements:
-                    if t_elem.text:
-                        # Show a preview of the text
-                        text_preview = (
-                            repr(t_elem.text)[:50] + "..."
-                            if len(repr(t_elem.text)) > 50
-                            else repr(t_elem.text)
-                        )
-                        errors.append(
-                            f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                            f"Line {t_elem.sourceline}: <w:t> found within <w:del>: {text_preview}"
-                        )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
+            scan = self._scan_document_xml(xml_file)
+            if "error" in scan:
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {scan['error']}"
                 )
+            else:
+                errors.extend(scan["deletions"])
 
         if errors:
             print(f"FAILED - Found {len(errors)} deletion validation violations:")
@@ -179,13 +155,19 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
-            except Exception as e:
-                print(f"Error counting paragraphs in unpacked document: {e}")
+            recorded = self._recorded_result(xml_file, "paragraphs")
+            if recorded is not None:
+                count = recorded
+                continue
+
+            scan = self._scan_document_xml(xml_file)
+            if "error" in scan:
+                print(
+                    f"Error counting paragraphs in unpacked document: {scan['error']}"
+                )
+            else:
+                count = scan["paragraphs"]
+                self._record_result(xml_file, paragraphs=count)
 
         return count
 
@@ -194,19 +176,13 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            # Create temporary directory to unpack original
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Unpack original docx
-                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
-
-                # Parse document.xml
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            # Stream word/document.xml straight from the archive
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                with zip_ref.open("word/document.xml") as doc_xml:
+                    events = lxml.etree.iterparse(doc_xml, events=("start", "end"))
+                    count = self._scan_document_events(
+                        events, "word/document.xml", streaming=True
+                    )["paragraphs"]
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
@@ -220,35 +196,17 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         """
         errors = []
 
-        for xml_file in self.xml_files:
+        for xml_file in self.files_to_check:
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                # Find w:delText in w:ins that are NOT within w:del
-                invalid_elements = root.xpath(
-                    ".//w:ins//w:delText[not(ancestor::w:del)]",
-                    namespaces=namespaces
-                )
-
-                for elem in invalid_elements:
-                    text_preview = (
-                        repr(elem.text or "")[:50] + "..."
-                        if len(repr(elem.text or "")) > 50
-                        else repr(elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {elem.sourceline}: <w:delText> within <w:ins>: {text_preview}"
-                    )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
+            scan = self._scan_document_xml(xml_file)
+            if "error" in scan:
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {scan['error']}"
                 )
+            else:
+                errors.extend(scan["insertions"])
 
         if errors:
             print(f"FAILED - Found {len(errors)} insertion validation violations:")
@@ -260,8 +218,122 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - No w:delText elements within w:ins elements")
             return True
 
+    def clear_cache(self):
+        """Drop parsed trees and document.xml scan results."""
+        super().clear_cache()
+        self._document_scans.clear()
+
+    def _scan_document_xml(self, xml_file):
+        """Run all document.xml checks and count paragraphs in one traversal.
+
+        Walks the cached tree if the file was already parsed, otherwise
+        streams it with iterparse so memory stays bounded. Results are
+        memoized so the individual validate_* methods share one pass.
+
+        Returns:
+            dict: Error lists under "whitespace", "deletions" and "insertions"
+            and the "paragraphs" count, or {"error": exception} on failure
+        """
+        if xml_file not in self._document_scans:
+            relative_path = xml_file.relative_to(self.unpacked_dir)
+            try:
+                cached = self._tree_cache.get(xml_file)
+                if isinstance(cached, lxml.etree._ElementTree):
+                    events = lxml.etree.iterwalk(cached, events=("start", "end"))
+                    scan = self._scan_document_events(events, relative_path)
+                else:
+                    self.parse_count += 1
+                    self.bytes_read += self.package.size(xml_file)
+                    with self.package.open(xml_file) as source:
+                        events = lxml.etree.iterparse(source, events=("start", "end"))
+                        scan = self._scan_document_events(
+                            events, relative_path, streaming=True
+                        )
+            except Exception as e:
+                scan = {"error": e}
+            self._document_scans[xml_file] = scan
+        return self._document_scans[xml_file]
+
+    def _scan_document_events(self, events, relative_path, streaming=False):
+        """Evaluate the whitespace, deletion and insertion rules over start/end events.
+
+        Tracks how many w:del and w:ins elements enclose the current position
+        instead of querying ancestors, so the scan is a single linear pass.
+
+        Args:
+            events: Iterator of (event, element) pairs from iterparse/iterwalk
+            relative_path: Path used as the prefix of error messages
+            streaming: If True, elements are cleared once processed (only valid
+                for iterparse, where nothing else holds on to the tree)
+
+        Returns:
+            dict: Error lists under "whitespace", "deletions" and "insertions"
+            and the "paragraphs" count
+        """
+        w = f"{{{self.WORD_2006_NAMESPACE}}}"
+        t_tag, del_text_tag = f"{w}t", f"{w}delText"
+        del_tag, ins_tag, p_tag = f"{w}del", f"{w}ins", f"{w}p"
+        xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
+
+        whitespace_errors, deletion_errors, insertion_errors = [], [], []
+        paragraphs = 0
+        del_depth = ins_depth = 0
+
+        for event, elem in events:
+            tag = elem.tag
+            if event == "start":
+                if tag == del_tag:
+                    del_depth += 1
+                elif tag == ins_tag:
+                    ins_depth += 1
+                elif tag == p_tag:
+                    paragraphs += 1
+                continue
+
+            if tag == del_tag:
+                del_depth -= 1
+            elif tag == ins_tag:
+                ins_depth -= 1
+            elif tag == t_tag and elem.text:
+                text = elem.text
+                # Check if text starts or ends with whitespace
+                if _LEADING_WHITESPACE.match(text) or _TRAILING_WHITESPACE.match(text):
+                    # Check if xml:space="preserve" attribute exists
+                    if elem.get(xml_space_attr) != "preserve":
+                        whitespace_errors.append(
+                            f"  {relative_path}: "
+                            f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {_text_preview(text)}"
+                        )
+                if del_depth:
+                    deletion_errors.append(
+                        f"  {relative_path}: "
+                        f"Line {elem.sourceline}: <w:t> found within <w:del>: {_text_preview(text)}"
+                    )
+            elif tag == del_text_tag and ins_depth and not del_depth:
+                insertion_errors.append(
+                    f"  {relative_path}: "
+                    f"Line {elem.sourceline}: <w:delText> within <w:ins>: {_text_preview(elem.text or '')}"
+                )
+
+            if streaming:
+                # Drop processed content so memory doesn't grow with the document
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        return {
+            "whitespace": whitespace_errors,
+            "deletions": deletion_errors,
+            "insertions": insertion_errors,
+            "paragraphs": paragraphs,
+        }
+
     def compare_paragraph_counts(self):
         """Compare paragraph counts between original and new document."""
+        if self.original_file is None:
+            print(f"\nParagraphs: {self.count_paragraphs_in_unpacked()}")
+            return
+
         original_count = self.count_paragraphs_in_original()
         new_count = self.count_paragraphs_in_unpacked()
 
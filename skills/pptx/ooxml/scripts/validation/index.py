@@ -0,0 +1,208 @@
+"""
+In-memory index of the parts, content types and relationships of an Office package.
+"""
+
+import fnmatch
+import json
+from pathlib import PurePosixPath
+
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+PACKAGE_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+
+
+class PackageIndex:
+    """Parts, content types and relationship graph of a package.
+
+    The part list (with sizes) comes from a single walk of the package when
+    the index is created, so reference and content type checks are
+    dictionary lookups instead of filesystem calls. Relationships and content
+    types are read from the parsed .rels and [Content_Types].xml parts on
+    first use; a part that fails to parse raises its error again each time
+    it is queried.
+    """
+
+    def __init__(self, package, parse_xml):
+        """
+        Args:
+            package: DirectoryPackage or ZipPackage to index
+            parse_xml: Callable returning the parsed tree of a part
+        """
+        self.package = package
+        self.root = package.root
+        self._parse_xml = parse_xml
+        # Part path -> size in bytes, in walk order
+        self.parts = dict(package.walk())
+        self._relationships = {}
+        self._content_types = None
+
+    def __contains__(self, path):
+        return path in self.parts
+
+    def invalidate(self):
+        """Forget parsed relationships and content types (e.g. after edits)."""
+        self._relationships.clear()
+        self._content_types = None
+
+    def glob(self, pattern):
+        """Parts matching a pattern relative to the root, like Path.glob."""
+        pattern_parts = PurePosixPath(pattern).parts
+        matches = []
+        for part in self.parts:
+            names = self.part_name(part).split("/")
+            if len(names) == len(pattern_parts) and all(
+                fnmatch.fnmatchcase(name, p) for name, p in zip(names, pattern_parts)
+            ):
+                matches.append(part)
+        return matches
+
+    def rglob(self, pattern):
+        """Parts whose name matches a pattern at any depth, like Path.rglob."""
+        return [part for part in self.parts if fnmatch.fnmatchcase(part.name, pattern)]
+
+    def part_name(self, path):
+        """Package-relative name of a part, e.g. 'word/document.xml'."""
+        return PurePosixPath(path.relative_to(self.root)).as_posix()
+
+    def relationships(self, rels_file):
+        """Return the relationships of a .rels part.
+
+        Returns:
+            list: One dict per Relationship element with its "id", "type",
+            "target", "target_mode", source "line" and the normalized
+            "target_part" path it points to (None if it can't be resolved)
+        """
+        if rels_file not in self._relationships:
+            try:
+                self._relationships[rels_file] = self._read_relationships(rels_file)
+            except Exception as e:
+                self._relationships[rels_file] = e
+
+        relationships = self._relationships[rels_file]
+        if isinstance(relationships, Exception):
+            raise relationships
+        return relationships
+
+    def _read_relationships(self, rels_file):
+        root = self._parse_xml(rels_file).getroot()
+
+        # Targets of the package .rels are relative to the package root, others
+        # to the source part's folder (e.g. word/_rels/document.xml.rels -> word/)
+        base_dir = self.root if rels_file.name == ".rels" else rels_file.parent.parent
+
+        relationships = []
+        for rel in root.findall(
+            f".//{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+        ):
+            target = rel.get("Target")
+            target_part = None
+            if target:
+                try:
+                    target_part = self.package.normpath(base_dir / target)
+                except ValueError:
+                    pass
+            relationships.append(
+                {
+                    "id": rel.get("Id"),
+                    "type": rel.get("Type", ""),
+                    "target": target,
+                    "target_mode": rel.get("TargetMode"),
+                    "target_part": target_part,
+                    "line": rel.sourceline,
+                }
+            )
+        return relationships
+
+    @property
+    def content_types(self):
+        """Declared content types from [Content_Types].xml.
+
+        Returns:
+            dict: "defaults" maps lower-case extensions and "overrides" maps
+            part names (without leading '/') to content types
+        """
+        if self._content_types is None:
+            try:
+                root = self._parse_xml(self.root / "[Content_Types].xml").getroot()
+                defaults, overrides = {}, {}
+                for override in root.findall(
+                    f".//{{{CONTENT_TYPES_NAMESPACE}}}Override"
+                ):
+                    part_name = override.get("PartName")
+                    if part_name is not None:
+                        overrides[part_name.lstrip("/")] = override.get("ContentType")
+                for default in root.findall(f".//{{{CONTENT_TYPES_NAMESPACE}}}Default"):
+                    extension = default.get("Extension")
+                    if extension is not None:
+                        defaults[extension.lower()] = default.get("ContentType")
+                self._content_types = {"defaults": defaults, "overrides": overrides}
+            except Exception as e:
+                self._content_types = e
+
+        if isinstance(self._content_types, Exception):
+            raise self._content_types
+        return self._content_types
+
+    def content_type(self, path):
+        """Content type of a part (Override first, then Default by extension)."""
+        content_types = self.content_types
+        part_name = self.part_name(path)
+        if part_name in content_types["overrides"]:
+            return content_types["overrides"][part_name]
+        return content_types["defaults"].get(path.suffix.lstrip(".").lower())
+
+    def as_dict(self):
+        """The whole index as JSON-serializable data, keyed by part name.
+
+        Returns:
+            dict: "parts" (size and content type of every part) and
+            "relationships" (per .rels part: its source part and
+            relationships, or the error that prevented reading it)
+        """
+        try:
+            has_content_types = bool(self.content_types)
+        except Exception:
+            has_content_types = False
+
+        parts = {
+            self.part_name(path): {
+                "size": size,
+                "content_type": self.content_type(path) if has_content_types else None,
+            }
+            for path, size in self.parts.items()
+        }
+
+        relationships = {}
+        for rels_file in self.rglob("*.rels"):
+            if rels_file.name == ".rels":
+                source = ""  # The package itself
+            else:
+                source = self.part_name(
+                    rels_file.parent.parent / rels_file.name[: -len(".rels")]
+                )
+            entry = {"source": source}
+            try:
+                entry["relationships"] = [
+                    dict(
+                        rel,
+                        target_part=self.part_name(rel["target_part"])
+                        if rel["target_part"] in self.parts
+                        else None,
+                        exists=rel["target_part"] in self.parts,
+                    )
+                    for rel in self.relationships(rels_file)
+                ]
+            except Exception as e:
+                entry["error"] = str(e)
+            relationships[self.part_name(rels_file)] = entry
+
+        return {"parts": parts, "relationships": relationships}
+
+    def to_json(self, indent=2):
+        """Serialize as_dict() to a JSON string."""
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
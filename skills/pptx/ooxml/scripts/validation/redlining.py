@@ -2,119 +2,133 @@
 Validator for tracked changes in Word documents.
 """
 
-import subprocess
-import tempfile
+import contextlib
+import itertools
 import zipfile
 from pathlib import Path
 
+import lxml.etree
+
+from .diff import word_diff
+
+
+def _clear_processed(elem):
+    """Drop a processed element's content so iterparse memory stays flat."""
+    elem.clear(keep_tail=True)
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
 
 class RedliningValidator:
     """Validator for tracked changes in Word documents."""
 
-    def __init__(self, unpacked_dir, original_docx, verbose=False):
+    # Author of tracked changes validated when none are given
+    DEFAULT_AUTHORS = ("Claude",)
+
+    def __init__(self, unpacked_dir, original_docx, verbose=False, authors=None):
+        """
+        Args:
+            unpacked_dir: Unpacked document directory, or a packed .docx read
+                in place
+            original_docx: Original .docx file
+            verbose: Enable verbose output
+            authors: Names whose tracked changes are validated, e.g. the
+                author passed to Document (default: Claude)
+        """
         self.unpacked_dir = Path(unpacked_dir)
         self.original_docx = Path(original_docx)
         self.verbose = verbose
+        if isinstance(authors, str):
+            authors = [authors]
+        self.authors = list(dict.fromkeys(authors or self.DEFAULT_AUTHORS))
+        self.author_label = ", ".join(self.authors)
         self.namespaces = {
             "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
         }
+        # Per-author summary of the tracked changes, filled in by validate()
+        self.author_stats = self._empty_author_stats()
 
     def validate(self):
         """Main validation method that returns True if valid, False otherwise."""
         # Verify unpacked directory exists and has correct structure
         modified_file = self.unpacked_dir / "word" / "document.xml"
-        if not modified_file.exists():
-            print(f"FAILED - Modified document.xml not found at {modified_file}")
-            return False
 
-        # First, check if there are any tracked changes by Claude to validate
-        try:
-            import xml.etree.ElementTree as ET
-
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
-
-            # Check for w:del or w:ins tags authored by Claude
-            del_elements = root.findall(".//w:del", self.namespaces)
-            ins_elements = root.findall(".//w:ins", self.namespaces)
-
-            # Filter to only include changes by Claude
-            claude_del_elements = [
-                elem
-                for elem in del_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-            claude_ins_elements = [
-                elem
-                for elem in ins_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-
-            # Redlining validation is only needed if tracked changes by Claude have been used.
-            if not claude_del_elements and not claude_ins_elements:
-                if self.verbose:
-                    print("PASSED - No tracked changes by Claude found.")
-                return True
+        self.author_stats = self._empty_author_stats()
 
+        # First, check if there are any tracked changes by the authors to validate
+        try:
+            with self._open_modified_document() as modified:
+                has_tracked_changes = self._has_tracked_changes(modified)
+        except (OSError, KeyError, zipfile.BadZipFile):
+            print(f"FAILED - Modified document.xml not found at {modified_file}")
+            return False
         except Exception:
             # If we can't parse the XML, continue with full validation
-            pass
+            has_tracked_changes = True
 
-        # Create temporary directory for unpacking original docx
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        # Redlining validation is only needed if tracked changes by the authors have been used.
+        if not has_tracked_changes:
+            if self.verbose:
+                print(f"PASSED - No tracked changes by {self.author_label} found.")
+            return True
 
-            # Unpack original docx
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
+        # Read the original document.xml straight from the archive
+        try:
+            original_zip = zipfile.ZipFile(self.original_docx, "r")
+        except Exception as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
 
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
+        with original_zip:
+            if "word/document.xml" not in original_zip.namelist():
                 print(
                     f"FAILED - Original document.xml not found in {self.original_docx}"
                 )
                 return False
 
-            # Parse both XML files using xml.etree.ElementTree for redlining validation
+            # Compare the text of both documents with the authors' tracked
+            # changes rejected, paragraph by paragraph. The pass over the
+            # modified document also collects the per-author summary.
             try:
-                import xml.etree.ElementTree as ET
-
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
-            except ET.ParseError as e:
+                with (
+                    original_zip.open("word/document.xml") as original,
+                    self._open_modified_document() as modified,
+                ):
+                    difference = self._find_text_difference(
+                        original, modified, stats=self.author_stats
+                    )
+            except lxml.etree.XMLSyntaxError as e:
                 print(f"FAILED - Error parsing XML files: {e}")
                 return False
 
-            # Remove Claude's tracked changes from both documents
-            self._remove_claude_tracked_changes(original_root)
-            self._remove_claude_tracked_changes(modified_root)
+        if self.verbose:
+            self._print_author_stats()
 
-            # Extract and compare text content
-            modified_text = self._extract_text_content(modified_root)
-            original_text = self._extract_text_content(original_root)
-
-            if modified_text != original_text:
-                # Show detailed character-level differences for each paragraph
-                error_message = self._generate_detailed_diff(
-                    original_text, modified_text
-                )
-                print(error_message)
-                return False
+        if difference is not None:
+            # Show detailed character-level differences for each paragraph
+            error_message = self._generate_detailed_diff(*difference)
+            print(error_message)
+            return False
 
-            if self.verbose:
-                print("PASSED - All changes by Claude are properly tracked")
-            return True
+        if self.verbose:
+            print(f"PASSED - All changes by {self.author_label} are properly tracked")
+        return True
+
+    @contextlib.contextmanager
+    def _open_modified_document(self):
+        """Open the modified word/document.xml for streaming binary reads."""
+        if self.unpacked_dir.is_file():
+            with zipfile.ZipFile(self.unpacked_dir, "r") as zip_ref:
+                with zip_ref.open("word/document.xml") as source:
+                    yield source
+        else:
+            with open(self.unpacked_dir / "word" / "document.xml", "rb") as source:
+                yield source
 
     def _generate_detailed_diff(self, original_text, modified_text):
-        """Generate detailed word-level differences using git word diff."""
+        """Generate detailed word-level differences (see diff.word_diff)."""
         error_parts = [
-            "FAILED - Document text doesn't match after removing Claude's tracked changes",
+            f"FAILED - Document text doesn't match after removing {self.author_label}'s tracked changes",
             "",
             "Likely causes:",
             "  1. Modified text inside another author's <w:ins> or <w:del> tags",
@@ -127,152 +141,186 @@ class RedliningValidator:
             "",
         ]
 
-        # Show git word diff
-        git_diff = self._get_git_word_diff(original_text, modified_text)
-        if git_diff:
-            error_parts.extend(["Differences:", "============", git_diff])
-        else:
-            error_parts.append("Unable to generate word diff (git not available)")
+        # Show character-level word diff
+        differences = word_diff(original_text, modified_text)
+        if differences:
+            error_parts.extend(["Differences:", "============", differences])
 
         return "\n".join(error_parts)
 
-    def _get_git_word_diff(self, original_text, modified_text):
-        """Generate word diff using git with character-level precision."""
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                # Create two files
-                original_file = temp_path / "original.txt"
-                modified_file = temp_path / "modified.txt"
-
-                original_file.write_text(original_text, encoding="utf-8")
-                modified_file.write_text(modified_text, encoding="utf-8")
-
-                # Try character-level diff first for precise differences
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "--word-diff-regex=.",  # Character-by-character diff
-                        "-U0",  # Zero lines of context - show only changed lines
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
+    def _empty_author_stats(self):
+        return {
+            author: {
+                "insertions": 0,
+                "deletions": 0,
+                "inserted_chars": 0,
+                "deleted_chars": 0,
+                "paragraphs": 0,
+            }
+            for author in self.authors
+        }
 
-                if result.stdout.strip():
-                    # Clean up the output - remove git diff header lines
-                    lines = result.stdout.split("\n")
-                    # Skip the header lines (diff --git, index, +++, ---, @@)
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-
-                    if content_lines:
-                        return "\n".join(content_lines)
-
-                # Fallback to word-level diff if character-level is too verbose
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "-U0",  # Zero lines of context
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
+    def _print_author_stats(self):
+        """Print the per-author summary of tracked changes."""
+        for author, stats in self.author_stats.items():
+            print(
+                f"Tracked changes by {author}: {stats['insertions']} insertions, "
+                f"{stats['deletions']} deletions, {stats['inserted_chars']} characters "
+                f"inserted, {stats['deleted_chars']} deleted, {stats['paragraphs']} "
+                f"paragraphs touched"
+            )
+
+    def _has_tracked_changes(self, source):
+        """Whether the document has a w:ins or w:del by one of the authors.
+
+        Streams the document and stops at the first one found.
+        """
+        w = f"{{{self.namespaces['w']}}}"
+        tracked_change_tags = (f"{w}ins", f"{w}del")
+        author_attr = f"{w}author"
+
+        for event, elem in lxml.etree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if (
+                    elem.tag in tracked_change_tags
+                    and elem.get(author_attr) in self.authors
+                ):
+                    return True
+            else:
+                _clear_processed(elem)
+        return False
+
+    def _find_text_difference(self, original, modified, stats=None):
+        """Compare the paragraph texts of two documents, stopping at the first difference.
+
+        The modified document is always read to the end, so stats cover it
+        in full.
+
+        Returns:
+            tuple: (original_text, modified_text) from the first differing
+            paragraph to the end, or None if all paragraphs match. The
+            matching paragraphs before it wouldn't show up in the diff.
+        """
+        original_paragraphs = self._iter_paragraph_texts(original)
+        modified_paragraphs = self._iter_paragraph_texts(modified, stats=stats)
+
+        for original_text, modified_text in itertools.zip_longest(
+            original_paragraphs, modified_paragraphs
+        ):
+            if original_text != modified_text:
+                break
+        else:
+            return None
+
+        return (
+            "\n".join(itertools.chain([original_text or ""], original_paragraphs)),
+            "\n".join(itertools.chain([modified_text or ""], modified_paragraphs)),
+        )
 
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-                    return "\n".join(content_lines)
-
-        except (subprocess.CalledProcessError, FileNotFoundError, Exception):
-            # Git not available or other error, return None to use fallback
-            pass
-
-        return None
-
-    def _remove_claude_tracked_changes(self, root):
-        """Remove tracked changes authored by Claude from the XML root."""
-        ins_tag = f"{{{self.namespaces['w']}}}ins"
-        del_tag = f"{{{self.namespaces['w']}}}del"
-        author_attr = f"{{{self.namespaces['w']}}}author"
-
-        # Remove w:ins elements
-        for parent in root.iter():
-            to_remove = []
-            for child in parent:
-                if child.tag == ins_tag and child.get(author_attr) == "Claude":
-                    to_remove.append(child)
-            for elem in to_remove:
-                parent.remove(elem)
-
-        # Unwrap content in w:del elements where author is "Claude"
-        deltext_tag = f"{{{self.namespaces['w']}}}delText"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        for parent in root.iter():
-            to_process = []
-            for child in parent:
-                if child.tag == del_tag and child.get(author_attr) == "Claude":
-                    to_process.append((child, list(parent).index(child)))
-
-            # Process in reverse order to maintain indices
-            for del_elem, del_index in reversed(to_process):
-                # Convert w:delText to w:t before moving
-                for elem in del_elem.iter():
-                    if elem.tag == deltext_tag:
-                        elem.tag = t_tag
-
-                # Move all children of w:del to its parent before removing w:del
-                for child in reversed(list(del_elem)):
-                    parent.insert(del_index, child)
-                parent.remove(del_elem)
-
-    def _extract_text_content(self, root):
-        """Extract text content from Word XML, preserving paragraph structure.
+    def _iter_paragraph_texts(self, source, stats=None):
+        """Yield the text of each paragraph with the authors' tracked changes rejected.
 
+        Streams the document with iterparse instead of building and mutating
+        a tree: content of the authors' w:ins elements is skipped, and
+        w:delText inside their w:del elements counts as text, as if the
+        deletion was undone. Processed elements are cleared, so memory stays
+        flat for large documents.
+
+        Paragraphs are yielded in document order. Text of a nested paragraph
+        (e.g. in a text box) also counts towards the enclosing paragraph.
         Empty paragraphs are skipped to avoid false positives when tracked
         insertions add only structural elements without text content.
+
+        Args:
+            source: Binary file object of a document.xml
+            stats: Optional dict from _empty_author_stats(), updated with
+                each author's w:ins/w:del counts, the characters inside their
+                innermost w:ins (w:t) and w:del (w:delText), and the number
+                of paragraphs containing their changes
         """
-        p_tag = f"{{{self.namespaces['w']}}}p"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        paragraphs = []
-        for p_elem in root.findall(f".//{p_tag}"):
-            # Get all text elements within this paragraph
-            text_parts = []
-            for t_elem in p_elem.findall(f".//{t_tag}"):
-                if t_elem.text:
-                    text_parts.append(t_elem.text)
-            paragraph_text = "".join(text_parts)
-            # Skip empty paragraphs - they don't affect content validation
-            if paragraph_text:
-                paragraphs.append(paragraph_text)
-
-        return "\n".join(paragraphs)
+        w = f"{{{self.namespaces['w']}}}"
+        p_tag, t_tag, del_text_tag = f"{w}p", f"{w}t", f"{w}delText"
+        ins_tag, del_tag, author_attr = f"{w}ins", f"{w}del", f"{w}author"
+        authors = self.authors
+
+        skip_depth = 0  # Depth inside a w:ins by one of the authors
+        del_depth = 0  # Number of enclosing w:del elements by the authors
+        open_paragraphs = []  # Text parts of the enclosing paragraphs
+        pending = []  # Text parts of paragraphs not yet yielded, in order
+
+        # Authors of the enclosing w:ins and w:del elements, and the enclosing
+        # paragraphs (by position in the document), for the stats
+        ins_authors, del_authors, paragraph_numbers = [], [], []
+        paragraph_count = 0
+        touched_paragraphs = {author: set() for author in authors}
+
+        for event, elem in lxml.etree.iterparse(source, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == p_tag:
+                    paragraph_count += 1
+                    paragraph_numbers.append(paragraph_count)
+                elif tag == ins_tag or tag == del_tag:
+                    author = elem.get(author_attr)
+                    if tag == ins_tag:
+                        ins_authors.append(author)
+                    else:
+                        del_authors.append(author)
+                    if stats is not None and author in touched_paragraphs:
+                        stats[author][
+                            "insertions" if tag == ins_tag else "deletions"
+                        ] += 1
+                        if paragraph_numbers:
+                            touched_paragraphs[author].add(paragraph_numbers[-1])
+
+                if skip_depth:
+                    skip_depth += 1
+                elif tag == p_tag:
+                    text_parts = []
+                    open_paragraphs.append(text_parts)
+                    pending.append(text_parts)
+                elif elem.get(author_attr) in authors:
+                    if tag == ins_tag:
+                        skip_depth = 1
+                    elif tag == del_tag:
+                        del_depth += 1
+                continue
+
+            if stats is not None and elem.text:
+                if tag == t_tag and ins_authors and ins_authors[-1] in stats:
+                    stats[ins_authors[-1]]["inserted_chars"] += len(elem.text)
+                elif tag == del_text_tag and del_authors and del_authors[-1] in stats:
+                    stats[del_authors[-1]]["deleted_chars"] += len(elem.text)
+
+            if tag == p_tag:
+                paragraph_numbers.pop()
+            elif tag == ins_tag:
+                ins_authors.pop()
+            elif tag == del_tag:
+                del_authors.pop()
+
+            if skip_depth:
+                skip_depth -= 1
+            elif tag == t_tag or (tag == del_text_tag and del_depth):
+                if elem.text:
+                    for text_parts in open_paragraphs:
+                        text_parts.append(elem.text)
+            elif tag == del_tag and elem.get(author_attr) in authors:
+                del_depth -= 1
+            elif tag == p_tag:
+                open_paragraphs.pop()
+                if not open_paragraphs:
+                    for text_parts in pending:
+                        paragraph_text = "".join(text_parts)
+                        if paragraph_text:
+                            yield paragraph_text
+                    pending.clear()
+
+            _clear_processed(elem)
+
+        if stats is not None:
+            for author, paragraphs in touched_paragraphs.items():
+                stats[author]["paragraphs"] += len(paragraphs)
 
 
 if __name__ == "__main__":